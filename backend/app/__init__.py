@@ -9,50 +9,128 @@ from flask_sqlalchemy import SQLAlchemy
 from flask_mail import Mail
 from flask_cors import CORS
 from flask_socketio import SocketIO
+from werkzeug.middleware.proxy_fix import ProxyFix
 from itsdangerous import URLSafeTimedSerializer
+from itsdangerous.encoding import want_bytes
+from sqlalchemy.orm import configure_mappers
 import eventlet
+import os
+from app.utils.database import RoutingSession
 
 # Initialize extensions
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 mail = Mail()
 serializer = URLSafeTimedSerializer('dev-secret-key-replace-in-production')
 socketio = SocketIO()
 
-def create_app():
+def create_app(config_name=None):
     """
     Create and configure the Flask application.
     
+    Args:
+        config_name: 'development', 'testing' or 'production'
+                     (default: the FLASK_CONFIG environment variable,
+                     then 'development')
+    
     Returns:
         Flask application instance
     """
+    from app.config import config_by_name
+    from app.utils.database import engine_options, configure_sqlite, route_read_only_requests, REPLICA_BIND
+    
+    config_name = config_name or os.environ.get('FLASK_CONFIG', 'development')
+    if config_name not in config_by_name:
+        raise ValueError(f"Unknown configuration '{config_name}'")
+    
     app = Flask(__name__)
     
     # Configure the app
-    app.config['SECRET_KEY'] = 'dev-secret-key-replace-in-production'
-    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///resource_sharing.db'
-    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-    app.config['MAIL_SERVER'] = 'smtp.gmail.com'
-    app.config['MAIL_PORT'] = 587
-    app.config['MAIL_USE_TLS'] = True
-    app.config['MAIL_USERNAME'] = 'noreply@example.com'  # Replace for production use
-    app.config['MAIL_PASSWORD'] = 'password'  # Replace for production use
-    app.config['CORS_ALLOWED_ORIGINS'] = '*'  # For development only
+    app.config.from_object(config_by_name[config_name])
+    if not app.config.get('SECRET_KEY'):
+        raise RuntimeError('SECRET_KEY must be set')
+    if not app.config.get('SQLALCHEMY_DATABASE_URI'):
+        raise RuntimeError('DATABASE_URI must be set')
+    app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', engine_options(app.config))
+    if app.config.get('REPLICA_DATABASE_URI'):
+        app.config['SQLALCHEMY_BINDS'] = {
+            **app.config.get('SQLALCHEMY_BINDS', {}),
+            REPLICA_BIND: app.config['REPLICA_DATABASE_URI']
+        }
+    
+    # Take the client address and scheme from trusted proxies (rate limits key on it)
+    proxy_count = app.config.get('TRUSTED_PROXY_COUNT', 0)
+    if proxy_count > 0:
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=proxy_count, x_proto=proxy_count)
+    
+    # Sign auth and reset tokens with the configured secret
+    serializer.secret_keys = [want_bytes(app.config['SECRET_KEY'])]
     
     # Initialize extensions with the app
     db.init_app(app)
     mail.init_app(app)
     
+    with app.app_context():
+        for engine in db.engines.values():
+            configure_sqlite(engine, app.config)
+    
+    # Read-only requests read from the replica (if one is configured)
+    app.before_request(route_read_only_requests)
+    
+    # Request, SQL and pool metrics (hooks are only installed when enabled)
+    from app.utils.metrics import metrics
+    metrics.init_app(app)
+    
+    # Slow-query log and on-demand request profiles
+    from app.utils.profiling import slow_query_log, request_profiler
+    slow_query_log.init_app(app)
+    request_profiler.init_app(app)
+    
+    from app.utils.chat_cache import chat_cache
+    chat_cache.init_app(app)
+    
+    from app.utils.typing_state import typing_coalescer
+    typing_coalescer.init_app(app)
+    
+    from app.utils.identity_cache import identity_cache
+    identity_cache.init_app(app)
+
+    from app.utils.roles import role_registry
+    role_registry.init_app(app)
+    
+    from app.utils.passwords import password_hasher
+    password_hasher.init_app(app)
+    
+    from app.utils.mail_outbox import mail_outbox
+    mail_outbox.init_app(app)
+    
+    from app.utils.rate_limit import rate_limiter
+    rate_limiter.init_app(app)
+    
+    from app.utils.write_queue import write_queue
+    write_queue.init_app(app)
+    
+    from app.utils.replica_sync import replica_sync
+    replica_sync.init_app(app)
+    
+    from app.utils.images import image_store, thumbnail_worker
+    image_store.init_app(app)
+    thumbnail_worker.init_app(app)
+    
     # Initialize Socket.IO with eventlet
+    origins = app.config['CORS_ALLOWED_ORIGINS']
+    if origins != '*':
+        origins = [origin.strip() for origin in origins.split(',')]
     socketio.init_app(
         app, 
-        cors_allowed_origins='*',  # For development only
+        cors_allowed_origins=origins,
+        message_queue=app.config['SOCKETIO_MESSAGE_QUEUE'],
         async_mode='eventlet'  # Explicitly set async mode
     )
     
     # Setup CORS
     CORS(
         app,
-        resources={r"/*": {"origins": '*'}},  # For development only
+        resources={r"/*": {"origins": origins}},
         supports_credentials=True,
         allow_headers=["Content-Type", "Authorization"]
     )
@@ -63,20 +141,33 @@ def create_app():
     from app.routes.user import user_bp
     from app.routes.chat import chat_bp
     from app.routes.ratings import ratings_bp
+    from app.routes.images import images_bp
+    from app.routes.metrics import metrics_bp
     
     app.register_blueprint(auth_bp)
     app.register_blueprint(food_bp)
     app.register_blueprint(user_bp)
     app.register_blueprint(chat_bp)
     app.register_blueprint(ratings_bp)
+    app.register_blueprint(images_bp)
+    app.register_blueprint(metrics_bp)
     
-    # Create database tables if they don't exist
-    with app.app_context():
-        from app.models.user import Role
-        from app.utils.setup import setup_roles
-        
-        db.create_all()
-        setup_roles()
+    # Register CLI commands
+    from app.commands import register_commands
+    register_commands(app)
+    
+    # Create database tables and seed data unless the schema stamp is current
+    setup_mode = app.config['DB_SETUP_MODE']
+    if setup_mode != 'never':
+        with app.app_context():
+            from app.utils.setup import prepare_database
+            
+            if prepare_database(force=(setup_mode == 'always'),
+                                lock_path=os.path.join(app.instance_path, 'setup.lock')):
+                replica_sync.sync(force=True)
+    
+    # Configure mappers now rather than on the first request
+    configure_mappers()
     
     # Add a basic route for testing
     @app.route('/')
@@ -0,0 +1,95 @@
+"""
+CLI commands for the FoodShare application.
+
+Run with ``flask --app run:app <command>`` from the backend directory.
+"""
+import click
+from flask import current_app
+
+
+@click.command('init-db')
+def init_db_command():
+    """Create tables, seed roles and stamp the schema version."""
+    from app.utils.setup import prepare_database, current_schema_version
+
+    prepare_database(force=True)
+    click.echo(f"Database prepared at schema version {current_schema_version()}")
+
+
+@click.command('archive-chats')
+@click.option('--days', type=int, default=None,
+              help='Archive messages older than this many days (default: CHAT_ARCHIVE_AFTER_DAYS).')
+@click.option('--batch-size', type=int, default=1000, help='Messages moved per transaction.')
+def archive_chats_command(days, batch_size):
+    """Move old chat messages into the compressed archive table."""
+    from app.utils.chat_archive import archive_old_messages
+
+    if days is None:
+        days = current_app.config.get('CHAT_ARCHIVE_AFTER_DAYS', 180)
+    archived = archive_old_messages(days, batch_size=batch_size)
+    click.echo(f"Archived {archived} messages older than {days} days")
+
+
+@click.command('rebuild-rating-stats')
+def rebuild_rating_stats_command():
+    """Recompute the user_rating_stats table from the ratings table."""
+    from app.utils.rating_stats import rebuild_rating_stats
+
+    users = rebuild_rating_stats()
+    click.echo(f"Rebuilt rating stats for {users} users")
+
+
+@click.command('send-mail')
+def send_mail_command():
+    """Deliver every due message in the mail outbox and exit."""
+    from app.utils.mail_outbox import mail_outbox
+
+    processed = 0
+    while True:
+        batch = mail_outbox.send_pending()
+        processed += batch
+        if batch < mail_outbox.batch_size:
+            break
+    click.echo(f"Processed {processed} messages, {mail_outbox.queue_depth()} still pending")
+
+
+@click.command('render-thumbnails')
+def render_thumbnails_command():
+    """Render thumbnails for every pending image and exit."""
+    from app.utils.images import thumbnail_worker, pillow_available
+
+    if not pillow_available():
+        raise click.ClickException('Pillow is required to render thumbnails')
+    processed = 0
+    while True:
+        batch = thumbnail_worker.process_pending()
+        processed += batch
+        if batch < thumbnail_worker.batch_size:
+            break
+    click.echo(f"Processed {processed} images ({thumbnail_worker.stats()['failed']} failed)")
+
+
+@click.command('sync-replica')
+def sync_replica_command():
+    """Copy the SQLite primary into the SQLite read replica."""
+    from app.utils.replica_sync import replica_sync
+
+    if replica_sync.paths() is None:
+        raise click.ClickException('REPLICA_DATABASE_URI must point at a SQLite file next to a SQLite primary')
+    replica_sync.sync(force=True)
+    click.echo(f"Replica synced in {replica_sync.stats()['last_sync_seconds']:.3f}s")
+
+
+def register_commands(app):
+    """
+    Register CLI commands with the application.
+    
+    Args:
+        app: Flask application instance
+    """
+    app.cli.add_command(init_db_command)
+    app.cli.add_command(archive_chats_command)
+    app.cli.add_command(rebuild_rating_stats_command)
+    app.cli.add_command(send_mail_command)
+    app.cli.add_command(render_thumbnails_command)
+    app.cli.add_command(sync_replica_command)
@@ -13,22 +13,120 @@ class Config:
     """Base configuration class."""
     
     # Flask settings
-    SECRET_KEY = os.environ.get('SECRET_KEY', 'default_development_secret_key')
+    SECRET_KEY = os.environ.get('SECRET_KEY', 'dev-secret-key-replace-in-production')
     
     # SQLAlchemy settings
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URI', 'sqlite:///resource_sharing.db')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     
+    # Connection pool settings (SQLALCHEMY_ENGINE_OPTIONS is built from these
+    # unless it is set explicitly)
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 10))
+    DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW', 20))
+    DB_POOL_TIMEOUT = float(os.environ.get('DB_POOL_TIMEOUT', 30))
+    DB_POOL_RECYCLE = int(os.environ.get('DB_POOL_RECYCLE', 1800))
+    DB_POOL_PRE_PING = os.environ.get('DB_POOL_PRE_PING', 'true').lower() == 'true'
+    
+    # SQLite pragmas applied on connect (cache_size is negative KiB, mmap_size bytes,
+    # busy_timeout milliseconds)
+    SQLITE_JOURNAL_MODE = os.environ.get('SQLITE_JOURNAL_MODE', 'WAL')
+    SQLITE_SYNCHRONOUS = os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL')
+    SQLITE_CACHE_SIZE = int(os.environ.get('SQLITE_CACHE_SIZE', -64000))
+    SQLITE_MMAP_SIZE = int(os.environ.get('SQLITE_MMAP_SIZE', 256 * 1024 * 1024))
+    SQLITE_BUSY_TIMEOUT = int(os.environ.get('SQLITE_BUSY_TIMEOUT', 5000))
+    
+    # Start-up database setup: 'auto' runs create_all and seeding only when the
+    # schema version stamp is out of date, 'always' on every start, 'never'
+    # leaves it to `flask init-db`
+    DB_SETUP_MODE = os.environ.get('DB_SETUP_MODE', 'auto')
+    
+    # Read replica (GET requests and socket history reads go here; a SQLite
+    # replica of a SQLite primary is refreshed every REPLICA_SYNC_INTERVAL seconds)
+    REPLICA_DATABASE_URI = os.environ.get('REPLICA_DATABASE_URI')
+    REPLICA_SYNC_INTERVAL = float(os.environ.get('REPLICA_SYNC_INTERVAL', 5))
+    
+    # Serialize writes through a single writer thread (for SQLite under load)
+    WRITE_QUEUE_ENABLED = os.environ.get('WRITE_QUEUE_ENABLED', 'false').lower() == 'true'
+    
     # Mail settings
-    MAIL_SERVER = 'smtp.gmail.com'
-    MAIL_PORT = 587
+    MAIL_SERVER = os.environ.get('MAIL_SERVER', 'smtp.gmail.com')
+    MAIL_PORT = int(os.environ.get('MAIL_PORT', 587))
     MAIL_USE_TLS = True
     MAIL_USERNAME = os.environ.get('MAIL_USERNAME')
     MAIL_PASSWORD = os.environ.get('MAIL_PASSWORD')
     
-    # CORS settings
+    # CORS settings (comma-separated origins or '*')
     CORS_ALLOWED_ORIGINS = os.environ.get('CORS_ALLOWED_ORIGINS', 'http://localhost:3000')
     
+    # Socket.IO message queue shared by multiple server processes (e.g. redis://)
+    SOCKETIO_MESSAGE_QUEUE = os.environ.get('SOCKETIO_MESSAGE_QUEUE')
+    
+    # Chat cache settings
+    CHAT_CACHE_MESSAGES_PER_CONVERSATION = int(os.environ.get('CHAT_CACHE_MESSAGES_PER_CONVERSATION', 200))
+    CHAT_CACHE_MAX_MESSAGES = int(os.environ.get('CHAT_CACHE_MAX_MESSAGES', 20000))
+    # Seconds a loaded conversation is served; bounds staleness across workers
+    CHAT_CACHE_TTL = float(os.environ.get('CHAT_CACHE_TTL', 5))
+    CHAT_HISTORY_PAGE_SIZE = int(os.environ.get('CHAT_HISTORY_PAGE_SIZE', 50))
+    CHAT_ARCHIVE_AFTER_DAYS = int(os.environ.get('CHAT_ARCHIVE_AFTER_DAYS', 180))
+    
+    # Typing indicator settings (seconds)
+    TYPING_STATE_TTL = float(os.environ.get('TYPING_STATE_TTL', 6.0))
+    TYPING_MIN_INTERVAL = float(os.environ.get('TYPING_MIN_INTERVAL', 0.5))
+    TYPING_SWEEP_INTERVAL = float(os.environ.get('TYPING_SWEEP_INTERVAL', 2))
+    
+    # Reputation settings (rebuild rating stats after changing the half-life)
+    REPUTATION_HALF_LIFE_DAYS = float(os.environ.get('REPUTATION_HALF_LIFE_DAYS', 180))
+    REPUTATION_PRIOR_MEAN = float(os.environ.get('REPUTATION_PRIOR_MEAN', 3.0))
+    REPUTATION_PRIOR_WEIGHT = float(os.environ.get('REPUTATION_PRIOR_WEIGHT', 5.0))
+    
+    # Identity cache settings (TTL in seconds, 0 disables)
+    IDENTITY_CACHE_SIZE = int(os.environ.get('IDENTITY_CACHE_SIZE', 10000))
+    IDENTITY_CACHE_TTL = float(os.environ.get('IDENTITY_CACHE_TTL', 60))
+    
+    # Role registry (roles change through setup/admin commits only)
+    ROLE_CACHE_TTL = float(os.environ.get('ROLE_CACHE_TTL', 300))
+    
+    # Password hashing settings (keep at or below EVENTLET_THREADPOOL_SIZE)
+    PASSWORD_HASH_CONCURRENCY = int(os.environ.get('PASSWORD_HASH_CONCURRENCY', 4))
+    # Hashes made with any other method are upgraded at the next login
+    PASSWORD_HASH_METHOD = os.environ.get('PASSWORD_HASH_METHOD', 'pbkdf2:sha256:600000')
+    
+    # Mail outbox settings (retry delay doubles from MAIL_OUTBOX_RETRY_BASE seconds)
+    MAIL_OUTBOX_BATCH_SIZE = int(os.environ.get('MAIL_OUTBOX_BATCH_SIZE', 50))
+    MAIL_OUTBOX_MAX_ATTEMPTS = int(os.environ.get('MAIL_OUTBOX_MAX_ATTEMPTS', 5))
+    MAIL_OUTBOX_RETRY_BASE = float(os.environ.get('MAIL_OUTBOX_RETRY_BASE', 30))
+    MAIL_OUTBOX_POLL_INTERVAL = float(os.environ.get('MAIL_OUTBOX_POLL_INTERVAL', 2))
+    
+    # Rate limiting (redis:// storage URL shares buckets between workers;
+    # RATELIMITS overrides per endpoint, e.g. {'auth.login': {'ip': '10/minute'}})
+    RATELIMIT_ENABLED = os.environ.get('RATELIMIT_ENABLED', 'true').lower() == 'true'
+    RATELIMIT_STORAGE_URL = os.environ.get('RATELIMIT_STORAGE_URL')
+    RATELIMITS = {}
+    
+    # Number of reverse proxies (load balancers) in front of the app whose
+    # X-Forwarded-For/-Proto headers are trusted; 0 uses the socket address
+    TRUSTED_PROXY_COUNT = int(os.environ.get('TRUSTED_PROXY_COUNT', 0))
+    
+    # Image uploads (originals and thumbnails are stored under IMAGE_UPLOAD_DIR,
+    # default instance/uploads)
+    IMAGE_UPLOAD_DIR = os.environ.get('IMAGE_UPLOAD_DIR')
+    IMAGE_MAX_BYTES = int(os.environ.get('IMAGE_MAX_BYTES', 10 * 1024 * 1024))
+    IMAGE_WORKER_BATCH_SIZE = int(os.environ.get('IMAGE_WORKER_BATCH_SIZE', 20))
+    IMAGE_WORKER_POLL_INTERVAL = float(os.environ.get('IMAGE_WORKER_POLL_INTERVAL', 2))
+    
+    # Prometheus metrics at /api/metrics (off by default; METRICS_TOKEN, if set,
+    # must be sent as a Bearer token by the scraper)
+    METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'false').lower() == 'true'
+    METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+    
+    # Log SQL statements slower than this many milliseconds (0 disables)
+    SLOW_QUERY_MS = float(os.environ.get('SLOW_QUERY_MS', 500))
+    
+    # Requests sending "X-Profile: <PROFILE_TOKEN>" are profiled into PROFILE_DIR
+    # (default instance/profiles); unset disables profiling
+    PROFILE_TOKEN = os.environ.get('PROFILE_TOKEN')
+    PROFILE_DIR = os.environ.get('PROFILE_DIR')
+    
     # Token settings
     JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY', SECRET_KEY)
     JWT_ACCESS_TOKEN_EXPIRES = 3600  # 1 hour
@@ -37,13 +135,22 @@ class Config:
 class DevelopmentConfig(Config):
     """Development configuration."""
     DEBUG = True
+    
+    MAIL_USERNAME = os.environ.get('MAIL_USERNAME', 'noreply@example.com')
+    MAIL_PASSWORD = os.environ.get('MAIL_PASSWORD', 'password')
+    CORS_ALLOWED_ORIGINS = os.environ.get('CORS_ALLOWED_ORIGINS', '*')
 
 
 class TestingConfig(Config):
     """Testing configuration."""
     TESTING = True
-    SQLALCHEMY_DATABASE_URI = 'sqlite:///test.db'
+    SQLALCHEMY_DATABASE_URI = 'sqlite://'
     WTF_CSRF_ENABLED = False
+    
+    # Every test app gets a fresh database; don't carry identities or
+    # rate-limit buckets over between them
+    IDENTITY_CACHE_TTL = 0
+    RATELIMIT_ENABLED = False
 
 
 class ProductionConfig(Config):
@@ -56,4 +163,11 @@ class ProductionConfig(Config):
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URI')
     
     # Server name is required for url_for to generate external URLs
-    SERVER_NAME = os.environ.get('SERVER_NAME')
\ No newline at end of file
+    SERVER_NAME = os.environ.get('SERVER_NAME')
+
+
+config_by_name = {
+    'development': DevelopmentConfig,
+    'testing': TestingConfig,
+    'production': ProductionConfig
+}
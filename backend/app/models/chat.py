@@ -1,11 +1,18 @@
 """
 Chat model for the FoodShare application.
 """
+import json
+import zlib
 from datetime import datetime
 from app import db
 
 class Chat(db.Model):
-    """Chat model for storing messages between users."""
+    """
+    Chat model for storing messages between users.
+    
+    Messages without a receiver belong to the group thread of their food
+    listing and are delivered to everyone who joined that thread.
+    """
     
     __tablename__ = 'chats'
     
@@ -30,4 +37,54 @@ class Chat(db.Model):
             'timestamp': self.timestamp.isoformat(),
             'isRead': self.is_read,
             'foodId': self.food_id
-        }
\ No newline at end of file
+        }
+
+class ChatArchive(db.Model):
+    """Compressed chunk of archived messages from a single conversation and month."""
+    
+    __tablename__ = 'chat_archive'
+    __table_args__ = (
+        db.Index('ix_chat_archive_conversation', 'user_low', 'user_high', 'last_message_id'),
+        db.Index('ix_chat_archive_user_high', 'user_high', 'user_low'),
+    )
+    
+    chunk_id = db.Column(db.Integer, primary_key=True)
+    user_low = db.Column(db.Integer, nullable=False)
+    user_high = db.Column(db.Integer, nullable=False)
+    period = db.Column(db.String(7), nullable=False)  # 'YYYY-MM'
+    first_message_id = db.Column(db.Integer, nullable=False)
+    last_message_id = db.Column(db.Integer, nullable=False)
+    message_count = db.Column(db.Integer, nullable=False)
+    payload = db.Column(db.LargeBinary, nullable=False)
+    archived_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f"<ChatArchive {self.chunk_id}: {self.user_low}-{self.user_high} {self.period}>"
+    
+    @classmethod
+    def from_chats(cls, key, period, chats):
+        """
+        Build an archive chunk from chat rows.
+        
+        Args:
+            key: Conversation key (user_low, user_high)
+            period: Month of the messages as 'YYYY-MM'
+            chats: Chat instances ordered by ID
+            
+        Returns:
+            ChatArchive: Unsaved archive chunk
+        """
+        messages = [chat.to_dict() for chat in chats]
+        return cls(
+            user_low=key[0],
+            user_high=key[1],
+            period=period,
+            first_message_id=messages[0]['id'],
+            last_message_id=messages[-1]['id'],
+            message_count=len(messages),
+            payload=zlib.compress(json.dumps(messages, separators=(',', ':')).encode('utf-8'))
+        )
+    
+    def messages(self):
+        """Decompress the serialized messages of this chunk, oldest first."""
+        return json.loads(zlib.decompress(self.payload).decode('utf-8'))
@@ -34,10 +34,16 @@ class FoodListing(db.Model):
     def __repr__(self):
         return f"<FoodListing {self.food_id}: {self.title}>"
     
-    def to_dict(self):
-        """Convert food listing model to dictionary."""
-        provider = User.query.get(self.provider_id)
-        return {
+    def to_dict(self, provider_rating=None, photo=None):
+        """
+        Convert food listing model to dictionary.
+        
+        Args:
+            provider_rating: Optional rating summary of the provider to embed
+            photo: Optional image URLs of the listing's first photo
+        """
+        provider = self.provider
+        data = {
             'food_id': self.food_id,
             'title': self.title,
             'description': self.description,
@@ -56,5 +62,9 @@ class FoodListing(db.Model):
                 'user_id': provider.user_id,
                 'first_name': provider.first_name,
                 'last_name': provider.last_name
-            } if provider else None
-        }
\ No newline at end of file
+            } if provider else None,
+            'photo': photo
+        }
+        if provider_rating is not None and data['provider']:
+            data['provider']['rating'] = provider_rating
+        return data
\ No newline at end of file
@@ -0,0 +1,51 @@
+"""
+Image model for the FoodShare application.
+"""
+from datetime import datetime
+from app import db
+
+class Image(db.Model):
+    """
+    Image attached to a resource (a food listing or a user's profile).
+
+    Files are content-addressed: rows with the same sha256 share one stored
+    original and one set of thumbnails.
+    """
+
+    __tablename__ = 'images'
+    __table_args__ = (
+        db.Index('ix_images_resource', 'resource_type', 'resource_id'),
+    )
+
+    image_id = db.Column(db.Integer, primary_key=True)
+    uploader_id = db.Column(db.Integer, db.ForeignKey('users.user_id'))
+    resource_id = db.Column(db.Integer)
+    resource_type = db.Column(db.String)  # 'food' or 'profile'
+    caption = db.Column(db.String)
+    sha256 = db.Column(db.String(64), nullable=False, index=True)
+    content_type = db.Column(db.String, nullable=False)
+    size_bytes = db.Column(db.Integer)
+    width = db.Column(db.Integer)
+    height = db.Column(db.Integer)
+    status = db.Column(db.String, nullable=False, default='pending')  # thumbnails: 'pending', 'ready', 'failed'
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<Image {self.image_id}: {self.sha256[:12]} ({self.status})>"
+
+    def to_dict(self):
+        """Convert image model to dictionary."""
+        from app.utils.images import image_urls
+        return {
+            'image_id': self.image_id,
+            'resource_id': self.resource_id,
+            'resource_type': self.resource_type,
+            'caption': self.caption,
+            'content_type': self.content_type,
+            'size_bytes': self.size_bytes,
+            'width': self.width,
+            'height': self.height,
+            'status': self.status,
+            'urls': image_urls(self.sha256),
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        }
@@ -0,0 +1,32 @@
+"""
+Mail outbox model for the FoodShare application.
+"""
+from datetime import datetime
+from app import db
+
+class OutboxMessage(db.Model):
+    """Outgoing email waiting to be delivered by the background mail sender."""
+    
+    __tablename__ = 'mail_outbox'
+    __table_args__ = (
+        db.Index('ix_mail_outbox_due', 'status', 'next_attempt_at'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    subject = db.Column(db.String, nullable=False)
+    sender = db.Column(db.String)
+    recipients = db.Column(db.Text, nullable=False)  # comma-separated addresses
+    body = db.Column(db.Text)
+    status = db.Column(db.String, nullable=False, default='pending')  # 'pending', 'sent', 'failed'
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    next_attempt_at = db.Column(db.DateTime, default=datetime.utcnow)
+    last_error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    sent_at = db.Column(db.DateTime)
+    
+    def __repr__(self):
+        return f"<OutboxMessage {self.id}: {self.subject} ({self.status})>"
+    
+    def recipient_list(self):
+        """Get the recipients as a list of addresses."""
+        return [address for address in self.recipients.split(',') if address]
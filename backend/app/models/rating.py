@@ -4,14 +4,22 @@ Rating model for the FoodShare application.
 from datetime import datetime
 from app import db
 
+# Valid rating scores (star ratings)
+RATING_SCORES = (1, 2, 3, 4, 5)
+
 class Rating(db.Model):
     """Rating model for storing user and item ratings."""
     
     __tablename__ = 'ratings'
+    __table_args__ = (
+        # One rating per giver, receiver and resource
+        db.Index('uq_ratings_giver_receiver_resource',
+                 'giver_id', 'receiver_id', 'resource_id', 'resource_type', unique=True),
+    )
 
     rating_id = db.Column(db.Integer, primary_key=True)
     giver_id = db.Column(db.Integer, db.ForeignKey('users.user_id'))
-    receiver_id = db.Column(db.Integer, db.ForeignKey('users.user_id'))
+    receiver_id = db.Column(db.Integer, db.ForeignKey('users.user_id'), index=True)
     resource_id = db.Column(db.Integer, nullable=False)
     resource_type = db.Column(db.String, nullable=False)  # 'food', 'book', 'delivery', 'user'
     score = db.Column(db.Integer, nullable=False)
@@ -36,4 +44,50 @@ class Rating(db.Model):
             'score': self.score,
             'comment': self.comment,
             'created_at': self.created_at.isoformat()
-        }
\ No newline at end of file
+        }
+
+class UserRatingStats(db.Model):
+    """Materialized rating aggregates of a user, kept in step with the ratings table."""
+    
+    __tablename__ = 'user_rating_stats'
+    
+    user_id = db.Column(db.Integer, db.ForeignKey('users.user_id'), primary_key=True)
+    score_sum = db.Column(db.Integer, nullable=False, default=0)
+    rating_count = db.Column(db.Integer, nullable=False, default=0)
+    score_1 = db.Column(db.Integer, nullable=False, default=0)
+    score_2 = db.Column(db.Integer, nullable=False, default=0)
+    score_3 = db.Column(db.Integer, nullable=False, default=0)
+    score_4 = db.Column(db.Integer, nullable=False, default=0)
+    score_5 = db.Column(db.Integer, nullable=False, default=0)
+    # Forward-decayed totals, see app.utils.reputation
+    decayed_score_sum = db.Column(db.Float, nullable=False, default=0.0)
+    decayed_weight = db.Column(db.Float, nullable=False, default=0.0)
+    last_updated = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f"<UserRatingStats {self.user_id}: {self.score_sum}/{self.rating_count}>"
+    
+    @property
+    def average(self):
+        """Average score, or 0 if the user has no ratings."""
+        return self.score_sum / self.rating_count if self.rating_count else 0
+    
+    def reputation(self, now=None):
+        """Time-decayed, prior-smoothed reputation score."""
+        from app.utils.reputation import reputation_score
+        return reputation_score(self.decayed_score_sum, self.decayed_weight, now=now)
+    
+    def histogram(self):
+        """Number of ratings per score, keyed by score."""
+        return {score: getattr(self, f'score_{score}') for score in RATING_SCORES}
+    
+    def to_dict(self):
+        """Convert rating stats model to dictionary."""
+        return {
+            'user_id': self.user_id,
+            'average_rating': round(self.average, 1),
+            'rating_count': self.rating_count,
+            'reputation': round(self.reputation(), 2),
+            'histogram': self.histogram(),
+            'last_updated': self.last_updated.isoformat() if self.last_updated else None
+        }
@@ -32,7 +32,7 @@ class User(db.Model):
     is_active = db.Column(db.Boolean, default=True)
     verification_token = db.Column(db.String)
     role_id = db.Column(db.Integer, db.ForeignKey('roles.role_id'))
-    role = db.relationship("Role", back_populates="users")
+    role = db.relationship("Role", back_populates="users", lazy="joined")
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     profile_picture = db.Column(db.String)
@@ -50,12 +50,13 @@ class User(db.Model):
     
     def to_dict(self):
         """Convert user model to dictionary."""
+        from app.utils.roles import role_registry
         return {
             'user_id': self.user_id,
             'email': self.email,
             'first_name': self.first_name,
             'last_name': self.last_name,
-            'role': self.role.name if self.role else None,
+            'role': role_registry.name_for(self.role_id),
             'phone_number': self.phone_number,
             'major': self.major,
             'profile_picture': self.profile_picture,
@@ -2,15 +2,18 @@
 Authentication routes for the FoodShare application.
 """
 from flask import Blueprint, request, jsonify, session
-from werkzeug.security import generate_password_hash, check_password_hash
-from app import db, serializer, mail
-from app.models.user import User, Role
+from app import db, serializer
+from app.models.user import User
 from app.utils.auth import get_current_user
-from flask_mail import Message
+from app.utils.passwords import password_hasher
+from app.utils.roles import role_registry
+from app.utils.mail_outbox import queue_mail
+from app.utils.rate_limit import rate_limiter, request_email
 
 auth_bp = Blueprint('auth', __name__, url_prefix='/api')
 
 @auth_bp.route('/signup', methods=['POST'])
+@rate_limiter.limit(ip='10/hour')
 def signup():
     """
     Register a new user.
@@ -31,8 +34,8 @@ def signup():
             return jsonify({'error': 'Email already registered.'}), 400
         
         # Create new user
-        hashed_pw = generate_password_hash(data.get('password'))
-        role = Role.query.filter_by(name=data.get('role')).first()
+        hashed_pw = password_hasher.hash(data.get('password'))
+        role_id = role_registry.id_for(data.get('role'))
         
         user = User(
             email=email,
@@ -41,7 +44,7 @@ def signup():
             last_name=data.get('last_name'),
             phone_number=data.get('phone_number'),
             major=data.get('major'),
-            role=role,
+            role_id=role_id,
             is_active=True
         )
         
@@ -66,6 +69,7 @@ def signup():
 
 
 @auth_bp.route('/login', methods=['POST'])
+@rate_limiter.limit(ip='20/minute', user='5/minute', user_key=request_email)
 def login():
     """
     Log in a user.
@@ -81,7 +85,10 @@ def login():
         user = User.query.filter_by(email=email).first()
         
         # Check credentials
-        if user and check_password_hash(user.password_hash, password):
+        if user and password_hasher.verify(user.password_hash, password):
+            if password_hasher.needs_rehash(user.password_hash):
+                upgrade_password_hash(user, password)
+            
             session['user_id'] = user.user_id
             
             # Generate token
@@ -99,6 +106,24 @@ def login():
         return jsonify({'error': str(e)}), 500
 
 
+def upgrade_password_hash(user, password):
+    """
+    Replace a legacy password hash after a successful login.
+    
+    A failure is logged and leaves the old hash in place; the login proceeds.
+    
+    Args:
+        user: User who just logged in
+        password: The verified plain-text password
+    """
+    try:
+        user.password_hash = password_hasher.hash(password)
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        print(f"Password hash upgrade error: {str(e)}")
+
+
 @auth_bp.route('/logout', methods=['GET'])
 def logout():
     """
@@ -131,18 +156,18 @@ def reset_password_request():
             # Create reset URL (would use url_for with _external=True in production)
             reset_url = f"{request.host_url}reset_password/{token}"
             
-            # Send email
-            msg = Message(
+            # Queue email; the background mail sender delivers it
+            queue_mail(
                 'Reset Your Password',
-                sender=mail.username,
-                recipients=[email]
+                recipients=[email],
+                body=f'Click the link to reset your password: {reset_url}'
             )
-            msg.body = f'Click the link to reset your password: {reset_url}'
-            mail.send(msg)
+            db.session.commit()
             
             return jsonify({'message': 'Password reset email sent'}), 200
         
         return jsonify({'error': 'Email not found'}), 404
         
     except Exception as e:
+        db.session.rollback()
         return jsonify({'error': str(e)}), 500
\ No newline at end of file
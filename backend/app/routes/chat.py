@@ -7,6 +7,8 @@ from app.models.chat import Chat
 from app.models.user import User
 from app.models.food import FoodListing
 from app.utils.auth import get_current_user
+from app.utils.chat_archive import latest_archived_messages
+from app.utils.chat_search import search_available, search_messages
 
 chat_bp = Blueprint('chat', __name__, url_prefix='/api')
 
@@ -24,7 +26,8 @@ def get_chat_list(user_id):
     try:
         # Get all chats involving the user
         chats = Chat.query.filter(
-            (Chat.sender_id == user_id) | (Chat.receiver_id == user_id)
+            (Chat.sender_id == user_id) | (Chat.receiver_id == user_id),
+            Chat.receiver_id.isnot(None)
         ).order_by(Chat.timestamp.desc()).all()
         
         # Group chats by conversation (other user)
@@ -44,12 +47,31 @@ def get_chat_list(user_id):
             # Add message to conversation
             conversations[other_user_id]['messages'].append(chat.to_dict())
         
+        # Conversations whose messages have all been archived
+        archived = latest_archived_messages(user_id, exclude=conversations)
+        for other_user_id, message in sorted(archived.items(), key=lambda item: item[1]['id'], reverse=True):
+            conversations[other_user_id] = {
+                'otherUserId': other_user_id,
+                'messages': [message],
+                'foodId': message['foodId']
+            }
+        
+        # Load the other users and listings of every conversation at once
+        users = {
+            user.user_id: user
+            for user in User.query.filter(User.user_id.in_(list(conversations)))
+        } if conversations else {}
+        food_ids = {convo['foodId'] for convo in conversations.values() if convo['foodId']}
+        foods = {
+            food.food_id: food
+            for food in FoodListing.query.filter(FoodListing.food_id.in_(food_ids))
+        } if food_ids else {}
+        
         # Format conversations for response
         result = []
         for other_user_id, convo in conversations.items():
-            # Get other user and food info
-            other_user = User.query.get(other_user_id)
-            food = FoodListing.query.get(convo['foodId']) if convo['foodId'] else None
+            other_user = users.get(other_user_id)
+            food = foods.get(convo['foodId'])
             
             if other_user:
                 result.append({
@@ -65,4 +87,45 @@ def get_chat_list(user_id):
         return jsonify({'conversations': result}), 200
         
     except Exception as e:
-        return jsonify({'error': f'Failed to fetch conversations: {str(e)}'}), 500
\ No newline at end of file
+        return jsonify({'error': f'Failed to fetch conversations: {str(e)}'}), 500
+
+@chat_bp.route('/chats/search', methods=['GET'])
+def search_chats():
+    """
+    Search the current user's chat history.
+    
+    Query parameters:
+        q: Search text
+        cursor: Cursor from the previous page of results
+        limit: Maximum number of results (default: 20, max: 50)
+        
+    Returns:
+        JSON response with ranked message snippets; archived messages are
+        not searched (see archiveSearched and archivedThrough)
+    """
+    current_user = get_current_user()
+    if not current_user:
+        return jsonify({'error': 'Not authenticated'}), 401
+    
+    if not search_available():
+        return jsonify({'error': 'Chat search is not available'}), 501
+    
+    search_query = request.args.get('q', '').strip()
+    if not search_query:
+        return jsonify({'error': 'Search query is required'}), 400
+    
+    limit = min(max(request.args.get('limit', 20, type=int), 1), 50)
+    
+    try:
+        page = search_messages(
+            current_user.user_id,
+            search_query,
+            cursor=request.args.get('cursor'),
+            limit=limit
+        )
+        return jsonify(page), 200
+        
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': f'Failed to search chats: {str(e)}'}), 500
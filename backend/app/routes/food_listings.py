@@ -4,15 +4,63 @@ Food listing routes for the FoodShare application.
 from datetime import datetime, timedelta
 from flask import Blueprint, request, jsonify
 from sqlalchemy import func
+from sqlalchemy.orm import selectinload
 from math import radians, cos, sin, asin, sqrt
 from app import db
 from app.models.food import FoodListing
 from app.models.user import User
 from app.utils.auth import get_current_user
+from app.utils.rating_stats import get_rating_stats_many, rating_summary
+from app.utils.reputation import reputation_score
+from app.utils.rate_limit import rate_limiter
+from app.utils.images import listing_photos
+from app.utils.write_queue import write_queue
 
 food_bp = Blueprint('food', __name__, url_prefix='/api')
 
+LISTING_UPDATE_FIELDS = (
+    'title', 'description', 'food_type', 'quantity', 'unit', 'allergens',
+    'pickup_location', 'pickup_latitude', 'pickup_longitude', 'status'
+)
+
+
+def serialize_listings(listings, include_rating=False, stats_by_user=None):
+    """
+    Serialize food listings with their photo, optionally embedding each
+    provider's rating.
+    
+    Photos and provider ratings are fetched with one query each for the
+    whole page.
+    
+    Args:
+        listings: FoodListing instances
+        include_rating: Whether to embed provider rating summaries
+        stats_by_user: Provider rating stats already loaded by the caller
+        
+    Returns:
+        list: Serialized food listings
+    """
+    photos = listing_photos(food.food_id for food in listings)
+    if not include_rating:
+        return [food.to_dict(photo=photos.get(food.food_id)) for food in listings]
+    
+    if stats_by_user is None:
+        stats_by_user = get_rating_stats_many(food.provider_id for food in listings if food.provider_id)
+    return [
+        food.to_dict(
+            provider_rating=rating_summary(stats_by_user.get(food.provider_id)),
+            photo=photos.get(food.food_id)
+        )
+        for food in listings
+    ]
+
+
+def wants_rating():
+    """Check whether the request asked for embedded provider ratings."""
+    return request.args.get('include_rating', '').lower() in ('1', 'true', 'yes')
+
 @food_bp.route('/food_listings', methods=['GET'])
+@rate_limiter.limit(ip='60/minute', user='30/minute', when=lambda: bool(request.args.get('q')))
 def get_food_listings():
     """
     Get food listings with optional filtering.
@@ -25,6 +73,8 @@ def get_food_listings():
         min_expiration_days: Minimum days until expiration
         latitude: User latitude for distance calculation
         longitude: User longitude for distance calculation
+        include_rating: Embed each provider's average rating
+        sort: 'newest' (default) or 'reputation' to rank by provider reputation
         
     Returns:
         JSON response with filtered food listings
@@ -39,8 +89,8 @@ def get_food_listings():
         latitude = request.args.get('latitude', type=float)
         longitude = request.args.get('longitude', type=float)
 
-        # Build base query
-        query = FoodListing.query.filter_by(status=status)
+        # Build base query (providers are loaded for the whole page at once)
+        query = FoodListing.query.options(selectinload(FoodListing.provider)).filter_by(status=status)
         
         # Apply food type filter
         if food_type and food_type.lower() != 'all':
@@ -99,8 +149,22 @@ def get_food_listings():
         # Sort by created_at
         filtered_listings.sort(key=lambda x: x.created_at, reverse=True)
         
+        # Rank by provider reputation, newest first among equals
+        stats_by_user = None
+        if request.args.get('sort') == 'reputation':
+            stats_by_user = get_rating_stats_many(
+                food.provider_id for food in filtered_listings if food.provider_id
+            )
+            unrated = reputation_score(0, 0)
+            filtered_listings.sort(
+                key=lambda x: stats_by_user[x.provider_id].reputation() if x.provider_id in stats_by_user else unrated,
+                reverse=True
+            )
+        
         return jsonify({
-            'food_listings': [food.to_dict() for food in filtered_listings]
+            'food_listings': serialize_listings(
+                filtered_listings, include_rating=wants_rating(), stats_by_user=stats_by_user
+            )
         }), 200
         
     except Exception as e:
@@ -146,8 +210,12 @@ def create_food_listing():
         if 'available_until' in data and data['available_until']:
             new_food.available_until = datetime.fromisoformat(data['available_until'].replace('Z', '+00:00'))
         
-        db.session.add(new_food)
-        db.session.commit()
+        def save_listing():
+            db.session.add(new_food)
+            db.session.flush()
+            return new_food.food_id
+        
+        new_food = db.session.get(FoodListing, write_queue.execute(save_listing))
         
         return jsonify({
             'message': 'Food listing created successfully',
@@ -174,7 +242,7 @@ def get_food_listing(food_id):
     if not food:
         return jsonify({'error': 'Food listing not found'}), 404
     
-    return jsonify({'food': food.to_dict()}), 200
+    return jsonify({'food': serialize_listings([food], include_rating=wants_rating())[0]}), 200
 
 
 @food_bp.route('/food_listings/<int:food_id>', methods=['PUT'])
@@ -205,41 +273,30 @@ def update_food_listing(food_id):
     try:
         data = request.json
         
-        # Update fields if provided
-        if 'title' in data:
-            food.title = data['title']
-        if 'description' in data:
-            food.description = data['description']
-        if 'food_type' in data:
-            food.food_type = data['food_type']
-        if 'quantity' in data:
-            food.quantity = data['quantity']
-        if 'unit' in data:
-            food.unit = data['unit']
-        if 'allergens' in data:
-            food.allergens = data['allergens']
-        if 'pickup_location' in data:
-            food.pickup_location = data['pickup_location']
-        if 'pickup_latitude' in data:
-            food.pickup_latitude = data['pickup_latitude']
-        if 'pickup_longitude' in data:
-            food.pickup_longitude = data['pickup_longitude']
-        if 'status' in data:
-            food.status = data['status']
+        def apply_updates():
+            # The listing may have been deleted since the checks above
+            listing = db.session.get(FoodListing, food_id)
+            if listing is None:
+                return False
             
-        # Parse date strings
-        if 'expiration_date' in data and data['expiration_date']:
-            food.expiration_date = datetime.fromisoformat(data['expiration_date'].replace('Z', '+00:00'))
-        if 'available_from' in data and data['available_from']:
-            food.available_from = datetime.fromisoformat(data['available_from'].replace('Z', '+00:00'))
-        if 'available_until' in data and data['available_until']:
-            food.available_until = datetime.fromisoformat(data['available_until'].replace('Z', '+00:00'))
+            # Update fields if provided
+            for field in LISTING_UPDATE_FIELDS:
+                if field in data:
+                    setattr(listing, field, data[field])
+            
+            # Parse date strings
+            for field in ('expiration_date', 'available_from', 'available_until'):
+                if field in data and data[field]:
+                    setattr(listing, field, datetime.fromisoformat(data[field].replace('Z', '+00:00')))
+            return True
         
-        db.session.commit()
+        if not write_queue.execute(apply_updates):
+            return jsonify({'error': 'Food listing not found'}), 404
+        food = db.session.get(FoodListing, food_id)
         
         return jsonify({
             'message': 'Food listing updated successfully',
-            'food': food.to_dict()
+            'food': serialize_listings([food])[0]
         }), 200
         
     except Exception as e:
@@ -272,9 +329,17 @@ def delete_food_listing(food_id):
     if food.provider_id != current_user.user_id:
         return jsonify({'error': 'Not authorized to delete this listing'}), 403
     
+    def delete_listing():
+        # The listing may have been deleted since the checks above
+        listing = db.session.get(FoodListing, food_id)
+        if listing is None:
+            return False
+        db.session.delete(listing)
+        return True
+    
     try:
-        db.session.delete(food)
-        db.session.commit()
+        if not write_queue.execute(delete_listing):
+            return jsonify({'error': 'Food listing not found'}), 404
         
         return jsonify({'message': 'Food listing deleted successfully'}), 200
         
@@ -295,10 +360,11 @@ def get_posts_by_user(user_id):
         JSON response with user's food listings
     """
     try:
-        listings = FoodListing.query.filter_by(provider_id=user_id).order_by(FoodListing.created_at.desc()).all()
+        listings = FoodListing.query.options(selectinload(FoodListing.provider)) \
+            .filter_by(provider_id=user_id).order_by(FoodListing.created_at.desc()).all()
         
         return jsonify({
-            'food_listings': [food.to_dict() for food in listings]
+            'food_listings': serialize_listings(listings, include_rating=wants_rating())
         }), 200
         
     except Exception as e:
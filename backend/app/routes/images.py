@@ -0,0 +1,166 @@
+"""
+Image routes for the FoodShare application.
+"""
+import os
+import re
+from flask import Blueprint, request, jsonify, send_file, redirect
+from app import db
+from app.models.food import FoodListing
+from app.models.image import Image
+from app.utils.auth import get_current_user, invalidate_user
+from app.utils.images import image_store, image_urls, THUMBNAIL_SIZES
+from app.utils.rate_limit import rate_limiter
+from app.utils.database import primary_reads
+
+images_bp = Blueprint('images', __name__, url_prefix='/api')
+
+SHA256_PATTERN = re.compile(r'^[0-9a-f]{64}$')
+
+# Content-addressed files never change, so clients may cache them forever
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+
+
+@images_bp.route('/images', methods=['POST'])
+@rate_limiter.limit(ip='60/hour', user='30/hour')
+def upload_image():
+    """
+    Upload a photo for a food listing or the current user's profile picture.
+
+    Expects multipart form data with an ``image`` file, ``resource_type``
+    ('food' or 'profile'), ``resource_id`` for food listings and an optional
+    ``caption``.
+
+    Returns:
+        JSON response with the stored image
+    """
+    current_user = get_current_user()
+    if not current_user:
+        return jsonify({'error': 'Not authenticated'}), 401
+
+    upload = request.files.get('image')
+    if upload is None:
+        return jsonify({'error': 'No image file provided'}), 400
+
+    resource_type = request.form.get('resource_type')
+    if resource_type == 'food':
+        try:
+            resource_id = int(request.form.get('resource_id'))
+        except (TypeError, ValueError):
+            return jsonify({'error': 'resource_id is required for food images'}), 400
+        listing = db.session.get(FoodListing, resource_id)
+        if not listing:
+            return jsonify({'error': 'Food listing not found'}), 404
+        if listing.provider_id != current_user.user_id:
+            return jsonify({'error': 'Not authorized to add photos to this listing'}), 403
+    elif resource_type == 'profile':
+        resource_id = current_user.user_id
+    else:
+        return jsonify({'error': "resource_type must be 'food' or 'profile'"}), 400
+
+    try:
+        sha256, size_bytes, content_type = image_store.save(upload.stream)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    try:
+        # Reuse the thumbnails of identical content uploaded before
+        rendered = Image.query.filter(Image.sha256 == sha256, Image.status != 'pending').first()
+
+        image = Image(
+            uploader_id=current_user.user_id,
+            resource_id=resource_id,
+            resource_type=resource_type,
+            caption=request.form.get('caption'),
+            sha256=sha256,
+            content_type=content_type,
+            size_bytes=size_bytes,
+            status=rendered.status if rendered else 'pending',
+            width=rendered.width if rendered else None,
+            height=rendered.height if rendered else None
+        )
+
+        if resource_type == 'profile':
+            Image.query.filter_by(resource_type='profile', resource_id=resource_id).delete()
+            current_user.profile_picture = image_urls(sha256)['medium']
+
+        db.session.add(image)
+        db.session.commit()
+
+        if resource_type == 'profile':
+            invalidate_user(current_user.user_id)
+
+        return jsonify({
+            'message': 'Image uploaded successfully',
+            'image': image.to_dict()
+        }), 201
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': f'Failed to upload image: {str(e)}'}), 500
+
+
+@images_bp.route('/food_listings/<int:food_id>/images', methods=['GET'])
+def get_listing_images(food_id):
+    """
+    Get the photos of a food listing.
+
+    Args:
+        food_id: ID of the food listing
+
+    Returns:
+        JSON response with the listing's images
+    """
+    images = Image.query.filter_by(resource_type='food', resource_id=food_id) \
+        .order_by(Image.image_id) \
+        .all()
+    return jsonify({'images': [image.to_dict() for image in images]}), 200
+
+
+@images_bp.route('/images/<sha256>', methods=['GET'])
+@images_bp.route('/images/<sha256>/<size>', methods=['GET'])
+@primary_reads()
+def serve_image(sha256, size='original'):
+    """
+    Serve a stored original or thumbnail.
+
+    Files are sent with the server's file wrapper (sendfile where available)
+    and immutable cache headers. A thumbnail that has not been rendered yet
+    redirects to the original without being cached.
+
+    Args:
+        sha256: Content hash of the image
+        size: 'original' or a thumbnail size name
+
+    Returns:
+        The image file
+    """
+    if not SHA256_PATTERN.match(sha256) or (size != 'original' and size not in THUMBNAIL_SIZES):
+        return jsonify({'error': 'Image not found'}), 404
+
+    image = Image.query.filter_by(sha256=sha256).first()
+    if not image:
+        return jsonify({'error': 'Image not found'}), 404
+
+    if size == 'original':
+        path, mimetype = image_store.original_path(sha256), image.content_type
+    else:
+        path, mimetype = image_store.thumbnail_path(sha256, size), 'image/jpeg'
+        if image.status != 'ready' or not os.path.isfile(path):
+            response = redirect(image_urls(sha256)['original'])
+            response.cache_control.no_cache = True
+            return response
+
+    if not os.path.isfile(path):
+        return jsonify({'error': 'Image not found'}), 404
+
+    response = send_file(
+        path,
+        mimetype=mimetype,
+        etag=f'{sha256}-{size}',
+        max_age=IMMUTABLE_MAX_AGE,
+        conditional=True
+    )
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    return response
+
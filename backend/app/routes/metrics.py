@@ -0,0 +1,27 @@
+"""
+Metrics routes for the FoodShare application.
+"""
+import hmac
+from flask import Blueprint, request, jsonify, Response
+from app.utils.metrics import metrics, PROMETHEUS_CONTENT_TYPE
+
+metrics_bp = Blueprint('metrics', __name__, url_prefix='/api')
+
+
+@metrics_bp.route('/metrics', methods=['GET'])
+def get_metrics():
+    """
+    Expose request, database and Socket.IO metrics for Prometheus.
+
+    Returns:
+        Prometheus text exposition, or 404 when metrics are disabled
+    """
+    if not metrics.enabled:
+        return jsonify({'error': 'Metrics are disabled'}), 404
+
+    if metrics.token:
+        supplied = request.headers.get('Authorization', '').removeprefix('Bearer ')
+        if not hmac.compare_digest(supplied.encode(), metrics.token.encode()):
+            return jsonify({'error': 'Not authorized'}), 401
+
+    return Response(metrics.render(), content_type=PROMETHEUS_CONTENT_TYPE)
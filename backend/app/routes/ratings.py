@@ -2,17 +2,65 @@
 Rating routes for the FoodShare application.
 """
 from flask import Blueprint, request, jsonify
-from sqlalchemy import func
 from app import db
-from app.models.rating import Rating
+from app.models.rating import RATING_SCORES
 from app.utils.auth import get_current_user
+from app.utils.rating_stats import (
+    save_rating, find_existing_ratings, get_rating_stats, get_rating_stats_many, rating_summary
+)
+from app.utils.write_queue import write_queue
 
 ratings_bp = Blueprint('ratings', __name__, url_prefix='/api')
 
+# Maximum number of users per batch rating lookup
+MAX_BATCH_RATING_IDS = 500
+
+# Maximum number of ratings per batch existence check
+MAX_BATCH_RATING_CHECKS = 200
+
+RATING_KEY_FIELDS = ('giver_id', 'receiver_id', 'resource_id', 'resource_type')
+
+
+def parse_rating_key(item):
+    """
+    Validate and normalize the key fields of a rating object.
+    
+    IDs may be given as integers or numeric strings; the resource type as a
+    string (or an integer, which is converted).
+    
+    Args:
+        item: Rating object from the request body
+        
+    Returns:
+        tuple: (giver_id, receiver_id, resource_id, resource_type) as (int, int, int, str)
+        
+    Raises:
+        ValueError: If a field is missing or has the wrong type
+    """
+    key = []
+    for field in RATING_KEY_FIELDS[:3]:
+        value = item.get(field)
+        try:
+            if isinstance(value, bool) or not isinstance(value, (int, str)):
+                raise ValueError
+            key.append(int(value))
+        except ValueError:
+            raise ValueError(f'{field} must be an integer')
+    
+    resource_type = item.get('resource_type')
+    if isinstance(resource_type, bool) or not isinstance(resource_type, (int, str)):
+        raise ValueError('resource_type must be a string')
+    key.append(str(resource_type))
+    return tuple(key)
+
+
 @ratings_bp.route('/ratings', methods=['POST'])
 def submit_rating():
     """
-    Submit a new rating.
+    Submit a rating.
+    
+    Submitting again for the same giver, receiver and resource replaces
+    the earlier score and comment.
     
     Returns:
         JSON response confirming the rating submission
@@ -20,20 +68,29 @@ def submit_rating():
     try:
         data = request.json
         
-        # Create rating
-        rating = Rating(
-            giver_id=data['giver_id'],
-            receiver_id=data['receiver_id'],
-            resource_id=data['resource_id'],
-            resource_type=data['resource_type'],
-            score=data['score'],
-            comment=data.get('comment', '')
-        )
+        # 5.0 and True compare equal to valid scores, so check the type too
+        score = data.get('score')
+        if type(score) is not int or score not in RATING_SCORES:
+            return jsonify({'error': 'Score must be an integer from 1 to 5'}), 400
         
-        db.session.add(rating)
-        db.session.commit()
+        try:
+            giver_id, receiver_id, resource_id, resource_type = parse_rating_key(data)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
-        return jsonify({'message': 'Rating submitted successfully'}), 201
+        # Create or update rating
+        created = write_queue.execute(lambda: save_rating(
+            giver_id=giver_id,
+            receiver_id=receiver_id,
+            resource_id=resource_id,
+            resource_type=resource_type,
+            score=score,
+            comment=data.get('comment', '')
+        )[1])
+        
+        if created:
+            return jsonify({'message': 'Rating submitted successfully'}), 201
+        return jsonify({'message': 'Rating updated successfully'}), 200
         
     except Exception as e:
         db.session.rollback()
@@ -52,19 +109,47 @@ def get_average_user_rating(user_id):
         JSON response with the user's average rating
     """
     try:
-        # Calculate average rating
-        avg_rating = db.session.query(func.avg(Rating.score)) \
-            .filter(Rating.receiver_id == user_id) \
-            .scalar()
+        stats = get_rating_stats(user_id)
+        
+        return jsonify({
+            **rating_summary(stats),
+            'histogram': stats.histogram() if stats else {score: 0 for score in RATING_SCORES}
+        })
         
-        # Count total ratings
-        count = db.session.query(func.count(Rating.rating_id)) \
-            .filter(Rating.receiver_id == user_id) \
-            .scalar()
+    except Exception as e:
+        return jsonify({'error': str(e)}), 400
+
+
+@ratings_bp.route('/users/ratings', methods=['GET'])
+def get_user_ratings_batch():
+    """
+    Get the average ratings of many users at once.
+    
+    Query parameters:
+        ids: Comma-separated user IDs (at most MAX_BATCH_RATING_IDS)
+        
+    Returns:
+        JSON response with average rating and count keyed by user ID
+    """
+    try:
+        raw_ids = [part for part in request.args.get('ids', '').split(',') if part.strip()]
+        user_ids = {int(part) for part in raw_ids}
+    except ValueError:
+        return jsonify({'error': 'ids must be a comma-separated list of user IDs'}), 400
+    
+    if not user_ids:
+        return jsonify({'error': 'ids is required'}), 400
+    if len(user_ids) > MAX_BATCH_RATING_IDS:
+        return jsonify({'error': f'At most {MAX_BATCH_RATING_IDS} ids are allowed'}), 400
+    
+    try:
+        stats_by_user = get_rating_stats_many(user_ids)
         
         return jsonify({
-            'average_rating': round(avg_rating, 1) if avg_rating else 0,
-            'rating_count': count
+            'ratings': {
+                str(user_id): rating_summary(stats_by_user.get(user_id))
+                for user_id in sorted(user_ids)
+            }
         })
         
     except Exception as e:
@@ -74,23 +159,38 @@ def get_average_user_rating(user_id):
 @ratings_bp.route('/ratings/check', methods=['POST'])
 def check_rating_exists():
     """
-    Check if a rating already exists.
+    Check if ratings already exist.
+    
+    Accepts either a single object with giver_id, receiver_id, resource_id
+    and resource_type, or a JSON array of such objects (at most
+    MAX_BATCH_RATING_CHECKS) which are all answered with one query.
     
     Returns:
-        JSON response indicating whether the rating exists
+        JSON response indicating whether each rating exists
     """
-    data = request.get_json()
-    giver_id = data.get("giver_id")
-    receiver_id = data.get("receiver_id")
-    resource_id = data.get("resource_id")
-    resource_type = data.get("resource_type")
-
-    # Check if rating exists
-    existing_rating = Rating.query.filter_by(
-        giver_id=giver_id,
-        receiver_id=receiver_id,
-        resource_id=resource_id,
-        resource_type=resource_type
-    ).first()
-
-    return jsonify({"already_rated": existing_rating is not None})
\ No newline at end of file
+    data = request.get_json(silent=True)
+    
+    if isinstance(data, dict):
+        try:
+            key = parse_rating_key(data)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        return jsonify({"already_rated": key in find_existing_ratings([key])})
+    
+    if not isinstance(data, list) or not all(isinstance(item, dict) for item in data):
+        return jsonify({'error': 'Expected a rating object or an array of rating objects'}), 400
+    if len(data) > MAX_BATCH_RATING_CHECKS:
+        return jsonify({'error': f'At most {MAX_BATCH_RATING_CHECKS} ratings can be checked at once'}), 400
+    
+    try:
+        keys = [parse_rating_key(item) for item in data]
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    existing = find_existing_ratings(keys)
+    
+    return jsonify({
+        "results": [
+            {**dict(zip(RATING_KEY_FIELDS, key)), "already_rated": key in existing}
+            for key in keys
+        ]
+    })
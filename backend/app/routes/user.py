@@ -5,7 +5,7 @@ from flask import Blueprint, request, jsonify
 from app import db
 from app.models.user import User
 from app.models.food import FoodListing
-from app.utils.auth import get_current_user
+from app.utils.auth import get_current_user, invalidate_user
 
 user_bp = Blueprint('user', __name__, url_prefix='/api')
 
@@ -68,6 +68,7 @@ def update_profile():
                 updates[field] = data[field]
         
         db.session.commit()
+        invalidate_user(current_user.user_id)
         
         return jsonify({
             'message': 'Profile updated successfully',
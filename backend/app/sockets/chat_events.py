@@ -1,14 +1,31 @@
 ### File: backend/app/sockets/chat_events.py
 
-from flask import request
+from flask import request, current_app
+from flask_socketio import join_room, leave_room, rooms
 from app import socketio, db
 from app.models.chat import Chat
+from app.models.food import FoodListing
+from app.utils.chat_cache import chat_cache, conversation_key, listing_thread_key, thread_key_for
+from app.utils.chat_archive import load_history_page
+from app.utils.typing_state import typing_coalescer
+from app.utils.write_queue import write_queue
+from app.utils.database import replica_reads
+from app.utils.metrics import metrics
 
 # Store user_id to socket_id mapping
 user_socket_map = {}  # {user_id: socket_id}
 
+typing_sweeper = None
+typing_sweep_interval = 2
+
 @socketio.on('connect')
+@metrics.socket_event
 def handle_connect():
+    global typing_sweeper, typing_sweep_interval
+    if typing_sweeper is None:
+        typing_sweep_interval = current_app.config.get('TYPING_SWEEP_INTERVAL', typing_sweep_interval)
+        typing_sweeper = socketio.start_background_task(expire_typing_states)
+
     user_id = request.args.get('userId')
     if user_id:
         user_socket_map[user_id] = request.sid
@@ -17,16 +34,23 @@ def handle_connect():
 
 
 @socketio.on('disconnect')
+@metrics.socket_event
 def handle_disconnect():
     for user_id, sid in list(user_socket_map.items()):
         if sid == request.sid:
             del user_socket_map[user_id]
             print(f"User {user_id} disconnected")
             print(f"Current connected users: {user_socket_map}")
+
+            if user_id.isdigit():
+                user_id = int(user_id)
+            for typing_user_id, other_user_id in typing_coalescer.disconnect(user_id, request.sid):
+                notify_stop_typing(typing_user_id, other_user_id)
             break
 
 
 @socketio.on('join_conversation')
+@metrics.socket_event
 def handle_join_conversation(data):
     user_id = data.get('userId')
     other_user_id = data.get('otherUserId')
@@ -38,17 +62,47 @@ def handle_join_conversation(data):
     if isinstance(other_user_id, str) and other_user_id.isdigit():
         other_user_id = int(other_user_id)
 
-    chats = Chat.query.filter(
-        ((Chat.sender_id == user_id) & (Chat.receiver_id == other_user_id)) |
-        ((Chat.sender_id == other_user_id) & (Chat.receiver_id == user_id))
-    ).order_by(Chat.timestamp.asc()).all()
+    # The first page spans the hot table and the archive; older pages come from load_history
+    key = conversation_key(user_id, other_user_id)
+    messages = chat_cache.get(key)
+    if messages is not None:
+        page = {'messages': messages, 'hasMore': False, 'beforeId': messages[0]['id'] if messages else None}
+    else:
+        page_size = current_app.config.get('CHAT_HISTORY_PAGE_SIZE', 50)
+        page = load_history_page(user_id, other_user_id, limit=page_size)
+        chat_cache.put(key, page['messages'], complete=not page['hasMore'])
+    print(f"Sending {len(page['messages'])} messages to user {user_id}")
+    socketio.emit('conversation_history', page, to=request.sid)
+
+
+@socketio.on('load_history')
+@metrics.socket_event
+def handle_load_history(data):
+    user_id = data.get('userId')
+    other_user_id = data.get('otherUserId')
+    before_id = data.get('beforeId')
+    limit = data.get('limit')
+
+    if isinstance(user_id, str) and user_id.isdigit():
+        user_id = int(user_id)
+    if isinstance(other_user_id, str) and other_user_id.isdigit():
+        other_user_id = int(other_user_id)
+
+    page_size = current_app.config.get('CHAT_HISTORY_PAGE_SIZE', 50)
+    try:
+        limit = min(int(limit), page_size) if limit else page_size
+        before_id = int(before_id) if before_id is not None else None
+    except (TypeError, ValueError):
+        socketio.emit('error', {'message': 'Invalid history cursor'}, to=request.sid)
+        return
 
-    messages = [chat.to_dict() for chat in chats]
-    print(f"Sending {len(messages)} messages to user {user_id}")
-    socketio.emit('conversation_history', {'messages': messages}, to=request.sid)
+    with replica_reads():
+        page = load_history_page(user_id, other_user_id, before_id=before_id, limit=limit)
+    socketio.emit('conversation_history_page', page, to=request.sid)
 
 
 @socketio.on('send_message')
+@metrics.socket_event
 def handle_send_message(data):
     user_id = data.get('userId')
     receiver_id = data.get('receiverId')
@@ -64,18 +118,21 @@ def handle_send_message(data):
     if food_id and isinstance(food_id, str) and food_id.isdigit():
         food_id = int(food_id)
 
-    new_message = Chat(
-        sender_id=user_id,
-        receiver_id=receiver_id,
-        message=message_text,
-        food_id=food_id,
-        is_read=False
-    )
-    db.session.add(new_message)
-    db.session.commit()
-
-    message_data = new_message.to_dict()
-    print(f"Message saved with ID {new_message.id}")
+    def save_message():
+        new_message = Chat(
+            sender_id=user_id,
+            receiver_id=receiver_id,
+            message=message_text,
+            food_id=food_id,
+            is_read=False
+        )
+        db.session.add(new_message)
+        db.session.flush()
+        return new_message.to_dict()
+
+    message_data = write_queue.execute(save_message)
+    print(f"Message saved with ID {message_data['id']}")
+    chat_cache.append(conversation_key(user_id, receiver_id), dict(message_data))
 
     socketio.emit('new_message', message_data, to=request.sid)
 
@@ -90,11 +147,38 @@ def handle_send_message(data):
         print(f"Receiver {receiver_id} is not online. Message will be seen when they connect.")
 
 
+def notify_stop_typing(user_id, other_user_id):
+    receiver_sid = user_socket_map.get(str(other_user_id))
+    if not receiver_sid:
+        receiver_sid = user_socket_map.get(other_user_id)
+
+    if receiver_sid:
+        socketio.emit('user_stop_typing', {'userId': user_id}, to=receiver_sid)
+
+
+def expire_typing_states():
+    """Background task that clears typing indicators of clients that went quiet."""
+    while True:
+        socketio.sleep(typing_sweep_interval)
+        for user_id, other_user_id in typing_coalescer.expire():
+            notify_stop_typing(user_id, other_user_id)
+
+
 @socketio.on('typing')
+@metrics.socket_event
 def handle_typing(data):
     user_id = data.get('userId')
     other_user_id = data.get('otherUserId')
 
+    if isinstance(user_id, str) and user_id.isdigit():
+        user_id = int(user_id)
+    if isinstance(other_user_id, str) and other_user_id.isdigit():
+        other_user_id = int(other_user_id)
+
+    # Only the transition to "typing" is relayed; repeats refresh the state
+    if not typing_coalescer.start(user_id, other_user_id, request.sid):
+        return
+
     receiver_sid = user_socket_map.get(str(other_user_id))
     if not receiver_sid:
         receiver_sid = user_socket_map.get(other_user_id)
@@ -104,28 +188,38 @@ def handle_typing(data):
 
 
 @socketio.on('stop_typing')
+@metrics.socket_event
 def handle_stop_typing(data):
     user_id = data.get('userId')
     other_user_id = data.get('otherUserId')
 
-    receiver_sid = user_socket_map.get(str(other_user_id))
-    if not receiver_sid:
-        receiver_sid = user_socket_map.get(other_user_id)
+    if isinstance(user_id, str) and user_id.isdigit():
+        user_id = int(user_id)
+    if isinstance(other_user_id, str) and other_user_id.isdigit():
+        other_user_id = int(other_user_id)
 
-    if receiver_sid:
-        socketio.emit('user_stop_typing', {'userId': user_id}, to=receiver_sid)
+    if typing_coalescer.stop(user_id, other_user_id):
+        notify_stop_typing(user_id, other_user_id)
 
 
 @socketio.on('read_message')
+@metrics.socket_event
 def handle_read_message(data):
     message_id = data.get('messageId')
     user_id = data.get('userId')
     other_user_id = data.get('otherUserId')
 
-    message = Chat.query.get(message_id)
-    if message and not message.is_read:
-        message.is_read = True
-        db.session.commit()
+    def mark_read():
+        message = db.session.get(Chat, message_id)
+        # Listing thread messages have many readers, so they carry no read state
+        if message and message.receiver_id is not None and not message.is_read:
+            message.is_read = True
+            return thread_key_for(message)
+        return None
+
+    key = write_queue.execute(mark_read) if message_id is not None else None
+    if key is not None:
+        chat_cache.mark_read(key, message_id)
 
         sender_sid = user_socket_map.get(str(other_user_id))
         if not sender_sid:
@@ -135,3 +229,81 @@ def handle_read_message(data):
             socketio.emit('message_read', {'messageId': message_id}, to=sender_sid)
 
         socketio.emit('message_read', {'messageId': message_id}, to=request.sid)
+
+
+def listing_room(food_id):
+    return f"listing_{food_id}"
+
+
+@socketio.on('join_listing_thread')
+@metrics.socket_event
+def handle_join_listing_thread(data):
+    user_id = data.get('userId')
+    food_id = data.get('foodId')
+
+    if isinstance(food_id, str) and food_id.isdigit():
+        food_id = int(food_id)
+
+    if not isinstance(food_id, int) or db.session.get(FoodListing, food_id) is None:
+        socketio.emit('error', {'message': 'Food listing not found'}, to=request.sid)
+        return
+
+    print(f"User {user_id} joining listing thread {food_id}")
+    join_room(listing_room(food_id))
+
+    key = listing_thread_key(food_id)
+    messages = chat_cache.get(key)
+    if messages is None:
+        chats = Chat.query.filter(
+            Chat.food_id == food_id,
+            Chat.receiver_id.is_(None)
+        ).order_by(Chat.timestamp.asc()).all()
+
+        messages = [chat.to_dict() for chat in chats]
+        chat_cache.put(key, messages)
+
+    socketio.emit('listing_thread_history', {'foodId': food_id, 'messages': messages}, to=request.sid)
+
+
+@socketio.on('leave_listing_thread')
+@metrics.socket_event
+def handle_leave_listing_thread(data):
+    food_id = data.get('foodId')
+    leave_room(listing_room(food_id))
+
+
+@socketio.on('send_listing_message')
+@metrics.socket_event
+def handle_send_listing_message(data):
+    user_id = data.get('userId')
+    food_id = data.get('foodId')
+    message_text = data.get('message')
+
+    if isinstance(user_id, str) and user_id.isdigit():
+        user_id = int(user_id)
+    if isinstance(food_id, str) and food_id.isdigit():
+        food_id = int(food_id)
+
+    room = listing_room(food_id)
+    if room not in rooms():
+        socketio.emit('error', {'message': 'Join the listing thread before posting'}, to=request.sid)
+        return
+
+    # One row and one broadcast, however many participants the thread has
+    def save_message():
+        new_message = Chat(
+            sender_id=user_id,
+            receiver_id=None,
+            message=message_text,
+            food_id=food_id,
+            is_read=False
+        )
+        db.session.add(new_message)
+        db.session.flush()
+        return new_message.to_dict()
+
+    message_data = write_queue.execute(save_message)
+    print(f"Listing message saved with ID {message_data['id']}")
+    chat_cache.append(listing_thread_key(food_id), dict(message_data))
+
+    socketio.emit('new_listing_message', message_data, to=room)
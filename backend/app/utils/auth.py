@@ -1,9 +1,9 @@
 """
 Authentication utilities for the FoodShare application.
 """
-from flask import session, request
-from app.models.user import User
+from flask import session, request, g
 from app import serializer
+from app.utils.identity_cache import identity_cache
 
 # Global user session (for backward compatibility)
 user_session = {'user_id': None, 'username': None}
@@ -13,11 +13,21 @@ def get_current_user():
     Get the currently authenticated user.
     
     Checks for user ID in session, then in the Authorization header,
-    and finally in the global user_session.
+    and finally in the global user_session. The result is memoized for
+    the rest of the request, and users are served from the identity cache
+    across requests.
     
     Returns:
         User: The current user or None if not authenticated
     """
+    if '_current_user' in g:
+        return g._current_user
+    
+    g._current_user = _resolve_current_user()
+    return g._current_user
+
+
+def _resolve_current_user():
     user_id = session.get('user_id')
     
     # Check Authorization header if no session
@@ -34,13 +44,24 @@ def get_current_user():
     if not user_id and 'user_id' in user_session:
         user_id = user_session['user_id']
     
-    # Get user from database
+    # Get user from the identity cache or database
     if user_id:
-        return User.query.get(user_id)
+        return identity_cache.load(user_id)
     
     return None
 
 
+def invalidate_user(user_id):
+    """
+    Drop cached identity data of a user after it changed.
+    
+    Args:
+        user_id: ID of the changed user
+    """
+    identity_cache.invalidate(user_id)
+    g.pop('_current_user', None)
+
+
 def set_user_session(user):
     """
     Set both Flask session and global user_session.
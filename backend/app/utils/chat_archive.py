@@ -0,0 +1,149 @@
+"""
+Chat archive utilities for the FoodShare application.
+
+Old messages are moved out of the hot ``chats`` table into compressed
+per-conversation, per-month chunks in ``chat_archive``. History pagination
+reads the hot table first and continues into the archive transparently, and
+conversations without hot rows are listed from their latest chunk.
+"""
+from datetime import datetime, timedelta
+from itertools import groupby
+from sqlalchemy import func, tuple_
+from app import db
+from app.models.chat import Chat, ChatArchive
+from app.utils.chat_cache import chat_cache, conversation_key
+
+
+def archive_old_messages(max_age_days, batch_size=1000):
+    """
+    Move messages older than the given age into the archive table.
+
+    Each batch is archived and deleted from ``chats`` in one transaction, so
+    the job can be interrupted and resumed safely.
+
+    Args:
+        max_age_days: Messages older than this many days are archived
+        batch_size: Number of messages moved per transaction
+
+    Returns:
+        int: Number of messages archived
+    """
+    cutoff = datetime.utcnow() - timedelta(days=max_age_days)
+    archived = 0
+
+    while True:
+        chats = Chat.query.filter(
+            Chat.timestamp < cutoff,
+            Chat.sender_id.isnot(None),
+            Chat.receiver_id.isnot(None)
+        ).order_by(Chat.id.asc()).limit(batch_size).all()
+
+        if not chats:
+            break
+
+        def chunk_of(chat):
+            return conversation_key(chat.sender_id, chat.receiver_id), chat.timestamp.strftime('%Y-%m')
+
+        touched = set()
+        for (key, period), group in groupby(sorted(chats, key=chunk_of), key=chunk_of):
+            db.session.add(ChatArchive.from_chats(key, period, sorted(group, key=lambda c: c.id)))
+            touched.add(key)
+
+        Chat.query.filter(Chat.id.in_([chat.id for chat in chats])).delete(synchronize_session=False)
+        db.session.commit()
+
+        for key in touched:
+            chat_cache.invalidate(key)
+        archived += len(chats)
+
+    return archived
+
+
+def load_history_page(user_id, other_user_id, before_id=None, limit=50):
+    """
+    Load one page of a conversation, newest messages first in the scan.
+
+    The hot table is read with a keyset on message ID; when it runs out the
+    scan continues into the archive chunks of the same conversation.
+
+    Args:
+        user_id, other_user_id: IDs of the two participants
+        before_id: Only return messages with a lower ID (None for the latest)
+        limit: Maximum number of messages to return
+
+    Returns:
+        dict: Messages (oldest first), whether older messages exist, and the
+              cursor to request the next page with
+    """
+    wanted = limit + 1
+
+    query = Chat.query.filter(
+        ((Chat.sender_id == user_id) & (Chat.receiver_id == other_user_id)) |
+        ((Chat.sender_id == other_user_id) & (Chat.receiver_id == user_id))
+    )
+    if before_id is not None:
+        query = query.filter(Chat.id < before_id)
+    page = [chat.to_dict() for chat in query.order_by(Chat.id.desc()).limit(wanted)]
+
+    if len(page) < wanted:
+        cursor = page[-1]['id'] if page else before_id
+        low, high = conversation_key(user_id, other_user_id)
+
+        chunks = ChatArchive.query.filter_by(user_low=low, user_high=high)
+        if cursor is not None:
+            chunks = chunks.filter(ChatArchive.first_message_id < cursor)
+
+        for chunk in chunks.order_by(ChatArchive.last_message_id.desc()).yield_per(4):
+            for message in reversed(chunk.messages()):
+                if cursor is None or message['id'] < cursor:
+                    page.append(message)
+                    if len(page) == wanted:
+                        break
+            if len(page) == wanted:
+                break
+
+    has_more = len(page) > limit
+    page = page[:limit]
+    page.reverse()
+
+    return {
+        'messages': page,
+        'hasMore': has_more,
+        'beforeId': page[0]['id'] if page else None
+    }
+
+
+def latest_archived_messages(user_id, exclude=()):
+    """
+    Get the latest archived message of each of a user's conversations.
+
+    Only the newest chunk of every conversation is decompressed.
+
+    Args:
+        user_id: ID of the user
+        exclude: IDs of other users whose conversations can be skipped
+                 (e.g. because they still have messages in the hot table)
+
+    Returns:
+        dict: Serialized message keyed by the ID of the other participant
+    """
+    skipped = [conversation_key(user_id, other_user_id) for other_user_id in exclude]
+
+    latest = db.select(
+        ChatArchive.user_low,
+        ChatArchive.user_high,
+        func.max(ChatArchive.last_message_id).label('last_message_id')
+    ).where((ChatArchive.user_low == user_id) | (ChatArchive.user_high == user_id))
+    if skipped:
+        latest = latest.where(tuple_(ChatArchive.user_low, ChatArchive.user_high).notin_(skipped))
+    latest = latest.group_by(ChatArchive.user_low, ChatArchive.user_high).subquery()
+
+    chunks = ChatArchive.query.join(latest, (ChatArchive.user_low == latest.c.user_low)
+                                    & (ChatArchive.user_high == latest.c.user_high)
+                                    & (ChatArchive.last_message_id == latest.c.last_message_id))
+
+    messages = {}
+    for chunk in chunks:
+        other_user_id = chunk.user_high if chunk.user_low == user_id else chunk.user_low
+        messages[other_user_id] = chunk.messages()[-1]
+    return messages
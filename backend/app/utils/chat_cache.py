@@ -0,0 +1,236 @@
+"""
+In-memory conversation cache for the FoodShare chat.
+
+Keeps the most recent serialized messages of active conversations so that
+joining or reloading a conversation does not have to go back to the database.
+Sends and read receipts are written through only in the process that
+handled them, so entries expire ``CHAT_CACHE_TTL`` seconds after they were
+loaded; other workers serve a conversation at most that stale.
+"""
+import time
+from collections import OrderedDict, deque
+from threading import Lock
+
+
+def conversation_key(user_a, user_b):
+    """
+    Build an order-independent key for a one-to-one conversation.
+
+    Args:
+        user_a, user_b: IDs of the two participants
+
+    Returns:
+        tuple: Key identifying the conversation
+    """
+    return tuple(sorted((int(user_a), int(user_b))))
+
+
+def listing_thread_key(food_id):
+    """
+    Build the key of the group thread attached to a food listing.
+
+    Args:
+        food_id: ID of the food listing
+
+    Returns:
+        tuple: Key identifying the listing thread
+    """
+    return ('listing', int(food_id))
+
+
+def thread_key_for(chat):
+    """
+    Get the cache key of the conversation or listing thread a message belongs to.
+
+    Args:
+        chat: Chat instance
+
+    Returns:
+        tuple: Conversation or listing thread key
+    """
+    if chat.receiver_id is None:
+        return listing_thread_key(chat.food_id)
+    return conversation_key(chat.sender_id, chat.receiver_id)
+
+
+class _Conversation:
+    """Ring buffer of serialized messages for a single conversation."""
+
+    __slots__ = ('messages', 'complete', 'expires_at')
+
+    def __init__(self, messages, maxlen, complete, expires_at):
+        self.messages = deque(messages, maxlen=maxlen)
+        # True while the buffer holds every message of the conversation
+        self.complete = complete
+        self.expires_at = expires_at
+
+
+class ConversationCache:
+    """
+    Bounded LRU cache of recent messages per conversation.
+
+    Each conversation keeps at most ``per_conversation`` messages and the cache
+    as a whole holds at most ``max_messages``; the least recently used
+    conversations are evicted first when the total is exceeded. Entries are
+    dropped ``ttl`` seconds after they were loaded.
+    """
+
+    def __init__(self, per_conversation=200, max_messages=20000, ttl=5, clock=time.monotonic):
+        self.per_conversation = per_conversation
+        self.max_messages = max_messages
+        self.ttl = ttl
+        self._clock = clock
+        self._conversations = OrderedDict()
+        self._size = 0
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def init_app(self, app):
+        """
+        Configure the cache from application settings.
+
+        Args:
+            app: Flask application instance
+        """
+        self.per_conversation = app.config.get('CHAT_CACHE_MESSAGES_PER_CONVERSATION', self.per_conversation)
+        self.max_messages = app.config.get('CHAT_CACHE_MAX_MESSAGES', self.max_messages)
+        self.ttl = app.config.get('CHAT_CACHE_TTL', self.ttl)
+        self.clear()
+
+    def get(self, key):
+        """
+        Get the cached history of a conversation.
+
+        Only conversations whose full history fits in the buffer are served,
+        so callers always receive the same messages the database would return.
+
+        Args:
+            key: Conversation key from conversation_key()
+
+        Returns:
+            list: Serialized messages (oldest first) or None on a miss
+        """
+        with self._lock:
+            convo = self._conversations.get(key)
+            if convo is not None and convo.expires_at <= self._clock():
+                self._discard(key)
+                convo = None
+            if convo is None or not convo.complete:
+                self.misses += 1
+                return None
+            self._conversations.move_to_end(key)
+            self.hits += 1
+            return list(convo.messages)
+
+    def put(self, key, messages, complete=True):
+        """
+        Store the history of a conversation, replacing any cached entry.
+
+        Args:
+            key: Conversation key from conversation_key()
+            messages: Serialized messages ordered oldest first
+            complete: Whether messages is the entire conversation
+        """
+        if self.per_conversation <= 0 or self.ttl <= 0:
+            return
+
+        complete = complete and len(messages) <= self.per_conversation
+        with self._lock:
+            self._discard(key)
+            convo = _Conversation(messages, self.per_conversation, complete, self._clock() + self.ttl)
+            self._conversations[key] = convo
+            self._size += len(convo.messages)
+            self._evict()
+
+    def append(self, key, message):
+        """
+        Write a newly sent message through to a cached conversation.
+
+        Conversations that are not cached are left alone; they will be loaded
+        from the database on the next join.
+
+        Args:
+            key: Conversation key from conversation_key()
+            message: Serialized message
+        """
+        with self._lock:
+            convo = self._conversations.get(key)
+            if convo is None:
+                return
+            if len(convo.messages) == convo.messages.maxlen:
+                # The oldest message falls out of the ring buffer
+                convo.complete = False
+            else:
+                self._size += 1
+            convo.messages.append(message)
+            self._conversations.move_to_end(key)
+            self._evict()
+
+    def mark_read(self, key, message_id):
+        """
+        Write a read receipt through to a cached conversation.
+
+        Args:
+            key: Conversation key from conversation_key()
+            message_id: ID of the message that was read
+        """
+        with self._lock:
+            convo = self._conversations.get(key)
+            if convo is None:
+                return
+            for message in reversed(convo.messages):
+                if message['id'] == message_id:
+                    message['isRead'] = True
+                    break
+
+    def invalidate(self, key):
+        """
+        Drop a conversation from the cache.
+
+        Args:
+            key: Conversation key from conversation_key()
+        """
+        with self._lock:
+            self._discard(key)
+
+    def clear(self):
+        """Drop every cached conversation and reset the counters."""
+        with self._lock:
+            self._conversations.clear()
+            self._size = 0
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        """
+        Get cache usage and hit-rate metrics.
+
+        Returns:
+            dict: Cache statistics
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'conversations': len(self._conversations),
+                'messages': self._size,
+                'max_messages': self.max_messages,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+    def _discard(self, key):
+        convo = self._conversations.pop(key, None)
+        if convo is not None:
+            self._size -= len(convo.messages)
+
+    def _evict(self):
+        while self._size > self.max_messages and len(self._conversations) > 1:
+            _, convo = self._conversations.popitem(last=False)
+            self._size -= len(convo.messages)
+            self.evictions += 1
+
+
+chat_cache = ConversationCache()
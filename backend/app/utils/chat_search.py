@@ -0,0 +1,241 @@
+"""
+Full-text chat search utilities for the FoodShare application.
+
+Messages are indexed in an SQLite FTS5 table that mirrors ``chats.message``
+through triggers, so searching never has to load whole conversations.
+Messages moved to ``chat_archive`` leave the index with their rows, so
+results carry ``archiveSearched: false`` and the newest archived month.
+"""
+import base64
+import json
+import re
+from sqlalchemy import text, bindparam, func, or_
+from app import db
+from app.models.chat import ChatArchive
+from app.utils.chat_cache import conversation_key
+
+# IF NOT EXISTS everywhere: workers booting at once may run this concurrently
+FTS_STATEMENTS = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS chats_fts USING fts5(
+        message, content='chats', content_rowid='id', tokenize='porter unicode61'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS chats_fts_insert AFTER INSERT ON chats BEGIN
+        INSERT INTO chats_fts(rowid, message) VALUES (new.id, new.message);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS chats_fts_delete AFTER DELETE ON chats BEGIN
+        INSERT INTO chats_fts(chats_fts, rowid, message) VALUES ('delete', old.id, old.message);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS chats_fts_update AFTER UPDATE OF message ON chats BEGIN
+        INSERT INTO chats_fts(chats_fts, rowid, message) VALUES ('delete', old.id, old.message);
+        INSERT INTO chats_fts(rowid, message) VALUES (new.id, new.message);
+    END
+    """,
+    "INSERT INTO chats_fts(chats_fts) VALUES ('rebuild')"
+]
+
+FTS_TRIGGERS = ('chats_fts_insert', 'chats_fts_delete', 'chats_fts_update')
+
+MATCH_QUERY = text("""
+    SELECT f.rowid AS id, bm25(chats_fts) AS score
+    FROM chats_fts f
+    JOIN chats c ON c.id = f.rowid
+    WHERE chats_fts MATCH :query
+      AND (c.sender_id = :user_id OR c.receiver_id = :user_id)
+      AND (:after_score IS NULL OR bm25(chats_fts) > :after_score
+           OR (bm25(chats_fts) = :after_score AND f.rowid > :after_id))
+    ORDER BY score, id
+    LIMIT :limit
+""").columns(id=db.Integer, score=db.Float)
+
+SNIPPET_QUERY = text("""
+    SELECT f.rowid AS id,
+           snippet(chats_fts, 0, '<mark>', '</mark>', '…', 12) AS snippet,
+           c.sender_id, c.receiver_id, c.food_id, c.timestamp
+    FROM chats_fts f
+    JOIN chats c ON c.id = f.rowid
+    WHERE chats_fts MATCH :query AND f.rowid IN :ids
+""").bindparams(bindparam('ids', expanding=True)).columns(
+    id=db.Integer, snippet=db.Text, sender_id=db.Integer, receiver_id=db.Integer,
+    food_id=db.Integer, timestamp=db.DateTime
+)
+
+
+def search_available():
+    """Check whether the database supports the FTS5 chat index."""
+    return db.engine.dialect.name == 'sqlite'
+
+
+def setup_chat_search():
+    """
+    Create the FTS5 index and its sync triggers if they don't exist.
+
+    The index is built from the existing messages the first time it is
+    created; afterwards the triggers keep it up to date. Missing triggers
+    are recreated on an existing index.
+    """
+    if not search_available():
+        return
+
+    exists = db.session.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'chats_fts'")
+    ).first()
+    statements = FTS_STATEMENTS[1:1 + len(FTS_TRIGGERS)] if exists else FTS_STATEMENTS
+
+    for statement in statements:
+        db.session.execute(text(statement))
+    db.session.commit()
+
+
+def missing_search_objects():
+    """
+    List the parts of the chat search index missing from the database.
+
+    Returns:
+        list: Names of the FTS table and triggers that don't exist
+    """
+    if not search_available():
+        return []
+    present = {
+        name for (name,) in db.session.execute(
+            text("SELECT name FROM sqlite_master WHERE type IN ('table', 'trigger') AND name LIKE 'chats_fts%'")
+        )
+    }
+    return [name for name in ('chats_fts',) + FTS_TRIGGERS if name not in present]
+
+
+def build_match_query(raw_query):
+    """
+    Turn user input into a safe FTS5 query.
+
+    Every word is quoted so FTS5 operators in the input are treated as text;
+    the last word also matches as a prefix.
+
+    Args:
+        raw_query: Search text entered by the user
+
+    Returns:
+        str: FTS5 query or None if the input has no searchable words
+    """
+    words = re.findall(r'\w+', raw_query or '')
+    if not words:
+        return None
+    terms = [f'"{word}"' for word in words]
+    terms[-1] += '*'
+    return ' '.join(terms)
+
+
+def encode_cursor(score, message_id):
+    """Encode a keyset position as an opaque cursor string."""
+    raw = json.dumps([score, message_id]).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii')
+
+
+def decode_cursor(cursor):
+    """
+    Decode a cursor produced by encode_cursor().
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        score, message_id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        return float(score), int(message_id)
+    except Exception:
+        raise ValueError('Invalid cursor')
+
+
+def archived_through(user_id):
+    """
+    Get the newest month of a user's messages that has been archived.
+
+    Args:
+        user_id: ID of the user
+
+    Returns:
+        str: Month as 'YYYY-MM', or None if none of the user's messages are archived
+    """
+    return db.session.query(func.max(ChatArchive.period)).filter(
+        or_(ChatArchive.user_low == user_id, ChatArchive.user_high == user_id)
+    ).scalar()
+
+
+def search_messages(user_id, raw_query, cursor=None, limit=20):
+    """
+    Search the messages of every conversation a user takes part in.
+
+    Results are ordered by relevance (BM25) and paginated with a keyset on
+    (score, message ID), so later pages cost the same as the first. Only
+    messages still in the hot table are searched; ``archivedThrough`` names
+    the newest month of the user's messages that were archived (and so
+    cannot match), or is None.
+
+    Args:
+        user_id: ID of the searching user
+        raw_query: Search text entered by the user
+        cursor: Cursor returned with the previous page, if any
+        limit: Maximum number of results
+
+    Returns:
+        dict: Ranked results with snippets, the cursor of the next page and
+            the archive coverage flags
+    """
+    coverage = {'archiveSearched': False, 'archivedThrough': archived_through(user_id)}
+
+    query = build_match_query(raw_query)
+    if query is None:
+        return {'results': [], 'nextCursor': None, **coverage}
+
+    after_score, after_id = decode_cursor(cursor) if cursor else (None, None)
+
+    rows = db.session.execute(MATCH_QUERY, {
+        'query': query,
+        'user_id': user_id,
+        'after_score': after_score,
+        'after_id': after_id,
+        'limit': limit + 1
+    }).all()
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if not rows:
+        return {'results': [], 'nextCursor': None, **coverage}
+
+    details = {
+        row.id: row for row in db.session.execute(
+            SNIPPET_QUERY, {'query': query, 'ids': [row.id for row in rows]}
+        )
+    }
+
+    results = []
+    for row in rows:
+        detail = details[row.id]
+        if detail.receiver_id is None:
+            other_user_id = None
+            conversation_id = f"listing-{detail.food_id}"
+        else:
+            other_user_id = detail.receiver_id if detail.sender_id == user_id else detail.sender_id
+            conversation_id = '-'.join(str(uid) for uid in conversation_key(user_id, other_user_id))
+        results.append({
+            'messageId': row.id,
+            'conversationId': conversation_id,
+            'otherUserId': other_user_id,
+            'senderId': detail.sender_id,
+            'foodId': detail.food_id,
+            'snippet': detail.snippet,
+            'timestamp': detail.timestamp.isoformat(),
+            'score': row.score
+        })
+
+    last = rows[-1]
+    return {
+        'results': results,
+        'nextCursor': encode_cursor(last.score, last.id) if has_more else None,
+        **coverage
+    }
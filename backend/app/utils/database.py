@@ -0,0 +1,159 @@
+"""
+Database engine utilities for the FoodShare application.
+"""
+from contextlib import contextmanager
+from flask import g, request, has_app_context
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+
+# Pool arguments that only apply to pools with a fixed number of connections
+QUEUE_POOL_OPTIONS = ('pool_size', 'max_overflow', 'pool_timeout')
+
+
+def is_memory_sqlite(uri):
+    """Check whether a database URI points at an in-memory SQLite database."""
+    url = make_url(uri)
+    return url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:')
+
+
+def engine_options(config):
+    """
+    Build SQLALCHEMY_ENGINE_OPTIONS from the pool settings of a config.
+
+    In-memory SQLite uses a single static connection, so the queue pool
+    settings are left out for it.
+
+    Args:
+        config: Flask config mapping
+
+    Returns:
+        dict: Engine options
+    """
+    options = {
+        'pool_size': config['DB_POOL_SIZE'],
+        'max_overflow': config['DB_MAX_OVERFLOW'],
+        'pool_timeout': config['DB_POOL_TIMEOUT'],
+        'pool_recycle': config['DB_POOL_RECYCLE'],
+        'pool_pre_ping': config['DB_POOL_PRE_PING']
+    }
+    if is_memory_sqlite(config['SQLALCHEMY_DATABASE_URI']):
+        for key in QUEUE_POOL_OPTIONS:
+            options.pop(key)
+    return options
+
+
+def configure_sqlite(engine, config):
+    """
+    Apply SQLite pragmas to every new connection of an engine.
+
+    WAL lets readers proceed while a writer holds the lock, and
+    synchronous=NORMAL is durable across application crashes in WAL mode.
+    Engines for other databases are left untouched.
+
+    Args:
+        engine: SQLAlchemy engine
+        config: Flask config mapping
+    """
+    if engine.dialect.name != 'sqlite':
+        return
+
+    pragmas = [
+        f"PRAGMA synchronous={config['SQLITE_SYNCHRONOUS']}",
+        f"PRAGMA cache_size={int(config['SQLITE_CACHE_SIZE'])}",
+        f"PRAGMA mmap_size={int(config['SQLITE_MMAP_SIZE'])}",
+        f"PRAGMA busy_timeout={int(config['SQLITE_BUSY_TIMEOUT'])}"
+    ]
+    if not is_memory_sqlite(str(engine.url)):
+        pragmas.insert(0, f"PRAGMA journal_mode={config['SQLITE_JOURNAL_MODE']}")
+
+    @event.listens_for(engine, 'connect')
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in pragmas:
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
+
+
+# Bind key of the read replica in SQLALCHEMY_BINDS
+REPLICA_BIND = 'replica'
+
+# Requests with these methods read from the replica until they write
+READ_ONLY_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+routing_counts = {'replica': 0, 'primary': 0}
+
+
+class RoutingSession(Session):
+    """
+    Session that sends SELECTs to the read replica when reads are routed.
+
+    Reads are routed for read-only HTTP requests and inside ``replica_reads``
+    blocks, unless the application context has pinned itself to the primary
+    after a write (read-your-writes). Writes, flushes and locking reads
+    always use the primary. Without a replica bind this behaves exactly like
+    the Flask-SQLAlchemy session.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and clause is not None and clause.is_select:
+            if (
+                REPLICA_BIND in self._db.engines
+                and not self._flushing
+                and getattr(clause, '_for_update_arg', None) is None
+                and _reads_routed()
+            ):
+                routing_counts['replica'] += 1
+                return self._db.engines[REPLICA_BIND]
+            routing_counts['primary'] += 1
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+@event.listens_for(RoutingSession, 'after_flush')
+def pin_after_flush(session, flush_context):
+    pin_primary()
+
+
+@event.listens_for(RoutingSession, 'do_orm_execute')
+def pin_after_bulk_write(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        pin_primary()
+
+
+def _reads_routed():
+    return has_app_context() and g.get('_db_read_replica', False) and not g.get('_db_pinned', False)
+
+
+def pin_primary():
+    """Send every further read of this request (or app context) to the primary."""
+    if has_app_context():
+        g._db_pinned = True
+
+
+def route_read_only_requests():
+    """before_request hook routing reads of read-only requests to the replica."""
+    g._db_read_replica = request.method in READ_ONLY_METHODS
+
+
+@contextmanager
+def replica_reads():
+    """Route reads inside the block to the replica (e.g. socket history loads)."""
+    previous = g.get('_db_read_replica', False)
+    g._db_read_replica = True
+    try:
+        yield
+    finally:
+        g._db_read_replica = previous
+
+
+@contextmanager
+def primary_reads():
+    """Read from the primary inside the block (also usable as a view decorator)."""
+    previous = g.get('_db_read_replica', False)
+    g._db_read_replica = False
+    try:
+        yield
+    finally:
+        g._db_read_replica = previous
@@ -0,0 +1,144 @@
+"""
+Cross-request identity cache for the FoodShare application.
+
+Authenticated requests resolve their user on every call. The cache keeps a
+column snapshot of recently seen users for a short TTL so that resolving the
+current user does not need a round trip to the ``users`` table. A snapshot
+is dropped when a session of this process commits a change to its user
+(profile, role, password); changes made by other processes are picked up
+when the TTL runs out.
+"""
+import time
+from collections import OrderedDict
+from itertools import chain
+from threading import Lock
+from sqlalchemy import event
+from sqlalchemy.orm import Session, make_transient_to_detached
+from app import db
+from app.models.user import User
+from app.utils.database import primary_reads
+
+
+class IdentityCache:
+    """Bounded TTL cache of user column snapshots keyed by user ID."""
+
+    def __init__(self, max_size=10000, ttl=60, clock=time.monotonic):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._clock = clock
+        self._entries = OrderedDict()  # {user_id: (expires_at, snapshot)}
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def init_app(self, app):
+        """
+        Configure the cache from application settings.
+
+        Args:
+            app: Flask application instance
+        """
+        self.max_size = app.config.get('IDENTITY_CACHE_SIZE', self.max_size)
+        self.ttl = app.config.get('IDENTITY_CACHE_TTL', self.ttl)
+        self.clear()
+
+    def load(self, user_id):
+        """
+        Get a user attached to the current session, from the cache if possible.
+
+        On a hit the snapshot is merged into the session without a SELECT;
+        on a miss the user is loaded from the database and snapshotted.
+
+        Args:
+            user_id: ID of the user
+
+        Returns:
+            User: The user or None if it does not exist
+        """
+        snapshot = self._get(user_id)
+        if snapshot is not None:
+            user = User(**snapshot)
+            make_transient_to_detached(user)
+            return db.session.merge(user, load=False)
+
+        # A replica may not have caught up with a fresh signup or profile edit
+        with primary_reads():
+            user = db.session.get(User, user_id)
+        if user is not None:
+            self._put(user_id, {
+                attr.key: getattr(user, attr.key) for attr in User.__mapper__.column_attrs
+            })
+        return user
+
+    def invalidate(self, user_id):
+        """
+        Drop the snapshot of a user, e.g. after their profile changed.
+
+        Args:
+            user_id: ID of the user
+        """
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        """Drop every snapshot and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+    def stats(self):
+        """
+        Get cache usage and hit-rate metrics.
+
+        Returns:
+            dict: Cache statistics
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+    def _get(self, user_id):
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None or entry[0] <= self._clock():
+                self._entries.pop(user_id, None)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(user_id)
+            self.hits += 1
+            return entry[1]
+
+    def _put(self, user_id, snapshot):
+        if self.max_size <= 0 or self.ttl <= 0:
+            return
+        with self._lock:
+            self._entries[user_id] = (self._clock() + self.ttl, snapshot)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+
+@event.listens_for(Session, 'after_flush')
+def note_user_changes(session, flush_context):
+    changed = {obj.user_id for obj in chain(session.dirty, session.deleted) if isinstance(obj, User)}
+    if changed:
+        session.info.setdefault('changed_user_ids', set()).update(changed)
+
+
+@event.listens_for(Session, 'after_commit')
+def invalidate_users_after_commit(session):
+    for user_id in session.info.pop('changed_user_ids', ()):
+        identity_cache.invalidate(user_id)
+
+
+@event.listens_for(Session, 'after_rollback')
+def forget_user_changes(session):
+    session.info.pop('changed_user_ids', None)
+
+
+identity_cache = IdentityCache()
@@ -0,0 +1,313 @@
+"""
+Image storage utilities for the FoodShare application.
+
+Uploaded originals are stored once per sha256 under ``IMAGE_UPLOAD_DIR``
+(default ``instance/uploads``). A background worker renders JPEG thumbnails
+in a few fixed sizes so list views never download full-size photos.
+Thumbnail rendering needs the optional Pillow package; without it the
+thumbnail URLs fall back to the original.
+"""
+import hashlib
+import os
+import tempfile
+from eventlet import patcher, tpool
+from app import db, socketio
+from app.models.image import Image
+
+# Longest edge in pixels for each thumbnail size
+THUMBNAIL_SIZES = {
+    'small': 160,
+    'medium': 480,
+    'large': 1080
+}
+
+# Magic numbers of the accepted upload formats
+SIGNATURES = (
+    (b'\xff\xd8\xff', 'image/jpeg'),
+    (b'\x89PNG\r\n\x1a\n', 'image/png'),
+    (b'GIF87a', 'image/gif'),
+    (b'GIF89a', 'image/gif'),
+)
+
+CHUNK_SIZE = 64 * 1024
+
+
+def detect_content_type(head):
+    """
+    Detect an image type from the first bytes of a file.
+
+    Args:
+        head: At least the first 12 bytes of the file
+
+    Returns:
+        str: MIME type, or None if the format is not accepted
+    """
+    for signature, content_type in SIGNATURES:
+        if head.startswith(signature):
+            return content_type
+    if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+        return 'image/webp'
+    return None
+
+
+def image_urls(sha256):
+    """
+    Build the serving URLs of an image.
+
+    Args:
+        sha256: Content hash of the image
+
+    Returns:
+        dict: URL of the original and of every thumbnail size
+    """
+    urls = {'original': f'/api/images/{sha256}'}
+    urls.update({size: f'/api/images/{sha256}/{size}' for size in THUMBNAIL_SIZES})
+    return urls
+
+
+def listing_photos(food_ids):
+    """
+    Get the first photo of each food listing with one query.
+
+    Args:
+        food_ids: IDs of the food listings
+
+    Returns:
+        dict: {food_id: image URLs}
+    """
+    food_ids = set(food_ids)
+    if not food_ids:
+        return {}
+
+    rows = db.session.query(Image.resource_id, Image.sha256) \
+        .filter(Image.resource_type == 'food', Image.resource_id.in_(food_ids)) \
+        .order_by(Image.image_id) \
+        .all()
+
+    photos = {}
+    for food_id, sha256 in rows:
+        photos.setdefault(food_id, image_urls(sha256))
+    return photos
+
+
+class ImageStore:
+    """Content-addressed file storage for originals and thumbnails."""
+
+    def __init__(self, root=None, max_bytes=10 * 1024 * 1024):
+        self.root = root
+        self.max_bytes = max_bytes
+
+    def init_app(self, app):
+        """
+        Configure the store from application settings.
+
+        Args:
+            app: Flask application instance
+        """
+        self.root = app.config.get('IMAGE_UPLOAD_DIR') or os.path.join(app.instance_path, 'uploads')
+        self.max_bytes = app.config.get('IMAGE_MAX_BYTES', self.max_bytes)
+
+    def original_path(self, sha256):
+        """Get the path of a stored original."""
+        return os.path.join(self.root, 'originals', sha256[:2], sha256)
+
+    def thumbnail_path(self, sha256, size):
+        """Get the path of a rendered thumbnail."""
+        return os.path.join(self.root, 'thumbnails', size, sha256[:2], f'{sha256}.jpg')
+
+    def save(self, stream):
+        """
+        Store an uploaded image unless identical content is already stored.
+
+        The upload is hashed while it is streamed to a temporary file, which
+        is then moved into place (or discarded if it is a duplicate).
+
+        Args:
+            stream: Readable binary file object
+
+        Returns:
+            tuple: (sha256, size in bytes, content type)
+
+        Raises:
+            ValueError: If the file is too large or not a supported image
+        """
+        tmp_dir = os.path.join(self.root, 'tmp')
+        os.makedirs(tmp_dir, exist_ok=True)
+        digest = hashlib.sha256()
+        size = 0
+        head = b''
+
+        with tempfile.NamedTemporaryFile(dir=tmp_dir, delete=False) as tmp:
+            try:
+                while True:
+                    chunk = stream.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    size += len(chunk)
+                    if size > self.max_bytes:
+                        raise ValueError(f'Image exceeds {self.max_bytes} bytes')
+                    if len(head) < 12:
+                        head += chunk[:12 - len(head)]
+                    digest.update(chunk)
+                    tmp.write(chunk)
+
+                content_type = detect_content_type(head)
+                if content_type is None:
+                    raise ValueError('Unsupported image format')
+            except Exception:
+                tmp.close()
+                os.unlink(tmp.name)
+                raise
+
+        sha256 = digest.hexdigest()
+        path = self.original_path(sha256)
+        if os.path.exists(path):
+            os.unlink(tmp.name)
+        else:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            os.replace(tmp.name, path)
+        return sha256, size, content_type
+
+
+def render_thumbnails(original_path, thumbnail_path):
+    """
+    Render every thumbnail size of an original.
+
+    Args:
+        original_path: Path of the stored original
+        thumbnail_path: Callable mapping a size name to its output path
+
+    Returns:
+        tuple: (width, height) of the original
+    """
+    from PIL import Image as PILImage, ImageOps
+
+    with PILImage.open(original_path) as source:
+        source = ImageOps.exif_transpose(source)
+        width, height = source.size
+        if source.mode in ('RGBA', 'LA', 'P'):
+            source = source.convert('RGBA')
+            flattened = PILImage.new('RGB', source.size, (255, 255, 255))
+            flattened.paste(source, mask=source.getchannel('A'))
+            source = flattened
+        elif source.mode != 'RGB':
+            source = source.convert('RGB')
+
+        for size, edge in THUMBNAIL_SIZES.items():
+            path = thumbnail_path(size)
+            if os.path.exists(path):
+                continue
+            thumbnail = source.copy()
+            thumbnail.thumbnail((edge, edge), PILImage.LANCZOS)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f'{path}.tmp'
+            thumbnail.save(tmp_path, 'JPEG', quality=85, optimize=True, progressive=True)
+            os.replace(tmp_path, path)
+    return width, height
+
+
+def pillow_available():
+    """Check whether thumbnails can be rendered."""
+    try:
+        import PIL  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class ThumbnailWorker:
+    """Background worker that renders thumbnails for pending images."""
+
+    def __init__(self, batch_size=20, poll_interval=2):
+        self.app = None
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self._worker = None
+        self.rendered = 0
+        self.failed = 0
+
+    def init_app(self, app):
+        """
+        Configure the worker from application settings.
+
+        Args:
+            app: Flask application instance
+        """
+        self.app = app
+        self.batch_size = app.config.get('IMAGE_WORKER_BATCH_SIZE', self.batch_size)
+        self.poll_interval = app.config.get('IMAGE_WORKER_POLL_INTERVAL', self.poll_interval)
+
+    def start(self):
+        """Start the background worker if it is not already running."""
+        if self._worker is not None:
+            return
+        if not pillow_available():
+            print("Pillow is not installed; image thumbnails are disabled")
+            return
+        self._worker = socketio.start_background_task(self._run)
+
+    def process_pending(self):
+        """
+        Render thumbnails for one batch of pending images.
+
+        Each distinct hash is rendered once, however many rows share it.
+        Must be called inside an application context.
+
+        Returns:
+            int: Number of distinct images processed
+        """
+        hashes = [row[0] for row in db.session.query(Image.sha256)
+                  .filter(Image.status == 'pending')
+                  .distinct()
+                  .limit(self.batch_size)
+                  .all()]
+
+        for sha256 in hashes:
+            updates = {'status': 'ready'}
+            try:
+                width, height = self._render(sha256)
+                updates.update(width=width, height=height)
+                self.rendered += 1
+            except Exception as e:
+                print(f"Thumbnail error for {sha256}: {str(e)}")
+                updates['status'] = 'failed'
+                self.failed += 1
+            Image.query.filter_by(sha256=sha256, status='pending') \
+                .update(updates, synchronize_session=False)
+
+        db.session.commit()
+        return len(hashes)
+
+    def stats(self):
+        """
+        Get rendering counters.
+
+        Returns:
+            dict: Rendered and failed counts since start
+        """
+        return {'rendered': self.rendered, 'failed': self.failed}
+
+    def _render(self, sha256):
+        args = (
+            image_store.original_path(sha256),
+            lambda size: image_store.thumbnail_path(sha256, size)
+        )
+        # Decoding and resizing are CPU-bound; keep them off the eventlet hub
+        if patcher.is_monkey_patched('thread'):
+            return tpool.execute(render_thumbnails, *args)
+        return render_thumbnails(*args)
+
+    def _run(self):
+        while True:
+            processed = 0
+            try:
+                with self.app.app_context():
+                    processed = self.process_pending()
+            except Exception as e:
+                print(f"Thumbnail worker error: {str(e)}")
+            if processed < self.batch_size:
+                socketio.sleep(self.poll_interval)
+
+
+image_store = ImageStore()
+thumbnail_worker = ThumbnailWorker()
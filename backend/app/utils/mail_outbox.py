@@ -0,0 +1,163 @@
+"""
+Asynchronous mail delivery for the FoodShare application.
+
+Requests only insert a row into ``mail_outbox``. A background sender picks up
+due messages in batches, delivers each batch over a single SMTP connection,
+and retries failures with exponential backoff.
+"""
+from datetime import datetime, timedelta
+from flask_mail import Message
+from app import db, mail, socketio
+from app.models.outbox import OutboxMessage
+
+
+def queue_mail(subject, recipients, body, sender=None):
+    """
+    Queue an email for delivery; the caller commits.
+
+    Args:
+        subject: Email subject
+        recipients: List of recipient addresses
+        body: Plain-text body
+        sender: Sender address (default: MAIL_USERNAME)
+
+    Returns:
+        OutboxMessage: The queued message
+    """
+    message = OutboxMessage(
+        subject=subject,
+        sender=sender or mail.username,
+        recipients=','.join(recipients),
+        body=body,
+        status='pending'
+    )
+    db.session.add(message)
+    return message
+
+
+class MailOutbox:
+    """Background sender that drains the mail outbox."""
+
+    def __init__(self, batch_size=50, max_attempts=5, retry_base=30, poll_interval=2):
+        self.app = None
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.retry_base = retry_base
+        self.poll_interval = poll_interval
+        self._worker = None
+        self.sent = 0
+        self.failed = 0
+        self.retried = 0
+
+    def init_app(self, app):
+        """
+        Configure the sender from application settings.
+
+        Args:
+            app: Flask application instance
+        """
+        self.app = app
+        self.batch_size = app.config.get('MAIL_OUTBOX_BATCH_SIZE', self.batch_size)
+        self.max_attempts = app.config.get('MAIL_OUTBOX_MAX_ATTEMPTS', self.max_attempts)
+        self.retry_base = app.config.get('MAIL_OUTBOX_RETRY_BASE', self.retry_base)
+        self.poll_interval = app.config.get('MAIL_OUTBOX_POLL_INTERVAL', self.poll_interval)
+
+    def start(self):
+        """Start the background sender if it is not already running."""
+        if self._worker is None:
+            self._worker = socketio.start_background_task(self._run)
+
+    def send_pending(self):
+        """
+        Deliver one batch of due messages over a single SMTP connection.
+
+        Must be called inside an application context.
+
+        Returns:
+            int: Number of messages processed (sent or rescheduled)
+        """
+        now = datetime.utcnow()
+        batch = OutboxMessage.query.filter(
+            OutboxMessage.status == 'pending',
+            OutboxMessage.next_attempt_at <= now
+        ).order_by(OutboxMessage.next_attempt_at, OutboxMessage.id).limit(self.batch_size).all()
+
+        if not batch:
+            return 0
+
+        handled = set()
+        try:
+            with mail.connect() as connection:
+                for message in batch:
+                    try:
+                        connection.send(Message(
+                            message.subject,
+                            sender=message.sender,
+                            recipients=message.recipient_list(),
+                            body=message.body
+                        ))
+                    except Exception as e:
+                        self._reschedule(message, e, now)
+                    else:
+                        message.status = 'sent'
+                        message.sent_at = datetime.utcnow()
+                        self.sent += 1
+                    handled.add(message.id)
+        except Exception as e:
+            # Connecting (or the connection itself) failed; retry the rest later
+            for message in batch:
+                if message.id not in handled:
+                    self._reschedule(message, e, now)
+
+        db.session.commit()
+        return len(batch)
+
+    def queue_depth(self):
+        """
+        Count messages waiting to be delivered.
+
+        Returns:
+            int: Number of pending messages
+        """
+        return db.session.query(db.func.count(OutboxMessage.id)) \
+            .filter(OutboxMessage.status == 'pending') \
+            .scalar()
+
+    def stats(self):
+        """
+        Get delivery counters and the current queue depth.
+
+        Returns:
+            dict: Sent, retried and failed counts since start, and the
+                  number of pending messages
+        """
+        return {
+            'sent': self.sent,
+            'retried': self.retried,
+            'failed': self.failed,
+            'queue_depth': self.queue_depth()
+        }
+
+    def _reschedule(self, message, error, now):
+        message.attempts += 1
+        message.last_error = str(error)
+        if message.attempts >= self.max_attempts:
+            message.status = 'failed'
+            self.failed += 1
+        else:
+            message.next_attempt_at = now + timedelta(seconds=self.retry_base * 2 ** (message.attempts - 1))
+            self.retried += 1
+
+    def _run(self):
+        while True:
+            processed = 0
+            try:
+                with self.app.app_context():
+                    processed = self.send_pending()
+            except Exception as e:
+                print(f"Mail outbox error: {str(e)}")
+            if processed < self.batch_size:
+                socketio.sleep(self.poll_interval)
+
+
+mail_outbox = MailOutbox()
@@ -0,0 +1,328 @@
+"""
+Request, database and Socket.IO metrics for the FoodShare application.
+
+With ``METRICS_ENABLED`` on, every HTTP request records its latency, status
+code and the number and duration of the SQL statements it ran, every
+Socket.IO handler records its latency, and ``/api/metrics`` renders these
+together with pool usage and the counters of the other utilities in the
+Prometheus text format. With it off no hooks are installed and the socket
+handler wrapper returns straight away.
+"""
+import inspect
+import time
+from functools import wraps
+from threading import Lock
+from flask import g, request, has_app_context
+from sqlalchemy import event
+
+# Latency buckets in seconds (upper bounds; +Inf is implied)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Statements-per-request buckets
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+class Histogram:
+    """Cumulative histogram with fixed buckets."""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        """Record one observation."""
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        self.sum += value
+        self.count += 1
+
+    def samples(self):
+        """Yield (le, cumulative count) pairs, ending with +Inf."""
+        total = 0
+        for bound, count in zip(self.buckets, self.counts):
+            total += count
+            yield format_value(bound), total
+        yield '+Inf', self.count
+
+
+class Metrics:
+    """Collects counters and histograms and renders them for Prometheus."""
+
+    def __init__(self):
+        self.enabled = False
+        self.token = None
+        self.app = None
+        self._lock = Lock()
+        self._reset()
+
+    def init_app(self, app):
+        """
+        Install the request and SQL hooks if metrics are enabled.
+
+        Must be called after the database has been initialized.
+
+        Args:
+            app: Flask application instance
+        """
+        self.app = app
+        self.enabled = app.config.get('METRICS_ENABLED', False)
+        self.token = app.config.get('METRICS_TOKEN')
+        with self._lock:
+            self._reset()
+        if not self.enabled:
+            return
+
+        app.before_request(start_request_timer)
+        app.after_request(self.record_request)
+
+        from app import db
+        with app.app_context():
+            for engine in db.engines.values():
+                event.listen(engine, 'before_cursor_execute', start_query_timer)
+                event.listen(engine, 'after_cursor_execute', self.record_query)
+                event.listen(engine, 'handle_error', discard_query_timer)
+
+    def record_request(self, response):
+        """after_request hook recording latency, status and SQL usage."""
+        started_at = g.pop('_metrics_started', None)
+        if started_at is None:
+            return response
+        elapsed = time.perf_counter() - started_at
+        endpoint = request.endpoint or 'unmatched'
+        with self._lock:
+            key = (endpoint, request.method, str(response.status_code))
+            self._requests[key] = self._requests.get(key, 0) + 1
+            self._histogram(self._latency, endpoint, LATENCY_BUCKETS).observe(elapsed)
+            self._histogram(self._request_queries, endpoint, QUERY_COUNT_BUCKETS).observe(
+                g.get('_metrics_queries', 0))
+            self._histogram(self._request_query_time, endpoint, LATENCY_BUCKETS).observe(
+                g.get('_metrics_query_seconds', 0.0))
+        return response
+
+    def record_query(self, conn, cursor, statement, parameters, context, executemany):
+        """after_cursor_execute hook counting statements and their time."""
+        starts = conn.info.get('_metrics_query_started')
+        if not starts:
+            return
+        elapsed = time.perf_counter() - starts.pop()
+        with self._lock:
+            self._queries += 1
+            self._query_seconds += elapsed
+        if has_app_context():
+            g._metrics_queries = g.get('_metrics_queries', 0) + 1
+            g._metrics_query_seconds = g.get('_metrics_query_seconds', 0.0) + elapsed
+
+    def socket_event(self, handler):
+        """
+        Decorator recording the count, errors and latency of a Socket.IO handler.
+
+        Place it below ``@socketio.on(...)``.
+        """
+        signature = inspect.signature(handler)
+
+        @wraps(handler)
+        def wrapper(*args, **kwargs):
+            if not self.enabled:
+                return handler(*args, **kwargs)
+            try:
+                signature.bind(*args, **kwargs)
+            except TypeError:
+                # Flask-SocketIO probes handlers with extra arguments first
+                return handler(*args, **kwargs)
+            name = getattr(request, 'event', {}).get('message', handler.__name__)
+            started_at = time.perf_counter()
+            failed = True
+            try:
+                result = handler(*args, **kwargs)
+                failed = False
+                return result
+            finally:
+                elapsed = time.perf_counter() - started_at
+                with self._lock:
+                    self._events[name] = self._events.get(name, 0) + 1
+                    if failed:
+                        self._event_errors[name] = self._event_errors.get(name, 0) + 1
+                    self._histogram(self._event_latency, name, LATENCY_BUCKETS).observe(elapsed)
+        return wrapper
+
+    def render(self):
+        """
+        Render every metric in the Prometheus text format.
+
+        Must be called inside an application context.
+
+        Returns:
+            str: Exposition text
+        """
+        lines = []
+        with self._lock:
+            counter(lines, 'foodshare_http_requests_total', 'HTTP responses by endpoint, method and status.',
+                    (({'endpoint': e, 'method': m, 'status': s}, n) for (e, m, s), n in self._requests.items()))
+            histogram(lines, 'foodshare_http_request_duration_seconds', 'HTTP request latency.',
+                      'endpoint', self._latency)
+            histogram(lines, 'foodshare_http_request_db_queries', 'SQL statements run per HTTP request.',
+                      'endpoint', self._request_queries)
+            histogram(lines, 'foodshare_http_request_db_seconds', 'Time spent in SQL per HTTP request.',
+                      'endpoint', self._request_query_time)
+            counter(lines, 'foodshare_db_queries_total', 'SQL statements executed.', [({}, self._queries)])
+            counter(lines, 'foodshare_db_query_seconds_total', 'Time spent executing SQL.',
+                    [({}, self._query_seconds)])
+            counter(lines, 'foodshare_socketio_events_total', 'Socket.IO events handled.',
+                    (({'event': name}, n) for name, n in self._events.items()))
+            counter(lines, 'foodshare_socketio_event_errors_total', 'Socket.IO handlers that raised.',
+                    (({'event': name}, n) for name, n in self._event_errors.items()))
+            histogram(lines, 'foodshare_socketio_event_duration_seconds', 'Socket.IO handler latency.',
+                      'event', self._event_latency)
+
+        pool_gauges(lines)
+        component_gauges(lines)
+        return '\n'.join(lines) + '\n'
+
+    def _histogram(self, histograms, label, buckets):
+        hist = histograms.get(label)
+        if hist is None:
+            hist = histograms[label] = Histogram(buckets)
+        return hist
+
+    def _reset(self):
+        self._requests = {}
+        self._latency = {}
+        self._request_queries = {}
+        self._request_query_time = {}
+        self._queries = 0
+        self._query_seconds = 0.0
+        self._events = {}
+        self._event_errors = {}
+        self._event_latency = {}
+
+
+def start_request_timer():
+    """before_request hook starting the request clock."""
+    g._metrics_started = time.perf_counter()
+
+
+def start_query_timer(conn, cursor, statement, parameters, context, executemany):
+    """before_cursor_execute hook starting the statement clock."""
+    conn.info.setdefault('_metrics_query_started', []).append(time.perf_counter())
+
+
+def discard_query_timer(exception_context):
+    """handle_error hook dropping the clock of a statement that failed."""
+    connection = exception_context.connection
+    if connection is not None and connection.info.get('_metrics_query_started'):
+        connection.info['_metrics_query_started'].pop()
+
+
+def format_value(value):
+    """Format a sample value the way Prometheus prints it."""
+    if isinstance(value, bool):
+        return '1' if value else '0'
+    if isinstance(value, float):
+        return repr(round(value, 6))
+    return str(value)
+
+
+def format_labels(labels):
+    """Format a label set, escaping backslashes, quotes and newlines."""
+    if not labels:
+        return ''
+    escaped = (
+        f'{name}="' + str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') + '"'
+        for name, value in labels.items()
+    )
+    return '{' + ','.join(escaped) + '}'
+
+
+def family(lines, name, kind, help_text, samples):
+    """Append one metric family (HELP, TYPE and its samples)."""
+    lines.append(f'# HELP {name} {help_text}')
+    lines.append(f'# TYPE {name} {kind}')
+    for labels, value in samples:
+        lines.append(f'{name}{format_labels(labels)} {format_value(value)}')
+
+
+def counter(lines, name, help_text, samples):
+    family(lines, name, 'counter', help_text, samples)
+
+
+def gauge(lines, name, help_text, samples):
+    family(lines, name, 'gauge', help_text, samples)
+
+
+def histogram(lines, name, help_text, label, histograms):
+    lines.append(f'# HELP {name} {help_text}')
+    lines.append(f'# TYPE {name} histogram')
+    for value, hist in histograms.items():
+        for le, count in hist.samples():
+            lines.append(f'{name}_bucket{format_labels({label: value, "le": le})} {count}')
+        lines.append(f'{name}_sum{format_labels({label: value})} {format_value(hist.sum)}')
+        lines.append(f'{name}_count{format_labels({label: value})} {hist.count}')
+
+
+def pool_gauges(lines):
+    """Append connection-pool usage for every database bind."""
+    from app import db
+
+    samples = {'size': [], 'checked_out': [], 'checked_in': [], 'overflow': []}
+    for bind, engine in db.engines.items():
+        pool = engine.pool
+        labels = {'bind': bind or 'primary'}
+        # Only queue pools keep these counts (not the static in-memory pool)
+        for key, method in (('size', 'size'), ('checked_out', 'checkedout'),
+                            ('checked_in', 'checkedin'), ('overflow', 'overflow')):
+            if hasattr(pool, method):
+                samples[key].append((labels, getattr(pool, method)()))
+    for key, values in samples.items():
+        gauge(lines, f'foodshare_db_pool_{key}', f'Connection pool {key.replace("_", " ")}.', values)
+
+
+def component_gauges(lines):
+    """Append the counters kept by the caches, queues and workers."""
+    from app.utils.chat_cache import chat_cache
+    from app.utils.typing_state import typing_coalescer
+    from app.utils.identity_cache import identity_cache
+    from app.utils.passwords import password_hasher
+    from app.utils.mail_outbox import mail_outbox
+    from app.utils.write_queue import write_queue
+    from app.utils.replica_sync import replica_sync
+    from app.utils.images import thumbnail_worker
+    from app.utils.roles import role_registry
+    from app.utils.profiling import slow_query_log
+    from app.utils.rate_limit import rate_limiter
+    from app.utils.database import routing_counts
+
+    components = {
+        'chat_cache': chat_cache.stats(),
+        'typing': typing_coalescer.stats(),
+        'identity_cache': identity_cache.stats(),
+        'password_hasher': password_hasher.stats(),
+        'mail_outbox': mail_outbox.stats(),
+        'write_queue': write_queue.stats(),
+        'replica_sync': replica_sync.stats(),
+        'thumbnails': thumbnail_worker.stats(),
+        'role_registry': role_registry.stats(),
+        'slow_queries': slow_query_log.stats()
+    }
+    for component, stats in components.items():
+        for key, value in stats.items():
+            if isinstance(value, (int, float)):
+                gauge(lines, f'foodshare_{component}_{key}', f'{component} {key}.', [({}, value)])
+
+    counter(lines, 'foodshare_db_routed_reads_total', 'SELECTs routed to the primary or the replica.',
+            (({'target': target}, n) for target, n in routing_counts.items()))
+
+    rate_limits = []
+    for name, counts in rate_limiter.stats().items():
+        endpoint, _, scope = name.rpartition(':')
+        for result, n in counts.items():
+            rate_limits.append(({'endpoint': endpoint, 'scope': scope, 'result': result}, n))
+    counter(lines, 'foodshare_rate_limit_checks_total', 'Rate limit decisions.', rate_limits)
+
+
+metrics = Metrics()
@@ -0,0 +1,129 @@
+"""
+Password hashing utilities for the FoodShare application.
+
+Key derivation is CPU-bound and would block the eventlet hub, stalling every
+Socket.IO client for the duration of a login. Under eventlet the work is run
+in eventlet's native thread pool instead, with a cap on how many hashes run
+at once so a login burst cannot take over every native thread.
+
+Hashes are made with ``PASSWORD_HASH_METHOD``; stored hashes made with an
+older method (or fewer iterations) are replaced on the next successful login.
+"""
+import time
+from functools import partial
+from threading import BoundedSemaphore, Lock
+from eventlet import patcher, tpool
+from werkzeug.security import generate_password_hash, check_password_hash
+
+
+class PasswordHasher:
+    """Runs password hashing off the eventlet hub with bounded concurrency."""
+
+    def __init__(self, max_concurrency=4, method='pbkdf2:sha256:600000'):
+        self.max_concurrency = max_concurrency
+        self.method = method
+        self._slots = BoundedSemaphore(max_concurrency)
+        self._lock = Lock()
+        self._reset_stats()
+
+    def init_app(self, app):
+        """
+        Configure the hasher from application settings.
+
+        Args:
+            app: Flask application instance
+        """
+        self.max_concurrency = app.config.get('PASSWORD_HASH_CONCURRENCY', self.max_concurrency)
+        self.method = app.config.get('PASSWORD_HASH_METHOD', self.method)
+        self._slots = BoundedSemaphore(self.max_concurrency)
+        with self._lock:
+            self._reset_stats()
+
+    def hash(self, password):
+        """
+        Hash a password.
+
+        Args:
+            password: Plain-text password
+
+        Returns:
+            str: Password hash
+        """
+        return self._run(partial(generate_password_hash, method=self.method), password)
+
+    def verify(self, password_hash, password):
+        """
+        Check a password against a stored hash.
+
+        Args:
+            password_hash: Stored password hash
+            password: Plain-text password to check
+
+        Returns:
+            bool: True if the password matches
+        """
+        return self._run(check_password_hash, password_hash, password)
+
+    def needs_rehash(self, password_hash):
+        """
+        Check whether a stored hash was made with another method.
+
+        Args:
+            password_hash: Stored password hash
+
+        Returns:
+            bool: True if the hash should be replaced after the next login
+        """
+        return password_hash.split('$', 1)[0] != self.method
+
+    def stats(self):
+        """
+        Get hashing counters and queue-time metrics.
+
+        Returns:
+            dict: Hashing statistics (times in seconds)
+        """
+        with self._lock:
+            return {
+                'max_concurrency': self.max_concurrency,
+                'in_flight': self._in_flight,
+                'waiting': self._waiting,
+                'completed': self._completed,
+                'queue_seconds_total': round(self._queue_seconds, 6),
+                'queue_seconds_max': round(self._queue_seconds_max, 6),
+                'hash_seconds_total': round(self._hash_seconds, 6)
+            }
+
+    def _run(self, func, *args):
+        queued_at = time.perf_counter()
+        with self._lock:
+            self._waiting += 1
+
+        with self._slots:
+            started_at = time.perf_counter()
+            waited = started_at - queued_at
+            with self._lock:
+                self._waiting -= 1
+                self._in_flight += 1
+                self._queue_seconds += waited
+                self._queue_seconds_max = max(self._queue_seconds_max, waited)
+            try:
+                if patcher.is_monkey_patched('thread'):
+                    return tpool.execute(func, *args)
+                return func(*args)
+            finally:
+                with self._lock:
+                    self._in_flight -= 1
+                    self._completed += 1
+                    self._hash_seconds += time.perf_counter() - started_at
+
+    def _reset_stats(self):
+        self._in_flight = 0
+        self._waiting = 0
+        self._completed = 0
+        self._queue_seconds = 0.0
+        self._queue_seconds_max = 0.0
+        self._hash_seconds = 0.0
+
+
+password_hasher = PasswordHasher()
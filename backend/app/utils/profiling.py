@@ -0,0 +1,243 @@
+"""
+Slow-query logging and on-demand request profiling for the FoodShare application.
+
+Statements slower than ``SLOW_QUERY_MS`` are printed with their duration,
+the shape of their parameters (types, not values) and the endpoint or
+Socket.IO event that ran them.
+
+With ``PROFILE_TOKEN`` set, a request carrying ``X-Profile: <token>`` is run
+under cProfile with tracemalloc tracing. Its profile (pstats format), its
+allocation snapshot and a text summary are written to ``PROFILE_DIR``
+(default instance/profiles), and the response carries ``X-Profile-Id``.
+One request is profiled at a time; cProfile sees every greenlet that runs
+on the hub meanwhile, so profile on a quiet worker when possible.
+"""
+import cProfile
+import hmac
+import io
+import os
+import pstats
+import time
+import tracemalloc
+import uuid
+from datetime import datetime
+from threading import Lock
+from flask import g, request, has_request_context
+from sqlalchemy import event
+from app.utils.query_counter import statement_shape
+
+# Longest statement text printed by the slow-query log
+MAX_STATEMENT_LENGTH = 2000
+
+PROFILE_HEADER = 'X-Profile'
+
+# Rows in the text summary of a profile
+SUMMARY_FUNCTIONS = 40
+SUMMARY_ALLOCATIONS = 25
+
+
+def parameter_shape(parameters, executemany=False):
+    """
+    Describe statement parameters by type so that no values are logged.
+
+    Args:
+        parameters: DBAPI parameters (sequence or mapping, or a list of them)
+        executemany: Whether ``parameters`` holds one set per execution
+
+    Returns:
+        str: e.g. "(int, str)", "{'id': int}" or "25 x (int, str)"
+    """
+    if executemany and isinstance(parameters, (list, tuple)):
+        first = parameter_shape(parameters[0]) if parameters else '()'
+        return f'{len(parameters)} x {first}'
+    if isinstance(parameters, dict):
+        return '{' + ', '.join(f'{key!r}: {type(value).__name__}' for key, value in parameters.items()) + '}'
+    if isinstance(parameters, (list, tuple)):
+        return '(' + ', '.join(type(value).__name__ for value in parameters) + ')'
+    return type(parameters).__name__
+
+
+def request_origin():
+    """Name the endpoint or Socket.IO event being served, if any."""
+    if not has_request_context():
+        return 'background'
+    socket_event = getattr(request, 'event', None)
+    if socket_event:
+        return f"socket:{socket_event.get('message')}"
+    return request.endpoint or 'unmatched'
+
+
+class SlowQueryLog:
+    """Prints SQL statements that take longer than a threshold."""
+
+    def __init__(self, threshold_ms=500):
+        self.threshold_ms = threshold_ms
+        self.logged = 0
+
+    def init_app(self, app):
+        """
+        Attach the statement timers to every engine if a threshold is set.
+
+        Must be called after the database has been initialized.
+
+        Args:
+            app: Flask application instance
+        """
+        from app import db
+
+        self.threshold_ms = app.config.get('SLOW_QUERY_MS', self.threshold_ms)
+        self.logged = 0
+        if not self.threshold_ms:
+            return
+
+        with app.app_context():
+            for engine in db.engines.values():
+                event.listen(engine, 'before_cursor_execute', start_statement_timer)
+                event.listen(engine, 'after_cursor_execute', self.check_statement)
+                event.listen(engine, 'handle_error', discard_statement_timer)
+
+    def check_statement(self, conn, cursor, statement, parameters, context, executemany):
+        """after_cursor_execute hook logging the statement if it was slow."""
+        starts = conn.info.get('_slow_query_started')
+        if not starts:
+            return
+        elapsed_ms = (time.perf_counter() - starts.pop()) * 1000
+        if elapsed_ms < self.threshold_ms:
+            return
+        self.logged += 1
+        print(
+            f"Slow query {elapsed_ms:.1f} ms [{request_origin()}]: "
+            f"{statement_shape(statement)[:MAX_STATEMENT_LENGTH]} "
+            f"params={parameter_shape(parameters, executemany)}"
+        )
+
+    def stats(self):
+        """
+        Get slow-query counters.
+
+        Returns:
+            dict: Statements logged since start
+        """
+        return {'logged': self.logged}
+
+
+def start_statement_timer(conn, cursor, statement, parameters, context, executemany):
+    """before_cursor_execute hook starting the statement clock."""
+    conn.info.setdefault('_slow_query_started', []).append(time.perf_counter())
+
+
+def discard_statement_timer(exception_context):
+    """handle_error hook dropping the clock of a statement that failed."""
+    connection = exception_context.connection
+    if connection is not None and connection.info.get('_slow_query_started'):
+        connection.info['_slow_query_started'].pop()
+
+
+class RequestProfiler:
+    """Profiles single requests on demand and writes the results to disk."""
+
+    def __init__(self):
+        self.app = None
+        self.token = None
+        self.directory = None
+        self._busy = Lock()
+
+    def init_app(self, app):
+        """
+        Install the profiling hooks if a profile token is configured.
+
+        Args:
+            app: Flask application instance
+        """
+        self.app = app
+        self.token = app.config.get('PROFILE_TOKEN')
+        self.directory = app.config.get('PROFILE_DIR') or os.path.join(app.instance_path, 'profiles')
+        if not self.token:
+            return
+
+        app.before_request(self.start)
+        app.after_request(self.finish)
+        app.teardown_request(self.abort)
+
+    def wanted(self):
+        """Check whether the current request asked for a profile with the right token."""
+        supplied = request.headers.get(PROFILE_HEADER)
+        return bool(supplied) and hmac.compare_digest(supplied.encode(), self.token.encode())
+
+    def start(self):
+        """before_request hook starting the profiler for opted-in requests."""
+        if not self.wanted() or not self._busy.acquire(blocking=False):
+            return
+        g._profile = {
+            'started_tracing': not tracemalloc.is_tracing(),
+            'profiler': cProfile.Profile(),
+            'started_at': time.perf_counter()
+        }
+        if g._profile['started_tracing']:
+            tracemalloc.start()
+        g._profile['profiler'].enable()
+
+    def finish(self, response):
+        """after_request hook writing the profile and tagging the response."""
+        profile = g.pop('_profile', None)
+        if profile is None:
+            return response
+        try:
+            profile['profiler'].disable()
+            elapsed = time.perf_counter() - profile['started_at']
+            snapshot = tracemalloc.take_snapshot()
+            response.headers['X-Profile-Id'] = self.write(profile['profiler'], snapshot, elapsed, response.status_code)
+        except Exception as e:
+            print(f"Request profile error: {str(e)}")
+        finally:
+            self._stop(profile)
+        return response
+
+    def abort(self, exception=None):
+        """teardown_request hook stopping a profile that never reached after_request."""
+        profile = g.pop('_profile', None)
+        if profile is not None:
+            profile['profiler'].disable()
+            self._stop(profile)
+
+    def write(self, profiler, snapshot, elapsed, status_code):
+        """
+        Write a profile, its allocation snapshot and a text summary.
+
+        Args:
+            profiler: Disabled cProfile.Profile
+            snapshot: tracemalloc.Snapshot taken at the end of the request
+            elapsed: Wall-clock seconds of the request
+            status_code: Response status
+
+        Returns:
+            str: Profile ID (the common file name stem)
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        endpoint = (request.endpoint or 'unmatched').replace('.', '-')
+        profile_id = f"{datetime.utcnow():%Y%m%dT%H%M%S}-{endpoint}-{uuid.uuid4().hex[:8]}"
+        stem = os.path.join(self.directory, profile_id)
+
+        profiler.dump_stats(f'{stem}.prof')
+        snapshot.dump(f'{stem}.tracemalloc')
+
+        summary = io.StringIO()
+        summary.write(f'{request.method} {request.full_path} -> {status_code} in {elapsed * 1000:.1f} ms\n\n')
+        pstats.Stats(profiler, stream=summary).sort_stats('cumulative').print_stats(SUMMARY_FUNCTIONS)
+        summary.write('\nTop allocations by line:\n')
+        for stat in snapshot.statistics('lineno')[:SUMMARY_ALLOCATIONS]:
+            summary.write(f'{stat}\n')
+        with open(f'{stem}.txt', 'w') as f:
+            f.write(summary.getvalue())
+
+        print(f"Request profile written to {stem}.*")
+        return profile_id
+
+    def _stop(self, profile):
+        if profile['started_tracing']:
+            tracemalloc.stop()
+        self._busy.release()
+
+
+slow_query_log = SlowQueryLog()
+request_profiler = RequestProfiler()
@@ -0,0 +1,119 @@
+"""
+SQL statement counting utilities for the FoodShare application.
+
+``count_queries`` records every statement run on any database bind inside
+its block. Statements with the same shape (the SQL text with parameter
+lists collapsed) run several times usually mean an N+1 pattern: one query
+per row of an earlier result instead of one query for all of them.
+"""
+import re
+from collections import Counter
+from contextlib import contextmanager
+from sqlalchemy import event
+from app import db
+
+# Placeholders of the qmark (SQLite) and format/pyformat (psycopg2) styles;
+# expanded IN lists ("?, ?, ?") collapse to a single "?"
+PLACEHOLDER = r'(?:\?|%\(\w+\)s|%s)'
+PLACEHOLDER_LIST = re.compile(PLACEHOLDER + r'(?:\s*,\s*' + PLACEHOLDER + r')*')
+WHITESPACE = re.compile(r'\s+')
+
+
+def statement_shape(statement):
+    """
+    Normalize a SQL statement so repeats with different parameters match.
+
+    Args:
+        statement: SQL text as sent to the driver
+
+    Returns:
+        str: Statement with whitespace and parameter lists collapsed
+    """
+    return PLACEHOLDER_LIST.sub('?', WHITESPACE.sub(' ', statement).strip())
+
+
+class QueryCounter:
+    """Statements recorded by ``count_queries``."""
+
+    def __init__(self):
+        self.statements = []
+
+    @property
+    def count(self):
+        """Number of statements run."""
+        return len(self.statements)
+
+    def repeated(self, threshold=3):
+        """
+        Find statement shapes that ran at least ``threshold`` times.
+
+        Args:
+            threshold: Repeats that count as an N+1 pattern
+
+        Returns:
+            dict: {shape: times run}, most frequent first
+        """
+        shapes = Counter(statement_shape(statement) for statement in self.statements)
+        return {shape: n for shape, n in shapes.most_common() if n >= threshold}
+
+    def check_budget(self, max_queries, repeat_threshold=3):
+        """
+        Raise if the block ran more statements than allowed or an N+1 pattern.
+
+        Args:
+            max_queries: Maximum number of statements
+            repeat_threshold: Repeats of one shape that count as an N+1 pattern
+
+        Raises:
+            AssertionError: Describing the statements that broke the budget
+        """
+        problems = []
+        if self.count > max_queries:
+            problems.append(f'{self.count} queries run, budget is {max_queries}')
+        for shape, n in self.repeated(repeat_threshold).items():
+            problems.append(f'possible N+1: {n} x {shape}')
+        if problems:
+            listing = '\n'.join(f'  {i + 1}. {statement}' for i, statement in enumerate(self.statements))
+            raise AssertionError('\n'.join(problems) + '\nStatements:\n' + listing)
+
+
+@contextmanager
+def count_queries():
+    """
+    Record the SQL statements run inside the block.
+
+    Must be used inside an application context.
+
+    Yields:
+        QueryCounter: Filled in as statements run
+    """
+    counter = QueryCounter()
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        counter.statements.append(statement)
+
+    engines = list(db.engines.values())
+    for engine in engines:
+        event.listen(engine, 'before_cursor_execute', record)
+    try:
+        yield counter
+    finally:
+        for engine in engines:
+            event.remove(engine, 'before_cursor_execute', record)
+
+
+@contextmanager
+def query_budget(max_queries, repeat_threshold=3):
+    """
+    Fail if the block runs more than ``max_queries`` statements or an N+1 pattern.
+
+    Args:
+        max_queries: Maximum number of statements
+        repeat_threshold: Repeats of one shape that count as an N+1 pattern
+
+    Yields:
+        QueryCounter: Statements run so far
+    """
+    with count_queries() as counter:
+        yield counter
+    counter.check_budget(max_queries, repeat_threshold)
@@ -0,0 +1,221 @@
+"""
+Rate limiting utilities for the FoodShare application.
+
+Expensive endpoints are protected with token buckets keyed per client IP and
+per user. Buckets live in process memory by default; setting
+``RATELIMIT_STORAGE_URL`` to a ``redis://`` URL shares them between workers
+(requires the optional ``redis`` package).
+"""
+import math
+import time
+from collections import OrderedDict
+from functools import wraps
+from threading import Lock
+from flask import request, jsonify
+
+PERIODS = {'second': 1, 'minute': 60, 'hour': 3600, 'day': 86400}
+
+REDIS_TOKEN_BUCKET = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = tonumber(state[1]) or capacity
+local updated = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - updated) * rate)
+local allowed = 0
+local retry_after = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+else
+    retry_after = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'updated', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+return {allowed, tostring(retry_after)}
+"""
+
+
+def parse_rate(rate):
+    """
+    Parse a rate string such as '10/minute'.
+
+    Args:
+        rate: '<count>/<second|minute|hour|day>'
+
+    Returns:
+        tuple: (capacity, tokens refilled per second)
+
+    Raises:
+        ValueError: If the rate string is malformed
+    """
+    try:
+        count, period = rate.split('/')
+        capacity = int(count)
+        seconds = PERIODS[period.strip().rstrip('s')]
+    except (AttributeError, KeyError, ValueError):
+        raise ValueError(f"Invalid rate limit '{rate}'")
+    return capacity, capacity / seconds
+
+
+class MemoryBackend:
+    """In-process token buckets with a bounded number of keys."""
+
+    def __init__(self, max_keys=100000, clock=time.monotonic):
+        self.max_keys = max_keys
+        self._clock = clock
+        self._buckets = OrderedDict()  # {key: (tokens, updated)}
+        self._lock = Lock()
+
+    def consume(self, key, capacity, rate):
+        """
+        Take one token from a bucket.
+
+        Returns:
+            tuple: (allowed, seconds until a token is available)
+        """
+        now = self._clock()
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated) * rate)
+            if tokens >= 1:
+                allowed, retry_after = True, 0.0
+                tokens -= 1
+            else:
+                allowed, retry_after = False, (1 - tokens) / rate
+            self._buckets[key] = (tokens, now)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+            return allowed, retry_after
+
+
+class RedisBackend:
+    """Token buckets shared between processes through Redis."""
+
+    def __init__(self, url):
+        import redis
+        self._client = redis.Redis.from_url(url)
+        self._script = self._client.register_script(REDIS_TOKEN_BUCKET)
+
+    def consume(self, key, capacity, rate):
+        """
+        Take one token from a bucket.
+
+        Returns:
+            tuple: (allowed, seconds until a token is available)
+        """
+        allowed, retry_after = self._script(keys=[f'ratelimit:{key}'], args=[capacity, rate, time.time()])
+        return bool(allowed), float(retry_after)
+
+
+class RateLimiter:
+    """Per-route token-bucket rate limiter."""
+
+    def __init__(self):
+        self.enabled = True
+        self.overrides = {}
+        self.backend = MemoryBackend()
+        self._counters = {}
+        self._lock = Lock()
+
+    def init_app(self, app):
+        """
+        Configure the limiter from application settings.
+
+        RATELIMITS maps an endpoint name (e.g. 'auth.login') to a dict of
+        scope ('ip' or 'user') to rate string, overriding the defaults
+        declared on the route.
+
+        Args:
+            app: Flask application instance
+        """
+        self.enabled = app.config.get('RATELIMIT_ENABLED', True)
+        self.overrides = app.config.get('RATELIMITS', {})
+        storage_url = app.config.get('RATELIMIT_STORAGE_URL')
+        if storage_url:
+            self.backend = RedisBackend(storage_url)
+        else:
+            self.backend = MemoryBackend(max_keys=app.config.get('RATELIMIT_MAX_KEYS', 100000))
+        with self._lock:
+            self._counters = {}
+
+    def limit(self, ip=None, user=None, user_key=None, when=None):
+        """
+        Decorate a route with per-IP and per-user limits.
+
+        Args:
+            ip: Rate per client IP, e.g. '20/minute'
+            user: Rate per user
+            user_key: Callable returning the user identity for the request
+                      (default: the authenticated user's ID)
+            when: Callable deciding whether the request is limited at all
+
+        Returns:
+            function: Route decorator
+        """
+        def decorator(view):
+            @wraps(view)
+            def wrapped(*args, **kwargs):
+                if self.enabled and (when is None or when()):
+                    retry_after = self._check(request.endpoint, ip, user, user_key)
+                    if retry_after is not None:
+                        response = jsonify({'error': 'Too many requests. Please try again later.'})
+                        response.status_code = 429
+                        response.headers['Retry-After'] = str(max(1, math.ceil(retry_after)))
+                        return response
+                return view(*args, **kwargs)
+            return wrapped
+        return decorator
+
+    def stats(self):
+        """
+        Get allowed and limited request counts per endpoint and scope.
+
+        Returns:
+            dict: {'<endpoint>:<scope>': {'allowed': n, 'limited': n}}
+        """
+        with self._lock:
+            return {name: dict(counts) for name, counts in self._counters.items()}
+
+    def _check(self, endpoint, ip_rate, user_rate, user_key):
+        rates = dict(ip=ip_rate, user=user_rate)
+        rates.update(self.overrides.get(endpoint, {}))
+
+        identities = {}
+        if rates.get('ip'):
+            identities['ip'] = request.remote_addr
+        if rates.get('user'):
+            identities['user'] = user_key() if user_key else _current_user_id()
+
+        retry_after = None
+        for scope, identity in identities.items():
+            if identity is None:
+                continue
+            capacity, rate = parse_rate(rates[scope])
+            allowed, wait = self.backend.consume(f'{endpoint}:{scope}:{identity}', capacity, rate)
+            self._count(f'{endpoint}:{scope}', allowed)
+            if not allowed:
+                retry_after = max(retry_after or 0, wait)
+        return retry_after
+
+    def _count(self, name, allowed):
+        with self._lock:
+            counts = self._counters.setdefault(name, {'allowed': 0, 'limited': 0})
+            counts['allowed' if allowed else 'limited'] += 1
+
+
+def _current_user_id():
+    from app.utils.auth import get_current_user
+    user = get_current_user()
+    return user.user_id if user else None
+
+
+def request_email():
+    """Use the email in the JSON body as the user identity (for login and signup)."""
+    data = request.get_json(silent=True) or {}
+    email = data.get('email')
+    return email.lower() if isinstance(email, str) else None
+
+
+rate_limiter = RateLimiter()
@@ -0,0 +1,287 @@
+"""
+Rating aggregate utilities for the FoodShare application.
+
+``user_rating_stats`` holds one row of running totals per rated user. It is
+updated in the same transaction as every rating write, so reads are a
+primary-key lookup instead of aggregates over ``ratings``. Ratings are
+unique per giver, receiver and resource; resubmitting replaces the score.
+"""
+from datetime import datetime
+from importlib import import_module
+from sqlalchemy import case, func, insert, literal, tuple_, update
+from sqlalchemy.exc import IntegrityError
+from app import db
+from app.models.rating import Rating, UserRatingStats, RATING_SCORES
+from app.utils.reputation import decay_weight, reputation_score
+
+# Dialects with INSERT ... ON CONFLICT; imported on first use to keep start-up fast
+UPSERT_DIALECTS = {
+    'sqlite': 'sqlalchemy.dialects.sqlite',
+    'postgresql': 'sqlalchemy.dialects.postgresql'
+}
+
+# Columns of the unique rating key
+RATING_KEY_COLUMNS = ('giver_id', 'receiver_id', 'resource_id', 'resource_type')
+
+
+def apply_rating(receiver_id, score, rated_at, delta=1):
+    """
+    Add a rating to (or, with delta=-1, remove it from) a user's aggregates.
+
+    Must be called inside the transaction that writes the rating itself.
+
+    Args:
+        receiver_id: ID of the rated user
+        score: Score of the rating
+        rated_at: When the rating was given
+        delta: 1 to add the rating, -1 to remove it
+    """
+    bucket = f'score_{score}'
+    now = datetime.utcnow()
+    weight = decay_weight(rated_at) * delta
+    stats = UserRatingStats.__table__.c
+
+    increments = {
+        'score_sum': stats.score_sum + score * delta,
+        'rating_count': stats.rating_count + delta,
+        bucket: stats[bucket] + delta,
+        'decayed_score_sum': stats.decayed_score_sum + score * weight,
+        'decayed_weight': stats.decayed_weight + weight,
+        'last_updated': now
+    }
+
+    dialect_module = UPSERT_DIALECTS.get(db.session.get_bind().dialect.name)
+    if dialect_module is not None:
+        stmt = import_module(dialect_module).insert(UserRatingStats).values(
+            user_id=receiver_id,
+            score_sum=score * delta,
+            rating_count=delta,
+            decayed_score_sum=score * weight,
+            decayed_weight=weight,
+            last_updated=now,
+            **{b: (delta if b == bucket else 0) for b in (f'score_{s}' for s in RATING_SCORES)}
+        ).on_conflict_do_update(index_elements=['user_id'], set_=increments)
+        db.session.execute(stmt)
+        return
+
+    result = db.session.execute(
+        update(UserRatingStats).where(stats.user_id == receiver_id).values(**increments)
+    )
+    if result.rowcount == 0:
+        stats_row = UserRatingStats(
+            user_id=receiver_id,
+            score_sum=score * delta,
+            rating_count=delta,
+            decayed_score_sum=score * weight,
+            decayed_weight=weight,
+            last_updated=now
+        )
+        setattr(stats_row, bucket, delta)
+        db.session.add(stats_row)
+
+
+def save_rating(giver_id, receiver_id, resource_id, resource_type, score, comment=''):
+    """
+    Insert a rating, or update it if the giver already rated this resource.
+
+    The unique index on (giver_id, receiver_id, resource_id, resource_type)
+    keeps concurrent submissions from creating duplicates. On dialects with
+    ON CONFLICT the insert is a single ``INSERT ... ON CONFLICT DO NOTHING``,
+    which opens the transaction and takes the write lock; elsewhere it runs
+    in a savepoint. The receiver's aggregates are adjusted in the same
+    transaction; the caller commits.
+
+    Returns:
+        tuple: (Rating, created) where created is False for an update
+    """
+    values = {
+        'giver_id': giver_id,
+        'receiver_id': receiver_id,
+        'resource_id': resource_id,
+        'resource_type': resource_type,
+        'score': score,
+        'comment': comment,
+        'created_at': datetime.utcnow()
+    }
+
+    dialect_module = UPSERT_DIALECTS.get(db.session.get_bind().dialect.name)
+    if dialect_module is not None:
+        # A savepoint is no use here: pysqlite does not BEGIN before SAVEPOINT,
+        # so releasing it would commit the rating before its aggregates
+        rating_id = db.session.execute(
+            import_module(dialect_module).insert(Rating).values(**values)
+            .on_conflict_do_nothing(index_elements=list(RATING_KEY_COLUMNS))
+            .returning(Rating.rating_id)
+        ).scalar()
+        if rating_id is None:
+            return _replace_rating(values), False
+        apply_rating(receiver_id, score, values['created_at'])
+        return db.session.get(Rating, rating_id), True
+
+    rating = Rating(**values)
+    try:
+        with db.session.begin_nested():
+            db.session.add(rating)
+    except IntegrityError:
+        return _replace_rating(values), False
+
+    apply_rating(receiver_id, score, rating.created_at)
+    return rating, True
+
+
+def _replace_rating(values):
+    """Replace the score and comment of an existing rating and its aggregates."""
+    rating = Rating.query.filter_by(**{column: values[column] for column in RATING_KEY_COLUMNS}).one()
+    # The replaced score keeps the weight of the original rating time
+    apply_rating(rating.receiver_id, rating.score, rating.created_at, delta=-1)
+    rating.score = values['score']
+    rating.comment = values['comment']
+    apply_rating(rating.receiver_id, rating.score, rating.created_at)
+    return rating
+
+
+def find_existing_ratings(keys):
+    """
+    Check which (giver_id, receiver_id, resource_id, resource_type) tuples
+    have been rated, using one query on the unique index.
+
+    Args:
+        keys: Iterable of rating key tuples, normalized to (int, int, int, str)
+            so they compare equal to the rows read back
+
+    Returns:
+        set: The subset of keys that already have a rating
+    """
+    keys = set(keys)
+    if not keys:
+        return set()
+    columns = (Rating.giver_id, Rating.receiver_id, Rating.resource_id, Rating.resource_type)
+    rows = db.session.query(*columns).filter(tuple_(*columns).in_(keys)).all()
+    return {tuple(row) for row in rows}
+
+
+def get_rating_stats(user_id):
+    """
+    Get the rating aggregates of a user.
+
+    Args:
+        user_id: ID of the user
+
+    Returns:
+        UserRatingStats: Aggregates, or None if the user has never been rated
+    """
+    return db.session.get(UserRatingStats, user_id)
+
+
+def get_rating_stats_many(user_ids):
+    """
+    Get the rating aggregates of many users with a single query.
+
+    Args:
+        user_ids: IDs of the users
+
+    Returns:
+        dict: UserRatingStats keyed by user ID (unrated users are absent)
+    """
+    user_ids = set(user_ids)
+    if not user_ids:
+        return {}
+    rows = UserRatingStats.query.filter(UserRatingStats.user_id.in_(user_ids)).all()
+    return {stats.user_id: stats for stats in rows}
+
+
+def rating_summary(stats):
+    """
+    Summarize rating aggregates for API responses.
+
+    Args:
+        stats: UserRatingStats instance or None for an unrated user
+
+    Returns:
+        dict: Average rating (one decimal) and rating count
+    """
+    return {
+        'average_rating': round(stats.average, 1) if stats else 0,
+        'rating_count': stats.rating_count if stats else 0,
+        'reputation': round(stats.reputation() if stats else reputation_score(0, 0), 2)
+    }
+
+
+def rebuild_rating_stats():
+    """
+    Recompute every user's aggregates from the ratings table.
+
+    Used to repair drift, e.g. after ratings were edited outside the API.
+
+    Returns:
+        int: Number of users with ratings
+    """
+    columns = [
+        Rating.receiver_id,
+        func.sum(Rating.score),
+        func.count(Rating.rating_id)
+    ]
+    columns += [func.sum(case((Rating.score == score, 1), else_=0)) for score in RATING_SCORES]
+    columns.append(literal(datetime.utcnow()))
+
+    aggregates = db.select(*columns) \
+        .where(Rating.receiver_id.isnot(None)) \
+        .group_by(Rating.receiver_id)
+
+    target = ['user_id', 'score_sum', 'rating_count']
+    target += [f'score_{score}' for score in RATING_SCORES]
+    target.append('last_updated')
+
+    db.session.execute(db.delete(UserRatingStats))
+    db.session.execute(insert(UserRatingStats).from_select(target, aggregates))
+
+    # Decay weights need exp(), which SQLite may lack, so sum them in Python
+    decayed = {}
+    ratings = db.session.query(Rating.receiver_id, Rating.score, Rating.created_at) \
+        .filter(Rating.receiver_id.isnot(None)) \
+        .execution_options(yield_per=1000)
+    for receiver_id, score, created_at in ratings:
+        weight = decay_weight(created_at or datetime.utcnow())
+        totals = decayed.setdefault(receiver_id, [0.0, 0.0])
+        totals[0] += score * weight
+        totals[1] += weight
+
+    if decayed:
+        db.session.execute(update(UserRatingStats), [
+            {'user_id': user_id, 'decayed_score_sum': totals[0], 'decayed_weight': totals[1]}
+            for user_id, totals in decayed.items()
+        ])
+    db.session.commit()
+
+    return db.session.query(func.count(UserRatingStats.user_id)).scalar()
+
+
+def setup_ratings():
+    """
+    Bring older databases up to the current rating schema.
+
+    Removes duplicate ratings (keeping the latest) and creates the unique
+    and receiver indexes if they are missing, then populates the aggregates
+    table when it is empty but ratings exist.
+    """
+    indexes = {index.name: index for index in Rating.__table__.indexes}
+    unique_index = indexes['uq_ratings_giver_receiver_resource']
+    rebuild = False
+
+    # create_all() does not add indexes to tables that already exist
+    indexes['ix_ratings_receiver_id'].create(bind=db.engine, checkfirst=True)
+
+    if unique_index.name not in {index['name'] for index in db.inspect(db.engine).get_indexes('ratings')}:
+        latest = db.select(func.max(Rating.rating_id)).group_by(
+            Rating.giver_id, Rating.receiver_id, Rating.resource_id, Rating.resource_type
+        )
+        removed = db.session.execute(
+            db.delete(Rating).where(Rating.rating_id.notin_(latest))
+        ).rowcount
+        db.session.commit()
+        unique_index.create(bind=db.engine, checkfirst=True)
+        rebuild = removed > 0
+
+    if rebuild or (db.session.query(UserRatingStats.user_id).first() is None
+                   and db.session.query(Rating.rating_id).first() is not None):
+        rebuild_rating_stats()
@@ -0,0 +1,142 @@
+"""
+SQLite read-replica synchronization for the FoodShare application.
+
+Server databases replicate on their own; point ``REPLICA_DATABASE_URI`` at
+the replica and reads are routed to it. For local setups where both the
+primary and the replica are SQLite files, this copies the primary into the
+replica with SQLite's online backup API whenever the primary has changed.
+"""
+import sqlite3
+import time
+from eventlet import patcher, tpool
+from app import db, socketio
+from app.utils.database import REPLICA_BIND
+
+
+class ReplicaSync:
+    """Periodically copies a SQLite primary into a SQLite replica."""
+
+    def __init__(self, interval=5):
+        self.app = None
+        self.interval = interval
+        self._source = None
+        self._data_version = None
+        self._worker = None
+        self.syncs = 0
+        self.skipped = 0
+        self.last_sync_seconds = 0.0
+
+    def init_app(self, app):
+        """
+        Configure the sync from application settings.
+
+        Args:
+            app: Flask application instance
+        """
+        self.app = app
+        self.interval = app.config.get('REPLICA_SYNC_INTERVAL', self.interval)
+        self.close()
+
+    def paths(self):
+        """
+        Get the primary and replica file paths.
+
+        Must be called inside an application context.
+
+        Returns:
+            tuple: (primary path, replica path), or None unless both are SQLite files
+        """
+        engines = db.engines
+        if REPLICA_BIND not in engines:
+            return None
+        primary, replica = engines[None].url, engines[REPLICA_BIND].url
+        if primary.get_backend_name() != 'sqlite' or replica.get_backend_name() != 'sqlite':
+            return None
+        if primary.database in (None, '', ':memory:') or replica.database in (None, '', ':memory:'):
+            return None
+        return primary.database, replica.database
+
+    def sync(self, force=False):
+        """
+        Copy the primary into the replica if it changed since the last copy.
+
+        Must be called inside an application context.
+
+        Args:
+            force: Copy even if the primary looks unchanged
+
+        Returns:
+            bool: True if a copy was made
+        """
+        paths = self.paths()
+        if paths is None:
+            return False
+
+        # Backups are CPU and I/O bound; keep them off the eventlet hub
+        if patcher.is_monkey_patched('thread'):
+            return tpool.execute(self._sync, paths, force)
+        return self._sync(paths, force)
+
+    def start(self):
+        """Start the background sync if a SQLite replica is configured."""
+        if self._worker is not None:
+            return
+        with self.app.app_context():
+            if self.paths() is None:
+                return
+        self._worker = socketio.start_background_task(self._run)
+
+    def stats(self):
+        """
+        Get sync counters.
+
+        Returns:
+            dict: Copies made, unchanged checks skipped and last copy duration
+        """
+        return {
+            'syncs': self.syncs,
+            'skipped': self.skipped,
+            'last_sync_seconds': round(self.last_sync_seconds, 6)
+        }
+
+    def close(self):
+        """Close the connection used to watch the primary."""
+        if self._source is not None:
+            self._source.close()
+        self._source = None
+        self._data_version = None
+
+    def _sync(self, paths, force):
+        primary_path, replica_path = paths
+        if self._source is None:
+            self._source = sqlite3.connect(primary_path, check_same_thread=False)
+
+        # data_version changes whenever another connection commits to the primary
+        data_version = self._source.execute('PRAGMA data_version').fetchone()[0]
+        if not force and data_version == self._data_version:
+            self.skipped += 1
+            return False
+
+        started_at = time.perf_counter()
+        replica = sqlite3.connect(replica_path)
+        try:
+            replica.execute(f"PRAGMA busy_timeout={int(self.app.config.get('SQLITE_BUSY_TIMEOUT', 5000))}")
+            self._source.backup(replica)
+        finally:
+            replica.close()
+        self._data_version = data_version
+        self.syncs += 1
+        self.last_sync_seconds = time.perf_counter() - started_at
+        return True
+
+    def _run(self):
+        while True:
+            try:
+                with self.app.app_context():
+                    self.sync()
+            except Exception as e:
+                print(f"Replica sync error: {str(e)}")
+            socketio.sleep(self.interval)
+
+
+replica_sync = ReplicaSync()
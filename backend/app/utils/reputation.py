@@ -0,0 +1,65 @@
+"""
+Time-decayed reputation scores for the FoodShare application.
+
+A rating's weight halves every ``REPUTATION_HALF_LIFE_DAYS``. Instead of
+decaying every user's state as time passes, each rating is stored with a
+weight that grows from a fixed epoch (forward decay), so adding or removing a
+rating is a plain increment and the decay is applied once, at read time. The
+decayed average is smoothed towards ``REPUTATION_PRIOR_MEAN`` with the
+strength of ``REPUTATION_PRIOR_WEIGHT`` ratings, so users with a handful of
+ratings do not outrank users with a long good record.
+
+Changing the half-life changes the stored weights; run
+``flask rebuild-rating-stats`` afterwards.
+"""
+import math
+from datetime import datetime
+from flask import current_app
+
+# Fixed reference point for forward-decayed weights
+DECAY_EPOCH = datetime(2024, 1, 1)
+
+DEFAULT_HALF_LIFE_DAYS = 180
+DEFAULT_PRIOR_MEAN = 3.0
+DEFAULT_PRIOR_WEIGHT = 5.0
+
+
+def _decay_rate():
+    half_life_days = current_app.config.get('REPUTATION_HALF_LIFE_DAYS', DEFAULT_HALF_LIFE_DAYS)
+    return math.log(2) / (half_life_days * 86400)
+
+
+def decay_weight(rated_at):
+    """
+    Get the forward-decay weight of a rating given at a point in time.
+
+    Args:
+        rated_at: When the rating was given (naive UTC datetime)
+
+    Returns:
+        float: Weight relative to DECAY_EPOCH
+    """
+    return math.exp(_decay_rate() * (rated_at - DECAY_EPOCH).total_seconds())
+
+
+def reputation_score(weighted_sum, weight_total, now=None):
+    """
+    Compute a Bayesian-smoothed, time-decayed average score.
+
+    Args:
+        weighted_sum: Sum of score * decay_weight(rated_at) over all ratings
+        weight_total: Sum of decay_weight(rated_at) over all ratings
+        now: Time to decay to (default: current UTC time)
+
+    Returns:
+        float: Reputation score on the rating scale
+    """
+    prior_mean = current_app.config.get('REPUTATION_PRIOR_MEAN', DEFAULT_PRIOR_MEAN)
+    prior_weight = current_app.config.get('REPUTATION_PRIOR_WEIGHT', DEFAULT_PRIOR_WEIGHT)
+
+    # Bring the stored weights from epoch scale down to "now" scale
+    scale = 1 / decay_weight(now or datetime.utcnow())
+    decayed_sum = (weighted_sum or 0) * scale
+    decayed_weight = (weight_total or 0) * scale
+
+    return (prior_mean * prior_weight + decayed_sum) / (prior_weight + decayed_weight)
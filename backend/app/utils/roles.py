@@ -0,0 +1,136 @@
+"""
+Role registry for the FoodShare application.
+
+``roles`` is a handful of rows that almost never change, so the process
+keeps an id <-> name map of it. The map is dropped whenever a session
+commits a change to a Role, reloaded when an unknown role is looked up
+(another worker may have added it), and refreshed after ``ROLE_CACHE_TTL``
+seconds as a backstop.
+"""
+import time
+from itertools import chain
+from threading import Lock
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from app import db
+from app.models.user import Role
+
+
+class RoleRegistry:
+    """Process-wide map of role IDs to names."""
+
+    def __init__(self, ttl=300, clock=time.monotonic):
+        self.ttl = ttl
+        self._clock = clock
+        self._by_id = {}
+        self._by_name = {}
+        self._expires_at = None
+        self._lock = Lock()
+        self.loads = 0
+
+    def init_app(self, app):
+        """
+        Configure the registry from application settings.
+
+        Args:
+            app: Flask application instance
+        """
+        self.ttl = app.config.get('ROLE_CACHE_TTL', self.ttl)
+        self.invalidate()
+
+    def name_for(self, role_id):
+        """
+        Get the name of a role.
+
+        Args:
+            role_id: ID of the role (may be None)
+
+        Returns:
+            str: Role name, or None if there is no such role
+        """
+        if role_id is None:
+            return None
+        name = self._current()[0].get(role_id)
+        if name is None:
+            name = self.reload()[0].get(role_id)
+        return name
+
+    def id_for(self, name):
+        """
+        Get the ID of a role.
+
+        Args:
+            name: Role name (may be None)
+
+        Returns:
+            int: Role ID, or None if there is no such role
+        """
+        if name is None:
+            return None
+        role_id = self._current()[1].get(name)
+        if role_id is None:
+            role_id = self.reload()[1].get(name)
+        return role_id
+
+    def names(self):
+        """Get the names of every role."""
+        return set(self._current()[1])
+
+    def reload(self):
+        """
+        Load every role from the database.
+
+        Must be called inside an application context.
+
+        Returns:
+            tuple: ({role_id: name}, {name: role_id})
+        """
+        rows = db.session.query(Role.role_id, Role.name).all()
+        by_id = {role_id: name for role_id, name in rows}
+        by_name = {name: role_id for role_id, name in rows}
+        with self._lock:
+            self._by_id, self._by_name = by_id, by_name
+            self._expires_at = self._clock() + self.ttl
+            self.loads += 1
+        return by_id, by_name
+
+    def invalidate(self):
+        """Drop the map so the next lookup reloads it."""
+        with self._lock:
+            self._expires_at = None
+
+    def stats(self):
+        """
+        Get registry metrics.
+
+        Returns:
+            dict: Number of roles held and how often they were loaded
+        """
+        with self._lock:
+            return {'roles': len(self._by_id), 'loads': self.loads}
+
+    def _current(self):
+        with self._lock:
+            if self._expires_at is not None and self._expires_at > self._clock():
+                return self._by_id, self._by_name
+        return self.reload()
+
+
+@event.listens_for(Session, 'after_flush')
+def note_role_changes(session, flush_context):
+    if any(isinstance(obj, Role) for obj in chain(session.new, session.dirty, session.deleted)):
+        session.info['roles_changed'] = True
+
+
+@event.listens_for(Session, 'after_commit')
+def refresh_roles_after_commit(session):
+    if session.info.pop('roles_changed', False):
+        role_registry.invalidate()
+
+
+@event.listens_for(Session, 'after_rollback')
+def forget_role_changes(session):
+    session.info.pop('roles_changed', None)
+
+
+role_registry = RoleRegistry()
@@ -1,20 +1,179 @@
 """
 Setup utilities for the FoodShare application.
 """
+import hashlib
+import os
+from contextlib import contextmanager
+from sqlalchemy.exc import IntegrityError, OperationalError, ProgrammingError
 from app import db
 from app.models.user import Role
+from app.utils.roles import role_registry
 from werkzeug.security import generate_password_hash
 from datetime import datetime
 
+try:
+    import fcntl
+except ImportError:  # Windows: single-process development server only
+    fcntl = None
+
+# Bump when a setup step below changes (new seed data, data fix-ups, ...).
+# Model changes are picked up by the schema fingerprint automatically.
+SETUP_VERSION = 2
+
+schema_version = db.Table(
+    'schema_version',
+    db.Column('id', db.Integer, primary_key=True),
+    db.Column('version', db.String, nullable=False),
+    db.Column('stamped_at', db.DateTime)
+)
+
+
 def setup_roles():
     """
     Create default roles if they don't exist.
     """
     roles = ['undergrad', 'master', 'phd', 'employee', 'professor']
-    for role_name in roles:
-        if not Role.query.filter_by(name=role_name).first():
-            db.session.add(Role(name=role_name))
-    db.session.commit()
+    existing = role_registry.names()
+    missing = [role_name for role_name in roles if role_name not in existing]
+    if missing:
+        db.session.add_all(Role(name=role_name) for role_name in missing)
+        db.session.commit()
+
+
+def schema_fingerprint():
+    """
+    Fingerprint the tables, columns and indexes declared by the models.
+
+    Returns:
+        str: Short hash that changes whenever the declared schema changes
+    """
+    from app.models import user, food, rating, chat, image, outbox  # noqa: F401 (register every table)
+
+    parts = []
+    for table in sorted(db.metadata.tables.values(), key=lambda table: table.name):
+        parts.append(table.name)
+        parts.extend(f'{column.name}:{column.type!r}:{column.nullable}' for column in table.columns)
+        parts.extend(sorted(f'{index.name}:{index.unique}' for index in table.indexes))
+    return hashlib.sha1('\n'.join(parts).encode('utf-8')).hexdigest()[:16]
+
+
+def current_schema_version():
+    """Get the version stamp this code expects the database to carry."""
+    return f'{SETUP_VERSION}-{schema_fingerprint()}'
+
+
+def read_schema_version():
+    """
+    Read the version stamp of the database.
+
+    Returns:
+        str: The stamp, or None if the database was never stamped
+    """
+    try:
+        return db.session.execute(
+            db.select(schema_version.c.version).where(schema_version.c.id == 1)
+        ).scalar()
+    except (OperationalError, ProgrammingError):
+        db.session.rollback()
+        return None
+
+
+def create_missing_indexes():
+    """
+    Create declared indexes that are missing from existing tables.
+
+    create_all() only creates indexes together with their table.
+    """
+    for table in db.metadata.sorted_tables:
+        for index in table.indexes:
+            try:
+                index.create(bind=db.engine, checkfirst=True)
+            except (IntegrityError, OperationalError) as e:
+                print(f"Could not create index {index.name}: {str(e)}")
+
+
+def missing_schema_objects():
+    """
+    Compare the live database with the declared schema.
+
+    Returns:
+        list: Descriptions of missing tables, columns, indexes and chat search objects
+    """
+    from app.utils.chat_search import missing_search_objects
+
+    inspector = db.inspect(db.engine)
+    existing_tables = set(inspector.get_table_names())
+    missing = []
+    for table in db.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            missing.append(f'table {table.name}')
+            continue
+        columns = {column['name'] for column in inspector.get_columns(table.name)}
+        missing.extend(f'column {table.name}.{column.name}' for column in table.columns if column.name not in columns)
+        indexes = {index['name'] for index in inspector.get_indexes(table.name)}
+        missing.extend(f'index {index.name}' for index in table.indexes if index.name not in indexes)
+    missing.extend(f'chat search {name}' for name in missing_search_objects())
+    return missing
+
+
+@contextmanager
+def setup_lock(lock_path):
+    """Hold an exclusive file lock so concurrently booting workers set up one at a time."""
+    if lock_path is None or fcntl is None:
+        yield
+        return
+    os.makedirs(os.path.dirname(lock_path), exist_ok=True)
+    with open(lock_path, 'w') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def prepare_database(force=False, lock_path=None):
+    """
+    Create tables and run idempotent setup unless the database is up to date.
+
+    Every worker calls this at start-up; when the stamp written by the last
+    full setup matches the current code, it costs a single query. The stamp
+    is only written once the live schema has every declared table, column
+    and index, so a database setup cannot fix is checked again next boot.
+
+    Args:
+        force: Run the full setup even if the stamp matches
+        lock_path: File to lock while setting up, serializing workers that boot together
+
+    Returns:
+        bool: True if the full setup ran
+    """
+    from app.utils.chat_search import setup_chat_search
+    from app.utils.rating_stats import setup_ratings
+
+    version = current_schema_version()
+    if not force and read_schema_version() == version:
+        return False
+
+    with setup_lock(lock_path):
+        # Another worker may have finished the setup while we waited
+        if not force and read_schema_version() == version:
+            return False
+
+        db.create_all()
+        setup_roles()
+        setup_chat_search()
+        setup_ratings()
+        create_missing_indexes()
+
+        missing = missing_schema_objects()
+        if missing:
+            print(f"Database schema incomplete, not stamping version {version}: missing {', '.join(missing)}")
+            return True
+
+        db.session.execute(schema_version.delete())
+        db.session.execute(schema_version.insert().values(id=1, version=version, stamped_at=datetime.utcnow()))
+        db.session.commit()
+    return True
 
 
 def add_test_data():
@@ -0,0 +1,144 @@
+"""
+Typing-indicator coalescing for the FoodShare chat.
+
+Clients send a typing event on every keystroke. The coalescer keeps the
+typing state of each conversation so that only state transitions are relayed,
+throttles transitions per socket, and expires states whose client went quiet
+without sending stop_typing.
+"""
+import time
+from threading import Lock
+
+
+class TypingCoalescer:
+    """Per-conversation typing state with transition-only relaying."""
+
+    def __init__(self, ttl=6.0, min_interval=0.5, clock=time.monotonic):
+        self.ttl = ttl
+        self.min_interval = min_interval
+        self._clock = clock
+        self._states = {}  # {(user_id, other_user_id): expires_at}
+        self._last_emit = {}  # {sid: timestamp of last relayed start}
+        self._lock = Lock()
+        self.received = 0
+        self.emitted = 0
+        self.suppressed_duplicate = 0
+        self.suppressed_rate_limited = 0
+        self.expired = 0
+
+    def init_app(self, app):
+        """
+        Configure the coalescer from application settings.
+
+        Args:
+            app: Flask application instance
+        """
+        self.ttl = app.config.get('TYPING_STATE_TTL', self.ttl)
+        self.min_interval = app.config.get('TYPING_MIN_INTERVAL', self.min_interval)
+
+    def start(self, user_id, other_user_id, sid):
+        """
+        Record a typing event.
+
+        Args:
+            user_id: ID of the user who is typing
+            other_user_id: ID of the user they are typing to
+            sid: Socket ID the event came from
+
+        Returns:
+            bool: True if the receiver should be told that typing started
+        """
+        key = (user_id, other_user_id)
+        now = self._clock()
+        with self._lock:
+            self.received += 1
+            if key in self._states:
+                self._states[key] = now + self.ttl
+                self.suppressed_duplicate += 1
+                return False
+            if now - self._last_emit.get(sid, float('-inf')) < self.min_interval:
+                self.suppressed_rate_limited += 1
+                return False
+            self._states[key] = now + self.ttl
+            self._last_emit[sid] = now
+            self.emitted += 1
+            return True
+
+    def stop(self, user_id, other_user_id):
+        """
+        Record a stop-typing event.
+
+        Stops are never rate limited so a receiver is not left showing a
+        stale indicator.
+
+        Args:
+            user_id: ID of the user who stopped typing
+            other_user_id: ID of the user they were typing to
+
+        Returns:
+            bool: True if the receiver should be told that typing stopped
+        """
+        with self._lock:
+            self.received += 1
+            if self._states.pop((user_id, other_user_id), None) is None:
+                self.suppressed_duplicate += 1
+                return False
+            self.emitted += 1
+            return True
+
+    def expire(self):
+        """
+        Drop typing states that have not been refreshed within the TTL.
+
+        Returns:
+            list: (user_id, other_user_id) pairs whose receivers should be told
+                  that typing stopped
+        """
+        now = self._clock()
+        with self._lock:
+            stale = [key for key, expires_at in self._states.items() if expires_at <= now]
+            for key in stale:
+                del self._states[key]
+            self.expired += len(stale)
+            self.emitted += len(stale)
+            return stale
+
+    def disconnect(self, user_id, sid):
+        """
+        Drop all state of a disconnected socket.
+
+        Args:
+            user_id: ID of the user whose socket disconnected
+            sid: Socket ID that disconnected
+
+        Returns:
+            list: (user_id, other_user_id) pairs whose receivers should be told
+                  that typing stopped
+        """
+        with self._lock:
+            self._last_emit.pop(sid, None)
+            stale = [key for key in self._states if key[0] == user_id]
+            for key in stale:
+                del self._states[key]
+            self.emitted += len(stale)
+            return stale
+
+    def stats(self):
+        """
+        Get typing event counters.
+
+        Returns:
+            dict: Received, relayed and suppressed event counts
+        """
+        with self._lock:
+            return {
+                'active': len(self._states),
+                'received': self.received,
+                'emitted': self.emitted,
+                'suppressed_duplicate': self.suppressed_duplicate,
+                'suppressed_rate_limited': self.suppressed_rate_limited,
+                'expired': self.expired
+            }
+
+
+typing_coalescer = TypingCoalescer()
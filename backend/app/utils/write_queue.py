@@ -0,0 +1,171 @@
+"""
+Serialized database writes for the FoodShare application.
+
+SQLite allows one writer at a time. When many green threads commit at once
+they contend for the write lock and fail with "database is locked". With
+``WRITE_QUEUE_ENABLED`` set, units of work are instead queued to a single
+writer thread that runs them one after another in its own session, while
+reads keep using the request's session and the connection pool.
+
+A unit of work is a callable that changes ``db.session`` and returns plain
+data (not ORM instances, which belong to the writer's session). The queue
+commits after the unit returns and rolls back if it raises. When the queue
+is disabled, units run inline in the caller's session with the same commit
+semantics.
+"""
+import queue
+import threading
+import time
+from app import db
+from app.utils.database import pin_primary
+
+
+class _Job:
+    """A queued unit of work and its outcome."""
+
+    __slots__ = ('unit', 'queued_at', 'done', 'result', 'error')
+
+    def __init__(self, unit):
+        self.unit = unit
+        self.queued_at = time.perf_counter()
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class WriteQueue:
+    """Single-writer queue that serializes write transactions."""
+
+    def __init__(self):
+        self.app = None
+        self.enabled = False
+        self._jobs = queue.Queue()
+        self._worker = None
+        self._lock = threading.Lock()
+        self._reset_stats()
+
+    def init_app(self, app):
+        """
+        Configure the queue from application settings.
+
+        Args:
+            app: Flask application instance
+        """
+        with self._lock:
+            if self._worker is not None:
+                # The running writer belongs to the previous app; let it finish its queue
+                self._jobs.put(None)
+                self._jobs = queue.Queue()
+                self._worker = None
+            self._reset_stats()
+        self.app = app
+        self.enabled = app.config.get('WRITE_QUEUE_ENABLED', False)
+
+    def execute(self, unit):
+        """
+        Run a unit of work and commit it.
+
+        With the queue enabled the caller's read transaction is ended first,
+        so objects it loaded are refreshed on next access and see the write.
+
+        Args:
+            unit: Callable taking no arguments that changes db.session
+
+        Returns:
+            The unit's return value
+
+        Raises:
+            Exception: Whatever the unit (or the commit) raised
+        """
+        if not self.enabled:
+            started_at = time.perf_counter()
+            try:
+                result = unit()
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                self._record(wait=0.0, run=time.perf_counter() - started_at, failed=True)
+                raise
+            self._record(wait=0.0, run=time.perf_counter() - started_at, failed=False)
+            return result
+
+        db.session.rollback()
+        pin_primary()
+        job = _Job(unit)
+        self._ensure_worker().put(job)
+        job.done.wait()
+        if job.error is not None:
+            raise job.error
+        return job.result
+
+    def stats(self):
+        """
+        Get queue depth and wait-time metrics.
+
+        Returns:
+            dict: Queue statistics (times in seconds)
+        """
+        with self._lock:
+            return {
+                'enabled': self.enabled,
+                'depth': self._jobs.qsize(),
+                'completed': self._completed,
+                'failed': self._failed,
+                'wait_seconds_total': round(self._wait_seconds, 6),
+                'wait_seconds_max': round(self._wait_seconds_max, 6),
+                'run_seconds_total': round(self._run_seconds, 6)
+            }
+
+    def _ensure_worker(self):
+        with self._lock:
+            if self._worker is None:
+                # A regular thread is a green thread once eventlet has patched threading
+                self._worker = threading.Thread(
+                    target=self._run, args=(self.app, self._jobs), name='db-writer', daemon=True
+                )
+                self._worker.start()
+            return self._jobs
+
+    def _run(self, app, jobs):
+        with app.app_context():
+            while True:
+                job = jobs.get()
+                if job is None:
+                    return
+                started_at = time.perf_counter()
+                try:
+                    job.result = job.unit()
+                    db.session.commit()
+                except Exception as e:
+                    db.session.rollback()
+                    job.error = e
+                finally:
+                    # Don't let the writer's identity map grow across units
+                    db.session.remove()
+                    finished_at = time.perf_counter()
+                    self._record(
+                        wait=started_at - job.queued_at,
+                        run=finished_at - started_at,
+                        failed=job.error is not None
+                    )
+                    job.done.set()
+
+    def _record(self, wait, run, failed):
+        with self._lock:
+            if failed:
+                self._failed += 1
+            else:
+                self._completed += 1
+            self._wait_seconds += wait
+            self._wait_seconds_max = max(self._wait_seconds_max, wait)
+            self._run_seconds += run
+
+    def _reset_stats(self):
+        self._completed = 0
+        self._failed = 0
+        self._wait_seconds = 0.0
+        self._wait_seconds_max = 0.0
+        self._run_seconds = 0.0
+
+
+write_queue = WriteQueue()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Cold-start benchmark for the FoodShare backend.
+
+Starts fresh interpreters the way run.py does and reports, per start:
+import time, create_app time and time to the first request. "cold" starts
+use a new database (full schema setup); "warm" starts reuse a database whose
+schema stamp is current, which is what every worker sees after a deploy.
+
+Usage:
+    python benchmark_startup.py [--runs 5] [--budget 1.0] [--setup-mode auto] [--json out.json]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+CHILD = r"""
+import json, time, warnings
+warnings.simplefilter('ignore')
+started = time.perf_counter()
+import eventlet
+eventlet.monkey_patch()
+from app import create_app
+imported = time.perf_counter()
+app = create_app()
+created = time.perf_counter()
+response = app.test_client().get('/api/food_listings')
+assert response.status_code == 200, response.status_code
+served = time.perf_counter()
+print(json.dumps({
+    'import_seconds': imported - started,
+    'create_app_seconds': created - imported,
+    'first_request_seconds': served - created,
+    'total_seconds': served - started
+}))
+"""
+
+METRICS = ('import_seconds', 'create_app_seconds', 'first_request_seconds', 'total_seconds')
+
+
+def start_once(database_path, setup_mode):
+    env = dict(
+        os.environ,
+        FLASK_CONFIG='development',
+        DATABASE_URI=f'sqlite:///{database_path}',
+        DB_SETUP_MODE=setup_mode,
+        PYTHONWARNINGS='ignore'
+    )
+    env.pop('REPLICA_DATABASE_URI', None)
+    output = subprocess.run(
+        [sys.executable, '-c', CHILD],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def summarize(samples):
+    return {
+        metric: {
+            'median': round(statistics.median(sample[metric] for sample in samples), 4),
+            'max': round(max(sample[metric] for sample in samples), 4)
+        }
+        for metric in METRICS
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure FoodShare backend start-up time.')
+    parser.add_argument('--runs', type=int, default=5, help='Starts per scenario (default: 5)')
+    parser.add_argument('--budget', type=float, default=1.0,
+                        help='Warm-start budget for median total seconds (default: 1.0)')
+    parser.add_argument('--setup-mode', default='auto', choices=('auto', 'always'),
+                        help="DB_SETUP_MODE for warm starts; 'always' shows the cost without the stamp check")
+    parser.add_argument('--json', help='Write the report to this file')
+    args = parser.parse_args()
+
+    report = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        cold = []
+        for run in range(args.runs):
+            cold.append(start_once(os.path.join(tmp_dir, f'cold_{run}.db'), 'auto'))
+        report['cold'] = summarize(cold)
+
+        warm_db = os.path.join(tmp_dir, 'warm.db')
+        start_once(warm_db, 'auto')
+        report['warm'] = summarize([start_once(warm_db, args.setup_mode) for _ in range(args.runs)])
+
+    report['budget_seconds'] = args.budget
+    report['within_budget'] = report['warm']['total_seconds']['median'] <= args.budget
+
+    print(f"{'scenario':<8} {'import':>8} {'create':>8} {'first':>8} {'total':>8}  (median seconds)")
+    for scenario in ('cold', 'warm'):
+        row = report[scenario]
+        print(f"{scenario:<8} " + ' '.join(f"{row[metric]['median']:>8.3f}" for metric in METRICS))
+    print(f"Warm start budget {args.budget:.3f}s: {'OK' if report['within_budget'] else 'EXCEEDED'}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    return 0 if report['within_budget'] else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,344 @@
+#!/usr/bin/env python3
+"""
+Synthetic data generator for FoodShare load tests and benchmarks.
+
+Bulk-inserts users, food listings, chat messages and ratings into the
+database configured for the app (DATABASE_URI), appending to whatever is
+already there. Rows are inserted with executemany in chunked transactions,
+and the same --seed and --anchor always produce the same rows, so benchmark
+runs are reproducible.
+
+Listings and user addresses are clustered around Emory's campuses and the
+surrounding neighborhoods; providers, listing popularity and conversation
+lengths are skewed the way real usage is. Every generated user's password
+is "password123".
+
+Usage:
+    python generate_data.py --users 100000 --listings 1000000 \\
+        --messages 10000000 --ratings 1000000 [--seed 42] [--chunk-size 10000]
+"""
+import argparse
+import random
+import sys
+import time
+import warnings
+from datetime import datetime, timedelta
+from itertools import accumulate
+
+# (latitude, longitude, spread in degrees, weight) of the areas listings come from
+GEO_CLUSTERS = [
+    (33.7925, -84.3240, 0.004, 0.35),   # Main campus (the quad)
+    (33.7985, -84.3145, 0.003, 0.15),   # Clairmont campus
+    (33.7890, -84.3275, 0.004, 0.15),   # Emory Village / Druid Hills
+    (33.8005, -84.3250, 0.003, 0.10),   # Emory Point
+    (33.7748, -84.2963, 0.006, 0.15),   # Decatur
+    (33.8160, -84.3130, 0.005, 0.10)    # Toco Hills
+]
+
+FIRST_NAMES = [
+    'Alex', 'Jordan', 'Taylor', 'Morgan', 'Casey', 'Riley', 'Jamie', 'Avery', 'Quinn', 'Sam',
+    'Priya', 'Wei', 'Diego', 'Amara', 'Yuki', 'Fatima', 'Noah', 'Olivia', 'Liam', 'Emma'
+]
+LAST_NAMES = [
+    'Smith', 'Johnson', 'Lee', 'Garcia', 'Patel', 'Kim', 'Nguyen', 'Brown', 'Chen', 'Williams',
+    'Okafor', 'Rossi', 'Cohen', 'Silva', 'Khan', 'Davis', 'Martin', 'Lopez', 'Wang', 'Clark'
+]
+MAJORS = [
+    'Biology', 'Computer Science', 'Economics', 'Chemistry', 'Psychology', 'Nursing',
+    'Political Science', 'Mathematics', 'Neuroscience', 'Public Health', None
+]
+
+# (food type, titles, unit)
+FOODS = [
+    ('Fruits', ['Apples', 'Bananas', 'Oranges', 'Grapes', 'Berries'], 'lbs'),
+    ('Vegetables', ['Carrots', 'Spinach', 'Broccoli', 'Salad greens', 'Peppers'], 'lbs'),
+    ('Baked Goods', ['Bagels', 'Muffins', 'Bread loaf', 'Cookies', 'Croissants'], 'pieces'),
+    ('Prepared Meals', ['Pasta tray', 'Curry', 'Burritos', 'Sandwiches', 'Stir fry'], 'servings'),
+    ('Dairy', ['Yogurt cups', 'Milk', 'Cheese', 'Butter'], 'items'),
+    ('Pantry', ['Rice', 'Canned beans', 'Cereal', 'Granola bars', 'Pasta'], 'boxes'),
+    ('Snacks', ['Chips', 'Trail mix', 'Crackers', 'Pretzels'], 'bags')
+]
+PICKUP_SPOTS = [
+    'Cox Hall', 'Woodruff Library', 'DUC-ling', 'Emory Student Center', 'Clairmont Campus Center',
+    'Emory Point', 'Raoul Hall', 'Math & Science Center', 'Rollins School of Public Health', None
+]
+MESSAGES = [
+    'Hi! Is this still available?', 'Yes, it is!', 'Can I pick it up this afternoon?',
+    'Sure, how about 4pm?', 'Great, see you then.', 'Where exactly should I meet you?',
+    'Front entrance works.', 'Thanks so much!', 'Running 5 minutes late, sorry.',
+    'No problem.', 'Do you have any more left?', 'Just picked it up, thank you!',
+    'Is it vegetarian?', 'It has nuts, just so you know.', 'Could a friend grab it for me?'
+]
+COMMENTS = ['Very friendly!', 'Food was fresh.', 'Easy pickup.', 'Late to the pickup.', 'Great experience', None]
+
+# (status, weight) of listings
+LISTING_STATUSES = [('available', 0.7), ('claimed', 0.2), ('expired', 0.1)]
+
+# Rating scores 1-5 and how often they are given
+SCORE_WEIGHTS = [0.05, 0.07, 0.13, 0.30, 0.45]
+
+# How far back generated activity reaches
+HISTORY_DAYS = 90
+
+# generate_password_hash('password123'), fixed so that runs are byte-for-byte identical
+PASSWORD_HASH = (
+    'pbkdf2:sha256:600000$otwqR5zvrXcI7FG4$'
+    '64d17b629a520c4ed034ea9ad6eeb0b4448065d14ab03511d1edd2526d4e8fd6'
+)
+
+
+def chunked(rows, size):
+    """Group an iterator of rows into lists of at most ``size`` rows."""
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def skewed_weights(n, exponent=0.8):
+    """Cumulative Zipf-like weights: a few items get most of the picks."""
+    return list(accumulate(1 / (rank ** exponent) for rank in range(1, n + 1)))
+
+
+class Generator:
+    """Builds reproducible rows from one seeded random source."""
+
+    def __init__(self, seed, anchor):
+        self.rng = random.Random(seed)
+        self.anchor = anchor
+        self.cluster_weights = list(accumulate(cluster[3] for cluster in GEO_CLUSTERS))
+        self.status_weights = list(accumulate(weight for _, weight in LISTING_STATUSES))
+        self.score_weights = list(accumulate(SCORE_WEIGHTS))
+
+    def location(self):
+        lat, lon, spread, _ = self.rng.choices(GEO_CLUSTERS, cum_weights=self.cluster_weights)[0]
+        return round(self.rng.gauss(lat, spread), 6), round(self.rng.gauss(lon, spread), 6)
+
+    def past(self, days=HISTORY_DAYS):
+        return self.anchor - timedelta(seconds=self.rng.randrange(days * 24 * 3600))
+
+    def users(self, first_id, count, role_ids, password_hash):
+        rng = self.rng
+        for user_id in range(first_id, first_id + count):
+            first_name, last_name = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+            latitude, longitude = self.location()
+            created_at = self.past()
+            yield {
+                'user_id': user_id,
+                'email': f'{first_name.lower()}.{last_name.lower()}.{user_id}@emory.edu',
+                'password_hash': password_hash,
+                'first_name': first_name,
+                'last_name': last_name,
+                'major': rng.choice(MAJORS),
+                'phone_number': f'404-{rng.randrange(200, 1000):03d}-{rng.randrange(10000):04d}',
+                'is_active': True,
+                'role_id': rng.choice(role_ids) if role_ids else None,
+                'created_at': created_at,
+                'updated_at': created_at,
+                'latitude': latitude,
+                'longitude': longitude
+            }
+
+    def listings(self, first_id, count, provider_ids, provider_weights):
+        rng = self.rng
+        for food_id in range(first_id, first_id + count):
+            provider_id = rng.choices(provider_ids, cum_weights=provider_weights)[0]
+            food_type, titles, unit = rng.choice(FOODS)
+            created_at = self.past()
+            latitude, longitude = self.location() if rng.random() < 0.9 else (None, None)
+            yield {
+                'food_id': food_id,
+                'provider_id': provider_id,
+                'title': rng.choice(titles),
+                'description': f'Extra {food_type.lower()} to share, pick up soon!',
+                'food_type': food_type,
+                'quantity': rng.randint(1, 12),
+                'unit': unit,
+                'expiration_date': created_at + timedelta(days=rng.randint(1, 14)),
+                'available_from': created_at,
+                'available_until': created_at + timedelta(hours=rng.randint(2, 72)),
+                'pickup_location': rng.choice(PICKUP_SPOTS),
+                'pickup_latitude': latitude,
+                'pickup_longitude': longitude,
+                'status': rng.choices(LISTING_STATUSES, cum_weights=self.status_weights)[0][0],
+                'created_at': created_at,
+                'updated_at': created_at
+            }
+
+    def messages(self, first_id, count, user_ids, listings, listing_weights):
+        """Conversations about listings; about 5% are group listing threads."""
+        rng = self.rng
+        message_id = first_id
+        end = first_id + count
+        while message_id < end:
+            food_id, provider_id = rng.choices(listings, cum_weights=listing_weights)[0]
+            asker = rng.choice(user_ids)
+            group_thread = rng.random() < 0.05
+            if asker == provider_id and not group_thread:
+                continue
+            length = min(1 + int(rng.expovariate(1 / 7)), end - message_id)
+            timestamp = self.past()
+            for i in range(length):
+                if group_thread:
+                    sender, receiver = rng.choice(user_ids), None
+                else:
+                    sender, receiver = (asker, provider_id) if i % 2 == 0 else (provider_id, asker)
+                timestamp += timedelta(seconds=rng.randrange(30, 3600))
+                yield {
+                    'id': message_id,
+                    'sender_id': sender,
+                    'receiver_id': receiver,
+                    'message': rng.choice(MESSAGES),
+                    'timestamp': timestamp,
+                    'is_read': i < length - 1 or rng.random() < 0.6,
+                    'food_id': food_id
+                }
+                message_id += 1
+
+    def ratings(self, first_id, count, user_ids, listings, listing_weights, taken):
+        rng = self.rng
+        rating_id = first_id
+        misses = 0
+        while rating_id < first_id + count:
+            food_id, provider_id = rng.choices(listings, cum_weights=listing_weights)[0]
+            giver = rng.choice(user_ids)
+            key = (giver, provider_id, food_id)
+            if giver == provider_id or key in taken:
+                misses += 1
+                if misses > 100 * count:
+                    raise RuntimeError('Not enough users and listings for that many distinct ratings')
+                continue
+            taken.add(key)
+            yield {
+                'rating_id': rating_id,
+                'giver_id': giver,
+                'receiver_id': provider_id,
+                'resource_id': food_id,
+                'resource_type': 'food',
+                'score': rng.choices(range(1, 6), cum_weights=self.score_weights)[0],
+                'comment': rng.choice(COMMENTS),
+                'created_at': self.past()
+            }
+            rating_id += 1
+
+
+def insert_rows(db, table, rows, total, chunk_size):
+    """Insert rows with one executemany and one transaction per chunk."""
+    if not total:
+        return
+    started_at = time.perf_counter()
+    done = 0
+    for chunk in chunked(rows, chunk_size):
+        with db.engine.begin() as conn:
+            conn.execute(table.insert(), chunk)
+        done += len(chunk)
+        elapsed = time.perf_counter() - started_at
+        print(f"\r  {table.name}: {done:,}/{total:,} ({done / elapsed:,.0f} rows/s)", end='', flush=True)
+    print()
+
+
+def next_id(db, column):
+    return (db.session.query(db.func.max(column)).scalar() or 0) + 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Bulk-insert synthetic FoodShare data.')
+    parser.add_argument('--users', type=int, default=1000, help='Users to create (default: 1000)')
+    parser.add_argument('--listings', type=int, default=5000, help='Food listings to create (default: 5000)')
+    parser.add_argument('--messages', type=int, default=20000, help='Chat messages to create (default: 20000)')
+    parser.add_argument('--ratings', type=int, default=5000, help='Ratings to create (default: 5000)')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed (default: 42)')
+    parser.add_argument('--anchor', type=datetime.fromisoformat, default=None,
+                        help="Latest timestamp of generated activity, e.g. 2025-04-01 "
+                             "(default: today at midnight UTC; pass it to reproduce a run exactly)")
+    parser.add_argument('--chunk-size', type=int, default=10000, help='Rows per transaction (default: 10000)')
+    args = parser.parse_args()
+
+    warnings.simplefilter('ignore')
+    from sqlalchemy import text
+    from app import create_app, db
+    from app.models.user import User, Role
+    from app.models.food import FoodListing
+    from app.models.chat import Chat
+    from app.models.rating import Rating
+    from app.utils.chat_search import FTS_STATEMENTS
+    from app.utils.rating_stats import rebuild_rating_stats
+
+    anchor = args.anchor or datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    generator = Generator(args.seed, anchor)
+    app = create_app()
+    started_at = time.perf_counter()
+
+    with app.app_context():
+        print(f"Generating into {db.engine.url!r} (seed {args.seed}, anchor {anchor:%Y-%m-%d %H:%M})")
+
+        first_user = next_id(db, User.user_id)
+        role_ids = [role_id for (role_id,) in db.session.query(Role.role_id).order_by(Role.role_id)]
+        insert_rows(db, User.__table__, generator.users(
+            first_user, args.users, role_ids, PASSWORD_HASH
+        ), args.users, args.chunk_size)
+
+        user_ids = [user_id for (user_id,) in db.session.query(User.user_id).order_by(User.user_id)]
+        if not user_ids and (args.listings or args.messages or args.ratings):
+            print('No users to attach listings, messages or ratings to', file=sys.stderr)
+            return 1
+
+        # A few providers post most listings
+        provider_order = user_ids[:]
+        generator.rng.shuffle(provider_order)
+        insert_rows(db, FoodListing.__table__, generator.listings(
+            next_id(db, FoodListing.food_id), args.listings,
+            provider_order, skewed_weights(len(provider_order))
+        ), args.listings, args.chunk_size)
+
+        if args.messages or args.ratings:
+            listings = db.session.query(FoodListing.food_id, FoodListing.provider_id) \
+                .filter(FoodListing.provider_id.isnot(None)).order_by(FoodListing.food_id).all()
+            if not listings:
+                print('No listings to attach messages or ratings to', file=sys.stderr)
+                return 1
+            # A few listings get most of the attention
+            generator.rng.shuffle(listings)
+            listing_weights = skewed_weights(len(listings), exponent=0.6)
+
+        if args.messages:
+            first_message = next_id(db, Chat.id)
+            # The search index is filled once at the end rather than per row
+            indexed = db.engine.dialect.name == 'sqlite' and db.session.execute(
+                text("SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = 'chats_fts_insert'")
+            ).first()
+            db.session.commit()
+            if indexed:
+                with db.engine.begin() as conn:
+                    conn.execute(text('DROP TRIGGER chats_fts_insert'))
+            try:
+                insert_rows(db, Chat.__table__, generator.messages(
+                    first_message, args.messages, user_ids, listings, listing_weights
+                ), args.messages, args.chunk_size)
+            finally:
+                if indexed:
+                    with db.engine.begin() as conn:
+                        conn.execute(text(FTS_STATEMENTS[1]))
+                        conn.execute(text(
+                            'INSERT INTO chats_fts(rowid, message) SELECT id, message FROM chats WHERE id >= :first'
+                        ), {'first': first_message})
+                    print('  chats_fts: indexed new messages')
+
+        if args.ratings:
+            taken = set(db.session.query(Rating.giver_id, Rating.receiver_id, Rating.resource_id)
+                        .filter(Rating.resource_type == 'food'))
+            insert_rows(db, Rating.__table__, generator.ratings(
+                next_id(db, Rating.rating_id), args.ratings, user_ids, listings, listing_weights, taken
+            ), args.ratings, args.chunk_size)
+            print(f"  user_rating_stats: rebuilt for {rebuild_rating_stats():,} users")
+
+    print(f"Done in {time.perf_counter() - started_at:.1f}s")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,41 @@
+"""
+Gunicorn settings for serving FoodShare in production.
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+Every setting can be overridden from the environment. Socket.IO clients
+that fall back to long-polling need sticky sessions, and events must reach
+clients connected to other workers, so run more than one worker only behind
+a sticky load balancer with SOCKETIO_MESSAGE_QUEUE set.
+
+Graceful reload: ``kill -HUP <master pid>`` starts new workers with the new
+code and lets the old ones finish their requests (up to graceful_timeout).
+"""
+import os
+
+bind = os.environ.get('GUNICORN_BIND', f"0.0.0.0:{os.environ.get('PORT', 5001)}")
+
+# One eventlet worker serves many concurrent connections; add workers for CPU
+worker_class = 'eventlet'
+workers = int(os.environ.get('WEB_CONCURRENCY', 1))
+worker_connections = int(os.environ.get('GUNICORN_WORKER_CONNECTIONS', 1000))
+backlog = int(os.environ.get('GUNICORN_BACKLOG', 2048))
+
+# Idle HTTP keep-alive connections are closed after this many seconds
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', 5))
+
+# Workers that stop reporting to the master for this long are restarted
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 60))
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', 30))
+
+# Recycle workers now and then to bound memory growth (0 disables)
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 10000))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', 1000))
+
+# eventlet must patch the standard library before the app is imported,
+# which happens in each worker, so the app is not preloaded in the master
+preload_app = False
+
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG', '-')
+errorlog = '-'
+loglevel = os.environ.get('GUNICORN_LOG_LEVEL', 'info')
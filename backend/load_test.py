@@ -0,0 +1,362 @@
+#!/usr/bin/env python3
+"""
+HTTP load test for the FoodShare REST API.
+
+Runs a weighted mix of realistic requests against a running server from
+many keep-alive client threads and reports requests per second and p50,
+p95 and p99 latency per request type. The report is written as JSON so
+that runs can be compared between commits (--compare).
+
+Request IDs (users, listings) and the map center are sampled from the
+server's SQLite database, e.g. one filled by generate_data.py, whose users
+all log in with "password123". Start the server with RATELIMIT_ENABLED=false,
+since all load comes from a single address:
+
+    DATABASE_URI=sqlite:////tmp/load.db python generate_data.py --anchor 2025-04-01
+    DATABASE_URI=sqlite:////tmp/load.db RATELIMIT_ENABLED=false python run.py
+    python load_test.py --database /tmp/load.db --duration 60 --concurrency 20 \\
+        --json load_results.json [--compare previous.json]
+"""
+import argparse
+import http.client
+import json
+import math
+import os
+import random
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+from urllib.parse import urlsplit, urlencode
+
+# Scenario weights: mostly anonymous browsing, some signed-in reads, a few writes
+MIXES = {
+    'default': {
+        'feed': 20, 'feed_filtered': 10, 'search': 10, 'distance': 10, 'listing_detail': 15,
+        'user_posts': 5, 'profile': 8, 'rating': 8, 'chat_list': 8, 'listing_crud': 6
+    },
+    'read_only': {
+        'feed': 25, 'feed_filtered': 10, 'search': 10, 'distance': 10, 'listing_detail': 20,
+        'user_posts': 5, 'profile': 7, 'rating': 7, 'chat_list': 6
+    },
+    'write_heavy': {
+        'feed': 15, 'listing_detail': 15, 'profile': 10, 'chat_list': 10, 'listing_crud': 50
+    }
+}
+
+FOOD_TYPES = ['Fruits', 'Vegetables', 'Baked Goods', 'Prepared Meals', 'Dairy', 'Pantry', 'Snacks']
+SEARCH_TERMS = ['apples', 'bagels', 'curry', 'pasta', 'cookies', 'rice', 'yogurt', 'chips', 'share']
+
+# Status codes that mean the request worked (404 for listings deleted by other clients)
+OK_STATUSES = {'listing_detail': (200, 404)}
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, math.ceil(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def summarize(latencies, errors, seconds):
+    latencies = sorted(latencies)
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'rps': round(len(latencies) / seconds, 2) if seconds else 0.0,
+        'p50_ms': round(percentile(latencies, 0.50) * 1000, 2),
+        'p95_ms': round(percentile(latencies, 0.95) * 1000, 2),
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 2),
+        'max_ms': round(latencies[-1] * 1000, 2) if latencies else 0.0
+    }
+
+
+def sample_database(path, sample_size, seed):
+    """Pick the users, listings and map center the clients will use."""
+    rng = random.Random(seed)
+    conn = sqlite3.connect(f'file:{path}?mode=ro', uri=True)
+    try:
+        users = conn.execute(
+            'SELECT user_id, email FROM users WHERE email LIKE ? ORDER BY user_id', ('%.%.%@emory.edu',)
+        ).fetchall()
+        listings = [row[0] for row in conn.execute('SELECT food_id FROM food_listings ORDER BY food_id')]
+        center = conn.execute(
+            'SELECT avg(pickup_latitude), avg(pickup_longitude) FROM food_listings WHERE pickup_latitude IS NOT NULL'
+        ).fetchone()
+    finally:
+        conn.close()
+    if not users or not listings:
+        raise SystemExit(f'{path} has no generated users or listings; run generate_data.py first')
+    return {
+        'users': rng.sample(users, min(sample_size, len(users))),
+        'user_ids': [user_id for user_id, _ in users],
+        'listings': listings,
+        'center': (center[0] or 33.7925, center[1] or -84.3240)
+    }
+
+
+class Client:
+    """One simulated user with its own keep-alive connection."""
+
+    def __init__(self, base_url, token, user_id, data, rng, timeout):
+        parts = urlsplit(base_url)
+        self.host, self.port = parts.hostname, parts.port or 80
+        self.prefix = parts.path.rstrip('/')
+        self.token = token
+        self.user_id = user_id
+        self.data = data
+        self.rng = rng
+        self.timeout = timeout
+        self.conn = None
+
+    def request(self, method, path, body=None, auth=False):
+        """Send one request and return (status, seconds, parsed JSON or None)."""
+        headers = {'Accept': 'application/json'}
+        if body is not None:
+            headers['Content-Type'] = 'application/json'
+            body = json.dumps(body)
+        if auth:
+            headers['Authorization'] = f'Bearer {self.token}'
+        started_at = time.perf_counter()
+        try:
+            if self.conn is None:
+                self.conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+            self.conn.request(method, self.prefix + path, body=body, headers=headers)
+            response = self.conn.getresponse()
+            payload = response.read()
+            if response.getheader('Connection', '').lower() == 'close':
+                self.close()
+        except (OSError, http.client.HTTPException):
+            self.close()
+            return None, time.perf_counter() - started_at, None
+        elapsed = time.perf_counter() - started_at
+        try:
+            return response.status, elapsed, json.loads(payload) if payload else None
+        except ValueError:
+            return response.status, elapsed, None
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+        self.conn = None
+
+    # Scenarios yield (name, method, path, body, auth); some use earlier responses
+
+    def feed(self):
+        yield 'feed', 'GET', '/api/food_listings?include_rating=true', None, False
+
+    def feed_filtered(self):
+        query = {'food_type': self.rng.choice(FOOD_TYPES), 'min_expiration_days': self.rng.randint(0, 3)}
+        yield 'feed_filtered', 'GET', f'/api/food_listings?{urlencode(query)}', None, False
+
+    def search(self):
+        yield 'search', 'GET', f"/api/food_listings?{urlencode({'q': self.rng.choice(SEARCH_TERMS)})}", None, False
+
+    def distance(self):
+        lat, lon = self.data['center']
+        query = {
+            'latitude': round(lat + self.rng.uniform(-0.01, 0.01), 6),
+            'longitude': round(lon + self.rng.uniform(-0.01, 0.01), 6),
+            'max_distance': self.rng.choice([0.5, 1, 2, 5])
+        }
+        yield 'distance', 'GET', f'/api/food_listings?{urlencode(query)}', None, False
+
+    def listing_detail(self):
+        yield 'listing_detail', 'GET', f"/api/food_listings/{self.rng.choice(self.data['listings'])}", None, False
+
+    def user_posts(self):
+        yield 'user_posts', 'GET', f"/api/user/{self.rng.choice(self.data['user_ids'])}/posts", None, False
+
+    def profile(self):
+        yield 'profile', 'GET', '/api/user/profile', None, True
+
+    def rating(self):
+        yield 'rating', 'GET', f"/api/users/{self.rng.choice(self.data['user_ids'])}/rating", None, False
+
+    def chat_list(self):
+        yield 'chat_list', 'GET', f'/api/chat-list/{self.user_id}', None, True
+
+    def listing_crud(self):
+        lat, lon = self.data['center']
+        listing = {
+            'title': 'Load test leftovers',
+            'description': 'Created by load_test.py',
+            'food_type': self.rng.choice(FOOD_TYPES),
+            'quantity': self.rng.randint(1, 10),
+            'unit': 'servings',
+            'pickup_location': 'Cox Hall',
+            'pickup_latitude': lat,
+            'pickup_longitude': lon,
+            'expiration_date': (datetime.utcnow() + timedelta(days=2)).isoformat()
+        }
+        created = yield 'listing_create', 'POST', '/api/food_listings', listing, True
+        if not created or 'food' not in created:
+            return
+        food_id = created['food']['food_id']
+        yield 'listing_update', 'PUT', f'/api/food_listings/{food_id}', {'quantity': 1}, True
+        yield 'listing_delete', 'DELETE', f'/api/food_listings/{food_id}', None, True
+
+
+class LoadTest:
+    """Runs client threads for a fixed time and collects latencies."""
+
+    def __init__(self, args, data, tokens):
+        self.args = args
+        self.data = data
+        self.tokens = tokens
+        self.mix = MIXES[args.mix]
+        self.results = {}
+        self.lock = threading.Lock()
+        self.recording = threading.Event()
+        self.stopping = threading.Event()
+
+    def record(self, name, status, elapsed):
+        if not self.recording.is_set():
+            return
+        failed = status is None or status not in OK_STATUSES.get(name, range(200, 300))
+        with self.lock:
+            latencies, errors = self.results.setdefault(name, ([], [0]))
+            latencies.append(elapsed)
+            errors[0] += failed
+
+    def run_client(self, index):
+        user_id, token = self.tokens[index % len(self.tokens)]
+        rng = random.Random(self.args.seed * 1000 + index)
+        client = Client(self.args.base_url, token, user_id, self.data, rng, self.args.timeout)
+        names, weights = zip(*self.mix.items())
+        try:
+            while not self.stopping.is_set():
+                scenario = getattr(client, rng.choices(names, weights)[0])()
+                reply = None
+                try:
+                    while True:
+                        name, method, path, body, auth = scenario.send(reply)
+                        status, elapsed, reply = client.request(method, path, body, auth)
+                        self.record(name, status, elapsed)
+                        if self.args.think_time:
+                            time.sleep(rng.expovariate(1 / self.args.think_time))
+                except StopIteration:
+                    pass
+        finally:
+            client.close()
+
+    def run(self):
+        threads = [threading.Thread(target=self.run_client, args=(i,), daemon=True)
+                   for i in range(self.args.concurrency)]
+        for thread in threads:
+            thread.start()
+        time.sleep(self.args.warmup)
+        self.recording.set()
+        started_at = time.perf_counter()
+        time.sleep(self.args.duration)
+        self.recording.clear()
+        seconds = time.perf_counter() - started_at
+        self.stopping.set()
+        for thread in threads:
+            thread.join(self.args.timeout + 5)
+        return seconds
+
+
+def log_in(base_url, users, password, timeout):
+    """Log in the sampled users and return [(user_id, token)]."""
+    client = Client(base_url, None, None, None, None, timeout)
+    tokens = []
+    for user_id, email in users:
+        status, _, reply = client.request('POST', '/api/login', {'email': email, 'password': password})
+        if status == 200:
+            tokens.append((user_id, reply['token']))
+        else:
+            print(f"Login failed for {email}: {status} {reply}", file=sys.stderr)
+    client.close()
+    return tokens
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_report(report, previous=None):
+    print(f"{'request':<16} {'count':>7} {'err':>5} {'rps':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    rows = sorted(report['requests'].items()) + [('TOTAL', report['total'])]
+    for name, row in rows:
+        line = (f"{name:<16} {row['requests']:>7} {row['errors']:>5} {row['rps']:>8.1f} "
+                f"{row['p50_ms']:>8.1f} {row['p95_ms']:>8.1f} {row['p99_ms']:>8.1f}")
+        before = (previous or {}).get('requests', {}).get(name) if name != 'TOTAL' else (previous or {}).get('total')
+        if before and before['p95_ms'] and before['rps']:
+            line += (f"   p95 {(row['p95_ms'] / before['p95_ms'] - 1) * 100:+.0f}%"
+                     f"  rps {(row['rps'] / before['rps'] - 1) * 100:+.0f}%")
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load-test the FoodShare REST API.')
+    parser.add_argument('--base-url', default='http://127.0.0.1:5001', help='Server URL (default: %(default)s)')
+    parser.add_argument('--database', required=True, help="Path of the server's SQLite database to sample IDs from")
+    parser.add_argument('--mix', default='default', choices=sorted(MIXES), help='Request mix (default: default)')
+    parser.add_argument('--duration', type=float, default=60, help='Measured seconds (default: 60)')
+    parser.add_argument('--warmup', type=float, default=5, help='Unmeasured seconds first (default: 5)')
+    parser.add_argument('--concurrency', type=int, default=20, help='Client threads (default: 20)')
+    parser.add_argument('--think-time', type=float, default=0,
+                        help='Mean seconds a client waits between requests (default: 0, closed loop)')
+    parser.add_argument('--users', type=int, default=10, help='Distinct signed-in users (default: 10)')
+    parser.add_argument('--password', default='password123', help='Password of the sampled users')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed (default: 42)')
+    parser.add_argument('--timeout', type=float, default=30, help='Per-request timeout in seconds')
+    parser.add_argument('--json', default='load_results.json', help='Report file (default: %(default)s)')
+    parser.add_argument('--compare', help='Earlier report to compare p95 and rps against')
+    args = parser.parse_args()
+
+    data = sample_database(args.database, args.users, args.seed)
+    tokens = log_in(args.base_url, data['users'], args.password, args.timeout)
+    if not tokens:
+        print('No user could log in; is the server running against this database?', file=sys.stderr)
+        return 1
+
+    print(f"Running '{args.mix}' mix: {args.concurrency} clients, {args.warmup:g}s warm-up, {args.duration:g}s measured")
+    test = LoadTest(args, data, tokens)
+    seconds = test.run()
+
+    all_latencies = [latency for latencies, _ in test.results.values() for latency in latencies]
+    report = {
+        'meta': {
+            'commit': git_commit(),
+            'started_at': datetime.utcnow().isoformat(timespec='seconds'),
+            'base_url': args.base_url,
+            'mix': args.mix,
+            'weights': test.mix,
+            'concurrency': args.concurrency,
+            'think_time': args.think_time,
+            'duration_seconds': round(seconds, 3),
+            'seed': args.seed,
+            'listings_in_database': len(data['listings'])
+        },
+        'total': summarize(all_latencies, sum(errors[0] for _, errors in test.results.values()), seconds),
+        'requests': {
+            name: summarize(latencies, errors[0], seconds)
+            for name, (latencies, errors) in sorted(test.results.items())
+        }
+    }
+
+    previous = None
+    if args.compare:
+        with open(args.compare) as f:
+            previous = json.load(f)
+    print_report(report, previous)
+
+    with open(args.json, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Report written to {args.json}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
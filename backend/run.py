@@ -19,6 +19,18 @@ try:
     
     from app.sockets import chat_events
     if __name__ == '__main__':
+        # Start the background mail sender
+        from app.utils.mail_outbox import mail_outbox
+        mail_outbox.start()
+        
+        # Start the background thumbnail renderer
+        from app.utils.images import thumbnail_worker
+        thumbnail_worker.start()
+        
+        # Keep a local SQLite read replica in sync
+        from app.utils.replica_sync import replica_sync
+        replica_sync.start()
+        
         # Run the application with Socket.IO support
         print("Starting Socket.IO server on port 5001...")
         socketio.run(app, host='127.0.0.1', port=5001, debug=True, use_reloader=False, allow_unsafe_werkzeug=True)
@@ -0,0 +1,22 @@
+"""
+Shared pytest fixtures for the FoodShare backend tests.
+"""
+import pytest
+from app.utils.query_counter import query_budget as query_budget_block
+
+
+@pytest.fixture
+def query_budget(request):
+    """
+    Context manager failing the test when its block exceeds a query budget.
+
+    Usage (inside an application context):
+        with query_budget(3):
+            client.get('/api/food_listings')
+
+    unittest classes marked with ``@pytest.mark.usefixtures('query_budget')``
+    get it as ``self.query_budget``.
+    """
+    if request.instance is not None:
+        request.instance.query_budget = query_budget_block
+    return query_budget_block
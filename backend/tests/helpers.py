@@ -0,0 +1,13 @@
+"""
+Shared helpers for the FoodShare backend tests.
+"""
+
+
+class FakeClock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
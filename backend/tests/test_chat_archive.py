@@ -0,0 +1,100 @@
+"""
+Tests for archiving chat messages and paging across the archive.
+"""
+import unittest
+from datetime import datetime, timedelta
+from app import create_app, db, socketio
+from app.models.user import User, Role
+from app.models.chat import Chat, ChatArchive
+from app.utils.chat_archive import archive_old_messages, load_history_page
+from app.sockets import chat_events  # noqa: F401 (register Socket.IO handlers)
+
+
+class ChatArchiveTestCase(unittest.TestCase):
+    """Test case for compressed chunks and history pagination."""
+
+    def setUp(self):
+        self.app = create_app('testing')
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+        role = Role.query.first()
+        users = [
+            User(email=f'archiver{i}@emory.edu', password_hash='x', first_name='Archiver',
+                 last_name=str(i), role_id=role.role_id)
+            for i in range(3)
+        ]
+        db.session.add_all(users)
+        db.session.commit()
+        self.alice, self.bob, self.carol = (user.user_id for user in users)
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def test_pages_run_from_hot_rows_into_archived_chunks(self):
+        """Every message is returned once, oldest first, whichever table holds it."""
+        start = datetime.utcnow() - timedelta(days=400)
+        for i in range(40):
+            # 30 old messages spread over several months, then 10 recent ones
+            timestamp = start + timedelta(days=7 * i) if i < 30 else datetime.utcnow() - timedelta(minutes=40 - i)
+            sender, receiver = (self.alice, self.bob) if i % 2 else (self.bob, self.alice)
+            db.session.add(Chat(sender_id=sender, receiver_id=receiver, message=f'message {i}', timestamp=timestamp))
+        # Another conversation that must not leak into the pages
+        db.session.add(Chat(sender_id=self.alice, receiver_id=self.carol, message='other', timestamp=start))
+        db.session.commit()
+
+        self.assertEqual(archive_old_messages(180), 31)
+        self.assertEqual(Chat.query.count(), 10)
+        self.assertGreater(ChatArchive.query.count(), 2)
+
+        pages, before_id = [], None
+        while True:
+            page = load_history_page(self.alice, self.bob, before_id=before_id, limit=7)
+            pages.append([message['message'] for message in page['messages']])
+            if not page['hasMore']:
+                break
+            before_id = page['beforeId']
+
+        # Pages come newest first; each page is oldest first
+        messages = [message for page in reversed(pages) for message in page]
+        self.assertEqual(messages, [f'message {i}' for i in range(40)])
+        self.assertEqual([len(page) for page in pages], [7, 7, 7, 7, 7, 5])
+
+    def test_fully_archived_conversations_stay_reachable(self):
+        """Archived conversations are still listed and joining one starts with its latest page."""
+        old = datetime.utcnow() - timedelta(days=300)
+        for i in range(5):
+            db.session.add(Chat(sender_id=self.alice, receiver_id=self.carol, message=f'archived {i}',
+                                timestamp=old + timedelta(days=i)))
+        db.session.add(Chat(sender_id=self.bob, receiver_id=self.alice, message='recent'))
+        db.session.commit()
+        self.assertEqual(archive_old_messages(180), 5)
+        self.assertEqual(Chat.query.filter_by(receiver_id=self.carol).count(), 0)
+
+        conversations = self.app.test_client().get(f'/api/chat-list/{self.alice}').get_json()['conversations']
+        self.assertEqual(
+            [(convo['otherUser']['user_id'], convo['latestMessage']['message']) for convo in conversations],
+            [(self.bob, 'recent'), (self.carol, 'archived 4')]
+        )
+
+        self.app.config['CHAT_HISTORY_PAGE_SIZE'] = 3
+        client = socketio.test_client(self.app, query_string=f'userId={self.carol}')
+        try:
+            client.emit('join_conversation', {'userId': self.carol, 'otherUserId': self.alice})
+            history = [event['args'][0] for event in client.get_received() if event['name'] == 'conversation_history']
+            self.assertEqual([m['message'] for m in history[0]['messages']], ['archived 2', 'archived 3', 'archived 4'])
+            self.assertTrue(history[0]['hasMore'])
+
+            client.emit('load_history', {'userId': self.carol, 'otherUserId': self.alice,
+                                         'beforeId': history[0]['beforeId']})
+            page = [event['args'][0] for event in client.get_received() if event['name'] == 'conversation_history_page']
+            self.assertEqual([m['message'] for m in page[0]['messages']], ['archived 0', 'archived 1'])
+            self.assertFalse(page[0]['hasMore'])
+        finally:
+            client.disconnect()
+
+
+if __name__ == '__main__':
+    unittest.main()
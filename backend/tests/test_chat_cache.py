@@ -0,0 +1,78 @@
+"""
+Tests for the in-memory conversation cache.
+"""
+import unittest
+from app.utils.chat_cache import ConversationCache, conversation_key
+
+
+def make_message(message_id, sender_id=1, receiver_id=2):
+    return {'id': message_id, 'senderId': sender_id, 'receiverId': receiver_id, 'isRead': False}
+
+
+class ConversationCacheTestCase(unittest.TestCase):
+    """Test case for ConversationCache."""
+
+    def test_conversation_key_is_order_independent(self):
+        """Both participants map to the same conversation."""
+        self.assertEqual(conversation_key(2, '1'), conversation_key(1, 2))
+
+    def test_hit_and_write_through(self):
+        """Cached conversations are served and updated in place."""
+        cache = ConversationCache(per_conversation=10, max_messages=100)
+        key = conversation_key(1, 2)
+
+        self.assertIsNone(cache.get(key))
+        cache.put(key, [make_message(1)])
+        cache.append(key, make_message(2))
+        cache.mark_read(key, 1)
+
+        messages = cache.get(key)
+        self.assertEqual([m['id'] for m in messages], [1, 2])
+        self.assertTrue(messages[0]['isRead'])
+        self.assertEqual(cache.stats()['hits'], 1)
+        self.assertEqual(cache.stats()['misses'], 1)
+
+    def test_overflowing_conversation_is_not_served(self):
+        """A conversation longer than the buffer falls back to the database."""
+        cache = ConversationCache(per_conversation=2, max_messages=100)
+        key = conversation_key(1, 2)
+
+        cache.put(key, [make_message(1), make_message(2)])
+        self.assertIsNotNone(cache.get(key))
+
+        cache.append(key, make_message(3))
+        self.assertIsNone(cache.get(key))
+
+    def test_entries_expire_after_ttl(self):
+        """Writes handled by another worker are seen once the entry expires."""
+        now = [0.0]
+        cache = ConversationCache(per_conversation=10, max_messages=100, ttl=5, clock=lambda: now[0])
+        key = conversation_key(1, 2)
+
+        cache.put(key, [make_message(1)])
+        now[0] = 4.9
+        cache.append(key, make_message(2))
+        self.assertEqual(len(cache.get(key)), 2)
+
+        # Local write-through does not extend the entry's life
+        now[0] = 5
+        self.assertIsNone(cache.get(key))
+        self.assertEqual(cache.stats()['conversations'], 0)
+
+    def test_lru_eviction_by_total_size(self):
+        """The least recently used conversation is evicted first."""
+        cache = ConversationCache(per_conversation=10, max_messages=4)
+
+        cache.put(conversation_key(1, 2), [make_message(1), make_message(2)])
+        cache.put(conversation_key(1, 3), [make_message(3), make_message(4)])
+        cache.get(conversation_key(1, 2))
+        cache.put(conversation_key(1, 4), [make_message(5)])
+
+        self.assertIsNone(cache.get(conversation_key(1, 3)))
+        self.assertIsNotNone(cache.get(conversation_key(1, 2)))
+        self.assertEqual(cache.stats()['evictions'], 1)
+        self.assertEqual(cache.stats()['messages'], 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
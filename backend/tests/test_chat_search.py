@@ -0,0 +1,103 @@
+"""
+Tests for full-text chat search.
+"""
+import unittest
+from datetime import datetime, timedelta
+from app import create_app, db
+from app.models.user import User, Role
+from app.models.chat import Chat
+from app.utils.chat_archive import archive_old_messages
+from app.utils.chat_search import search_messages
+
+
+class ChatSearchTestCase(unittest.TestCase):
+    """Test case for FTS5 search, its cursor and its sync triggers."""
+
+    def setUp(self):
+        self.app = create_app('testing')
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+        role = Role.query.first()
+        users = [
+            User(email=f'chatter{i}@emory.edu', password_hash='x', first_name='Chatter',
+                 last_name=str(i), role_id=role.role_id)
+            for i in range(4)
+        ]
+        db.session.add_all(users)
+        db.session.commit()
+        self.alice, self.bob, self.carol, self.dave = (user.user_id for user in users)
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def send(self, sender_id, receiver_id, message, **fields):
+        chat = Chat(sender_id=sender_id, receiver_id=receiver_id, message=message, **fields)
+        db.session.add(chat)
+        db.session.commit()
+        return chat
+
+    def hits(self, user_id, query):
+        return [result['messageId'] for result in search_messages(user_id, query, limit=50)['results']]
+
+    def test_pages_cover_every_match_once(self):
+        """Following nextCursor returns every match exactly once, in rank order."""
+        expected = {
+            self.send(self.alice, self.bob, 'pizza ' * (i % 4 + 1) + 'at the library').id
+            for i in range(23)
+        }
+        self.send(self.alice, self.bob, 'no match here')
+
+        seen, scores, cursor = [], [], None
+        while True:
+            page = search_messages(self.alice, 'pizza', cursor=cursor, limit=5)
+            seen.extend(result['messageId'] for result in page['results'])
+            scores.extend((result['score'], result['messageId']) for result in page['results'])
+            cursor = page['nextCursor']
+            if cursor is None:
+                break
+
+        self.assertEqual(len(seen), len(set(seen)))
+        self.assertEqual(set(seen), expected)
+        self.assertEqual(scores, sorted(scores))
+
+    def test_only_own_conversations_are_searched(self):
+        """A user never sees another pair's messages."""
+        mine = self.send(self.alice, self.bob, 'pizza for you').id
+        theirs = self.send(self.bob, self.alice, 'thanks for the pizza').id
+        self.send(self.carol, self.dave, 'secret pizza spot')
+
+        self.assertEqual(sorted(self.hits(self.alice, 'pizza')), [mine, theirs])
+        self.assertEqual(len(self.hits(self.carol, 'pizza')), 1)
+        self.assertEqual(self.hits(self.carol, 'thanks'), [])
+
+    def test_edits_and_deletes_update_the_index(self):
+        """The triggers keep the external-content index in step with the chats table."""
+        chat = self.send(self.alice, self.bob, 'bagels at noon')
+        chat.message = 'muffins at noon'
+        db.session.commit()
+        self.assertEqual(self.hits(self.alice, 'bagels'), [])
+        self.assertEqual(self.hits(self.alice, 'muffins'), [chat.id])
+
+        db.session.delete(chat)
+        db.session.commit()
+        self.assertEqual(self.hits(self.alice, 'muffins'), [])
+
+    def test_archived_messages_are_reported_as_not_searched(self):
+        """Archived messages drop out of the index and the response says so."""
+        old = datetime.utcnow() - timedelta(days=400)
+        self.send(self.alice, self.bob, 'old soup recipe', timestamp=old)
+        recent = self.send(self.alice, self.bob, 'new soup recipe').id
+        self.assertEqual(search_messages(self.alice, 'soup')['archivedThrough'], None)
+
+        archive_old_messages(180)
+        page = search_messages(self.alice, 'soup')
+        self.assertEqual([result['messageId'] for result in page['results']], [recent])
+        self.assertFalse(page['archiveSearched'])
+        self.assertEqual(page['archivedThrough'], old.strftime('%Y-%m'))
+
+
+if __name__ == '__main__':
+    unittest.main()
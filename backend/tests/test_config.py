@@ -0,0 +1,74 @@
+"""
+Tests for configuration classes and SQLite connection settings.
+"""
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+from app import create_app, db
+from app.config import TestingConfig, ProductionConfig
+from app.utils.database import engine_options
+
+
+class ConfigTestCase(unittest.TestCase):
+    """Test case for config resolution and engine tuning."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def read_pragmas(self, app, *names):
+        """Read pragmas from a new connection of the app's engine."""
+        with app.app_context():
+            db.engine.dispose()
+            connection = db.engine.raw_connection()
+            try:
+                return {name: connection.execute(f'PRAGMA {name}').fetchone()[0] for name in names}
+            finally:
+                connection.close()
+                db.engine.dispose()
+
+    def test_file_database_connections_get_the_pragmas(self):
+        """Every new connection to a file database runs in WAL with the configured settings."""
+        uri = f"sqlite:///{os.path.join(self.tmp_dir, 'test.db')}"
+        with mock.patch.object(TestingConfig, 'SQLALCHEMY_DATABASE_URI', uri):
+            app = create_app('testing')
+
+        pragmas = self.read_pragmas(app, 'journal_mode', 'synchronous', 'busy_timeout', 'cache_size', 'mmap_size')
+        self.assertEqual(pragmas, {
+            'journal_mode': 'wal',
+            'synchronous': 1,  # NORMAL
+            'busy_timeout': 5000,
+            'cache_size': -64000,
+            'mmap_size': 256 * 1024 * 1024
+        })
+        self.assertEqual(app.config['SQLALCHEMY_ENGINE_OPTIONS']['pool_size'], 10)
+
+    def test_memory_database_skips_wal_and_queue_pool_options(self):
+        """In-memory databases keep their journal mode and get no queue pool settings."""
+        app = create_app('testing')
+        pragmas = self.read_pragmas(app, 'journal_mode', 'busy_timeout')
+        self.assertEqual(pragmas, {'journal_mode': 'memory', 'busy_timeout': 5000})
+        self.assertNotIn('pool_size', engine_options(app.config))
+
+    def test_config_classes_resolve_as_documented(self):
+        """The name, then FLASK_CONFIG, picks the config class; bad settings fail fast."""
+        app = create_app('testing')
+        self.assertTrue(app.config['TESTING'])
+        self.assertEqual((app.config['IDENTITY_CACHE_TTL'], app.config['RATELIMIT_ENABLED']), (0, False))
+
+        with mock.patch.dict(os.environ, {'FLASK_CONFIG': 'testing'}):
+            self.assertTrue(create_app().config['TESTING'])
+
+        with self.assertRaisesRegex(ValueError, "Unknown configuration 'staging'"):
+            create_app('staging')
+        with mock.patch.object(ProductionConfig, 'SECRET_KEY', None):
+            with self.assertRaisesRegex(RuntimeError, 'SECRET_KEY must be set'):
+                create_app('production')
+
+
+if __name__ == '__main__':
+    unittest.main()
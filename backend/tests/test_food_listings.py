@@ -0,0 +1,71 @@
+"""
+Tests for food listing writes.
+"""
+import unittest
+from datetime import datetime, timedelta
+from unittest import mock
+from app import create_app, db
+from app.models.user import User, Role
+from app.models.food import FoodListing
+from app.utils.auth import generate_auth_token
+from app.utils.write_queue import write_queue
+
+
+class ListingWriteTestCase(unittest.TestCase):
+    """Test case for updating and deleting listings that disappear mid-request."""
+
+    def setUp(self):
+        self.app = create_app('testing')
+        self.client = self.app.test_client()
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+        provider = User(email='provider@emory.edu', password_hash='x', first_name='Pro',
+                        last_name='Vider', role_id=Role.query.first().role_id)
+        db.session.add(provider)
+        db.session.commit()
+        listing = FoodListing(provider_id=provider.user_id, title='Soup', quantity=1,
+                              expiration_date=datetime.utcnow() + timedelta(days=1))
+        db.session.add(listing)
+        db.session.commit()
+        self.food_id = listing.food_id
+        self.headers = {'Authorization': f'Bearer {generate_auth_token(provider.user_id)}'}
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def deleted_before_write(self):
+        """Patch the write queue so the listing is deleted just before the queued unit runs."""
+        execute = write_queue.execute
+
+        def delete_first(unit):
+            FoodListing.query.filter_by(food_id=self.food_id).delete()
+            db.session.commit()
+            return execute(unit)
+
+        return mock.patch.object(write_queue, 'execute', side_effect=delete_first)
+
+    def test_delete_of_a_vanished_listing_is_not_found(self):
+        """Deleting a listing removed after the ownership check returns 404."""
+        with self.deleted_before_write():
+            response = self.client.delete(f'/api/food_listings/{self.food_id}', headers=self.headers)
+        self.assertEqual(response.status_code, 404)
+
+    def test_update_of_a_vanished_listing_is_not_found(self):
+        """Updating a listing removed after the ownership check returns 404."""
+        with self.deleted_before_write():
+            response = self.client.put(f'/api/food_listings/{self.food_id}', json={'quantity': 2},
+                                       headers=self.headers)
+        self.assertEqual(response.status_code, 404)
+
+    def test_delete(self):
+        """The owner can delete a listing."""
+        response = self.client.delete(f'/api/food_listings/{self.food_id}', headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(db.session.get(FoodListing, self.food_id))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+"""
+Tests for the per-request and cross-request identity caches.
+"""
+import unittest
+from app import create_app, db
+from app.models.user import User, Role
+from app.utils.auth import get_current_user, generate_auth_token
+from app.utils.identity_cache import IdentityCache, identity_cache
+from app.utils.query_counter import count_queries
+from helpers import FakeClock
+
+
+class IdentityCacheTestCase(unittest.TestCase):
+    """Test case for resolving the current user through the caches."""
+
+    def setUp(self):
+        self.app = create_app('testing')
+        self.client = self.app.test_client()
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+        # The testing config disables the cache; turn it on for these tests
+        identity_cache.ttl = 60
+        identity_cache.clear()
+
+        self.role = Role.query.filter_by(name='undergrad').first()
+        user = User(email='cached@emory.edu', password_hash='old-hash', first_name='Cached',
+                    last_name='User', role_id=self.role.role_id)
+        db.session.add(user)
+        db.session.commit()
+        self.user_id = user.user_id
+        self.headers = {'Authorization': f'Bearer {generate_auth_token(self.user_id)}'}
+
+    def tearDown(self):
+        identity_cache.clear()
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def current_user(self):
+        """Resolve the current user in a new request, as the next API call would."""
+        with self.app.app_context(), self.app.test_request_context(headers=self.headers):
+            user = get_current_user()
+            return {'role_id': user.role_id, 'password_hash': user.password_hash, 'first_name': user.first_name}
+
+    def test_memoized_per_request(self):
+        """Repeated lookups in one request return the same object without more queries."""
+        with self.app.app_context(), self.app.test_request_context(headers=self.headers):
+            with count_queries() as queries:
+                first = get_current_user()
+                self.assertIs(get_current_user(), first)
+            self.assertEqual(queries.count, 1)
+
+    def test_hit_merges_snapshot_without_a_query(self):
+        """A cached user is attached to the session with its columns and no SELECT."""
+        self.current_user()
+        with self.app.app_context(), self.app.test_request_context(headers=self.headers):
+            with count_queries() as queries:
+                user = get_current_user()
+                self.assertEqual((user.email, user.first_name), ('cached@emory.edu', 'Cached'))
+            self.assertEqual(queries.count, 0)
+            self.assertIn(user, db.session)
+        self.assertEqual(identity_cache.stats()['hits'], 1)
+
+    def test_snapshots_expire(self):
+        """Entries are served until the TTL runs out."""
+        clock = FakeClock()
+        cache = IdentityCache(ttl=10, clock=clock)
+        cache.load(self.user_id)
+        clock.now = 9
+        cache.load(self.user_id)
+        clock.now = 10
+        cache.load(self.user_id)
+        self.assertEqual((cache.hits, cache.misses), (1, 2))
+
+    def test_profile_update_is_seen_by_the_next_request(self):
+        """Editing the profile drops the cached identity."""
+        self.current_user()
+        response = self.client.put('/api/user/profile', json={'first_name': 'Renamed'}, headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.current_user()['first_name'], 'Renamed')
+
+    def test_role_and_password_changes_are_seen_by_the_next_request(self):
+        """Any committed change to the user row drops its snapshot."""
+        self.current_user()
+        other_role = Role.query.filter_by(name='professor').first()
+
+        user = db.session.get(User, self.user_id)
+        user.role_id = other_role.role_id
+        db.session.commit()
+        self.assertEqual(self.current_user()['role_id'], other_role.role_id)
+
+        db.session.get(User, self.user_id).password_hash = 'new-hash'
+        db.session.commit()
+        self.assertEqual(self.current_user()['password_hash'], 'new-hash')
+
+    def test_rolled_back_changes_keep_the_snapshot(self):
+        """A change that is rolled back does not invalidate anything."""
+        self.current_user()
+        db.session.get(User, self.user_id).first_name = 'Never'
+        db.session.flush()
+        db.session.rollback()
+        self.assertEqual(identity_cache.stats()['entries'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
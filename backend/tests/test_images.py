@@ -0,0 +1,110 @@
+"""
+Tests for image upload, thumbnail rendering and serving.
+"""
+import io
+import shutil
+import tempfile
+import unittest
+from flask import Flask
+from PIL import Image as PILImage
+from app import db
+from app.models import user, food, rating, chat  # noqa: F401 (register every mapper)
+from app.models.image import Image
+from app.models.user import User
+from app.models.food import FoodListing
+from app.routes.images import images_bp
+from app.utils.images import image_store, thumbnail_worker
+from app.utils.rate_limit import rate_limiter
+
+
+def png_bytes(color, size=(800, 600)):
+    buffer = io.BytesIO()
+    PILImage.new('RGB', size, color).save(buffer, 'PNG')
+    return buffer.getvalue()
+
+
+class ImagesTestCase(unittest.TestCase):
+    """Test case for the image pipeline."""
+
+    def setUp(self):
+        self.upload_dir = tempfile.mkdtemp()
+        self.app = Flask(__name__)
+        self.app.config.update(
+            SECRET_KEY='test',
+            SQLALCHEMY_DATABASE_URI='sqlite://',
+            IMAGE_UPLOAD_DIR=self.upload_dir,
+            RATELIMIT_ENABLED=False
+        )
+        db.init_app(self.app)
+        image_store.init_app(self.app)
+        thumbnail_worker.init_app(self.app)
+        rate_limiter.init_app(self.app)
+        self.app.register_blueprint(images_bp)
+
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+        self.user = User(email='a@emory.edu', password_hash='x', first_name='A', last_name='B')
+        db.session.add(self.user)
+        db.session.flush()
+        self.listing = FoodListing(provider_id=self.user.user_id, title='Bagels')
+        db.session.add(self.listing)
+        db.session.commit()
+
+        self.client = self.app.test_client()
+        with self.client.session_transaction() as session:
+            session['user_id'] = self.user.user_id
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+        shutil.rmtree(self.upload_dir)
+
+    def upload(self, data):
+        return self.client.post('/api/images', data={
+            'image': (io.BytesIO(data), 'photo.png'),
+            'resource_type': 'food',
+            'resource_id': str(self.listing.food_id)
+        }, content_type='multipart/form-data')
+
+    def test_duplicate_uploads_share_one_original_and_thumbnails(self):
+        """Identical content is stored and rendered once."""
+        data = png_bytes('red')
+        first = self.upload(data).get_json()['image']
+        self.assertEqual(first['status'], 'pending')
+
+        self.assertEqual(thumbnail_worker.process_pending(), 1)
+        second = self.upload(data).get_json()['image']
+        self.assertEqual(second['status'], 'ready')
+        self.assertEqual((second['width'], second['height']), (800, 600))
+        self.assertEqual(second['urls'], first['urls'])
+        self.assertEqual(Image.query.count(), 2)
+
+        response = self.client.get(first['urls']['small'])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, 'image/jpeg')
+        self.assertIn('immutable', response.headers['Cache-Control'])
+        with PILImage.open(io.BytesIO(response.data)) as thumbnail:
+            self.assertEqual(thumbnail.size, (160, 120))
+        response.close()
+
+    def test_pending_thumbnail_redirects_to_original(self):
+        """Thumbnails that are not rendered yet fall back to the original."""
+        urls = self.upload(png_bytes('blue')).get_json()['image']['urls']
+
+        response = self.client.get(urls['medium'])
+        self.assertEqual(response.status_code, 302)
+        self.assertTrue(response.headers['Location'].endswith(urls['original']))
+        self.assertIn('no-cache', response.headers['Cache-Control'])
+
+    def test_rejects_non_images(self):
+        """Uploads that are not a supported image format are refused."""
+        response = self.upload(b'#!/bin/sh\necho not an image\n')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(Image.query.count(), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,115 @@
+"""
+Tests for per-listing group threads over Socket.IO.
+"""
+import unittest
+from datetime import datetime, timedelta
+from app import create_app, db, socketio
+from app.models.user import User, Role
+from app.models.food import FoodListing
+from app.models.chat import Chat
+from app.sockets import chat_events  # noqa: F401 (register Socket.IO handlers)
+
+
+class ListingThreadTestCase(unittest.TestCase):
+    """Test case for joining, reading and posting to listing threads."""
+
+    def setUp(self):
+        self.app = create_app('testing')
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+        role = Role.query.first()
+        users = [
+            User(email=f'neighbor{i}@emory.edu', password_hash='x', first_name='Neighbor',
+                 last_name=str(i), role_id=role.role_id)
+            for i in range(3)
+        ]
+        db.session.add_all(users)
+        db.session.commit()
+        self.provider, self.member, self.outsider = (user.user_id for user in users)
+        listings = [
+            FoodListing(provider_id=self.provider, title=title, quantity=1,
+                        expiration_date=datetime.utcnow() + timedelta(days=1))
+            for title in ('Soup', 'Bread')
+        ]
+        db.session.add_all(listings)
+        db.session.commit()
+        self.soup, self.bread = (listing.food_id for listing in listings)
+        self.clients = []
+
+    def tearDown(self):
+        for client in self.clients:
+            client.disconnect()
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def connect(self, user_id):
+        client = socketio.test_client(self.app, query_string=f'userId={user_id}')
+        self.clients.append(client)
+        return client
+
+    def events(self, client, name):
+        return [event['args'][0] for event in client.get_received() if event['name'] == name]
+
+    def test_thread_history_holds_only_that_listings_group_messages(self):
+        """A thread is the receiver-less messages of one listing, oldest first."""
+        db.session.add_all([
+            Chat(sender_id=self.provider, receiver_id=None, food_id=self.soup, message='soup 1'),
+            Chat(sender_id=self.member, receiver_id=None, food_id=self.soup, message='soup 2'),
+            Chat(sender_id=self.member, receiver_id=None, food_id=self.bread, message='bread'),
+            Chat(sender_id=self.member, receiver_id=self.provider, food_id=self.soup, message='private')
+        ])
+        db.session.commit()
+
+        client = self.connect(self.member)
+        client.emit('join_listing_thread', {'userId': self.member, 'foodId': self.soup})
+        history = self.events(client, 'listing_thread_history')
+        self.assertEqual([m['message'] for m in history[0]['messages']], ['soup 1', 'soup 2'])
+
+        # Group messages stay out of the one-to-one conversation list
+        conversations = self.app.test_client().get(f'/api/chat-list/{self.member}').get_json()['conversations']
+        self.assertEqual([convo['otherUser']['user_id'] for convo in conversations], [self.provider])
+        self.assertEqual(conversations[0]['latestMessage']['message'], 'private')
+
+    def test_messages_reach_only_thread_members(self):
+        """Posts are broadcast to the thread's room and nowhere else."""
+        provider = self.connect(self.provider)
+        member = self.connect(self.member)
+        outsider = self.connect(self.outsider)
+        provider.emit('join_listing_thread', {'userId': self.provider, 'foodId': self.soup})
+        member.emit('join_listing_thread', {'userId': self.member, 'foodId': self.soup})
+        outsider.emit('join_listing_thread', {'userId': self.outsider, 'foodId': self.bread})
+        for client in (provider, member, outsider):
+            client.get_received()
+
+        member.emit('send_listing_message', {'userId': self.member, 'foodId': self.soup, 'message': 'still hot?'})
+
+        for client in (provider, member):
+            self.assertEqual([m['message'] for m in self.events(client, 'new_listing_message')], ['still hot?'])
+        self.assertEqual(self.events(outsider, 'new_listing_message'), [])
+
+    def test_non_members_cannot_post_or_listen(self):
+        """A client that has not joined (or has left) a thread neither posts to nor hears it."""
+        member = self.connect(self.member)
+        outsider = self.connect(self.outsider)
+        member.emit('join_listing_thread', {'userId': self.member, 'foodId': self.soup})
+        member.get_received()
+
+        outsider.emit('send_listing_message', {'userId': self.outsider, 'foodId': self.soup, 'message': 'spam'})
+        self.assertEqual(
+            self.events(outsider, 'error'), [{'message': 'Join the listing thread before posting'}]
+        )
+        self.assertEqual(Chat.query.count(), 0)
+
+        member.emit('leave_listing_thread', {'foodId': self.soup})
+        outsider.emit('join_listing_thread', {'userId': self.outsider, 'foodId': self.soup})
+        outsider.emit('send_listing_message', {'userId': self.outsider, 'foodId': self.soup, 'message': 'hi'})
+        self.assertEqual(self.events(member, 'new_listing_message'), [])
+
+        outsider.emit('join_listing_thread', {'userId': self.outsider, 'foodId': 9999})
+        self.assertEqual(self.events(outsider, 'error'), [{'message': 'Food listing not found'}])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,30 @@
+"""
+Tests for the load-test report statistics.
+"""
+import unittest
+from load_test import percentile, summarize
+
+
+class PercentileTestCase(unittest.TestCase):
+    """Test case for nearest-rank percentiles."""
+
+    def test_nearest_rank(self):
+        """Percentiles pick the value at rank ceil(fraction * n)."""
+        hundred = list(range(1, 101))
+        self.assertEqual([percentile(hundred, f) for f in (0.5, 0.95, 0.99, 1.0)], [50, 95, 99, 100])
+        twenty = list(range(1, 21))
+        self.assertEqual([percentile(twenty, f) for f in (0.5, 0.95, 0.99)], [10, 19, 20])
+        self.assertEqual(percentile([7], 0.95), 7)
+        self.assertEqual(percentile([], 0.95), 0.0)
+
+    def test_summary_in_milliseconds(self):
+        """Latencies are reported in milliseconds with the request rate."""
+        summary = summarize([i / 1000 for i in range(100, 0, -1)], errors=2, seconds=10)
+        self.assertEqual(
+            (summary['requests'], summary['errors'], summary['rps']), (100, 2, 10.0)
+        )
+        self.assertEqual((summary['p50_ms'], summary['p95_ms'], summary['p99_ms']), (50.0, 95.0, 99.0))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,131 @@
+"""
+Tests for the mail outbox against a local SMTP stand-in.
+"""
+import socketserver
+import threading
+import unittest
+from datetime import datetime
+from flask import Flask
+from app import db, mail
+from app.models.outbox import OutboxMessage
+from app.models import user, food, rating, chat  # noqa: F401 (register every mapper)
+from app.utils.mail_outbox import MailOutbox, queue_mail
+
+
+class SMTPStandIn(socketserver.ThreadingTCPServer):
+    """Minimal SMTP server that records delivered messages."""
+
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self, reject=()):
+        super().__init__(('127.0.0.1', 0), SMTPHandler)
+        self.connections = 0
+        self.messages = []
+        self.reject = set(reject)
+
+
+class SMTPHandler(socketserver.StreamRequestHandler):
+
+    def reply(self, line):
+        self.wfile.write(line.encode('ascii') + b'\r\n')
+
+    def handle(self):
+        self.server.connections += 1
+        recipients = []
+        self.reply('220 stand-in ready')
+        for raw in self.rfile:
+            command = raw.decode('utf-8').strip()
+            verb = command.split(' ', 1)[0].upper()
+            if verb == 'EHLO' or verb == 'HELO':
+                self.reply('250 stand-in')
+            elif verb == 'RCPT':
+                address = command.split(':', 1)[1].strip(' <>')
+                if address in self.server.reject:
+                    self.reply('550 rejected')
+                else:
+                    recipients.append(address)
+                    self.reply('250 OK')
+            elif verb == 'DATA':
+                self.reply('354 go ahead')
+                lines = []
+                for data_line in self.rfile:
+                    if data_line in (b'.\r\n', b'.\n'):
+                        break
+                    lines.append(data_line)
+                self.server.messages.append((recipients, b''.join(lines)))
+                recipients = []
+                self.reply('250 queued')
+            elif verb == 'QUIT':
+                self.reply('221 bye')
+                return
+            else:
+                self.reply('250 OK')
+
+
+class MailOutboxTestCase(unittest.TestCase):
+    """Test case for the mail outbox."""
+
+    def setUp(self):
+        self.smtp = SMTPStandIn(reject={'bounce@emory.edu'})
+        threading.Thread(target=self.smtp.serve_forever, daemon=True).start()
+
+        self.app = Flask(__name__)
+        self.app.config.update(
+            SQLALCHEMY_DATABASE_URI='sqlite://',
+            MAIL_SERVER='127.0.0.1',
+            MAIL_PORT=self.smtp.server_address[1],
+            MAIL_USE_TLS=False,
+            MAIL_USERNAME=None,
+            MAIL_DEFAULT_SENDER='noreply@example.com'
+        )
+        db.init_app(self.app)
+        mail.init_app(self.app)
+        self.outbox = MailOutbox(batch_size=10, max_attempts=2, retry_base=0)
+        self.outbox.init_app(self.app)
+
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+        self.smtp.shutdown()
+        self.smtp.server_close()
+
+    def test_batch_is_sent_over_one_connection(self):
+        """Every due message of a batch shares a single SMTP connection."""
+        for i in range(3):
+            queue_mail('Hello', [f'user{i}@emory.edu'], 'Body', sender='noreply@example.com')
+        db.session.commit()
+        self.assertEqual(self.outbox.queue_depth(), 3)
+        self.assertEqual(self.outbox.stats()['queue_depth'], 3)
+
+        self.assertEqual(self.outbox.send_pending(), 3)
+
+        self.assertEqual(self.smtp.connections, 1)
+        self.assertEqual(len(self.smtp.messages), 3)
+        self.assertEqual(self.outbox.queue_depth(), 0)
+
+    def test_failed_message_is_retried_then_given_up(self):
+        """Rejected messages back off and are marked failed after max attempts."""
+        queue_mail('Hello', ['bounce@emory.edu'], 'Body', sender='noreply@example.com')
+        queue_mail('Hello', ['ok@emory.edu'], 'Body', sender='noreply@example.com')
+        db.session.commit()
+
+        self.outbox.send_pending()
+        bounced = OutboxMessage.query.filter_by(recipients='bounce@emory.edu').one()
+        self.assertEqual(bounced.status, 'pending')
+        self.assertEqual(bounced.attempts, 1)
+        self.assertLessEqual(bounced.next_attempt_at, datetime.utcnow())
+
+        self.outbox.send_pending()
+        self.assertEqual(bounced.status, 'failed')
+        self.assertEqual(len(self.smtp.messages), 1)
+        self.assertEqual(self.outbox.stats(), {'sent': 1, 'retried': 1, 'failed': 1, 'queue_depth': 0})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+"""
+Tests for the Prometheus metrics endpoint.
+"""
+import unittest
+from flask import Flask, jsonify
+from app import create_app, db
+from app.models import user, food, rating, chat, outbox  # noqa: F401 (register every mapper)
+from app.models.chat import Chat
+from app.routes.metrics import metrics_bp
+from app.utils.metrics import metrics
+
+
+class MetricsTestCase(unittest.TestCase):
+    """Test case for request and SQL metrics."""
+
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.app.config.update(SQLALCHEMY_DATABASE_URI='sqlite://', METRICS_ENABLED=True)
+        db.init_app(self.app)
+        metrics.init_app(self.app)
+        self.app.register_blueprint(metrics_bp)
+
+        @self.app.route('/count')
+        def count():
+            return jsonify({'count': Chat.query.count()})
+
+        with self.app.app_context():
+            db.create_all()
+        self.client = self.app.test_client()
+
+    def tearDown(self):
+        metrics.enabled = False
+
+    def test_records_latency_status_and_queries_per_endpoint(self):
+        """Requests show up per endpoint with their status and SQL count."""
+        self.client.get('/count')
+        self.client.get('/count')
+        self.client.get('/missing')
+
+        response = self.client.get('/api/metrics')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.content_type.startswith('text/plain; version=0.0.4'))
+        text = response.get_data(as_text=True)
+        self.assertIn('foodshare_http_requests_total{endpoint="count",method="GET",status="200"} 2', text)
+        self.assertIn('foodshare_http_requests_total{endpoint="unmatched",method="GET",status="404"} 1', text)
+        self.assertIn('foodshare_http_request_duration_seconds_count{endpoint="count"} 2', text)
+        self.assertIn('foodshare_http_request_db_queries_bucket{endpoint="count",le="1"} 2', text)
+        self.assertIn('foodshare_db_pool_size', text)
+        self.assertIn('foodshare_mail_outbox_queue_depth 0', text)
+
+    def test_disabled_by_default(self):
+        """The endpoint is not served unless METRICS_ENABLED is set."""
+        app = create_app('testing')
+        self.assertEqual(app.test_client().get('/api/metrics').status_code, 404)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+"""
+Tests for password hashing off the event loop and legacy hash upgrades.
+"""
+import unittest
+from unittest import mock
+from werkzeug.security import generate_password_hash, check_password_hash
+from app import create_app, db
+from app.models.user import User, Role
+from app.utils.passwords import PasswordHasher, password_hasher
+
+
+class PasswordHasherTestCase(unittest.TestCase):
+    """Test case for PasswordHasher."""
+
+    def test_runs_in_the_thread_pool_under_eventlet(self):
+        """With threads monkey-patched, hashing and verification go through tpool."""
+        hasher = PasswordHasher(method='pbkdf2:sha256:1000')
+        with mock.patch('app.utils.passwords.patcher.is_monkey_patched', return_value=True), \
+                mock.patch('app.utils.passwords.tpool.execute', side_effect=lambda func, *args: func(*args)) as execute:
+            hashed = hasher.hash('secret')
+            self.assertTrue(hasher.verify(hashed, 'secret'))
+            self.assertFalse(hasher.verify(hashed, 'wrong'))
+        self.assertEqual(execute.call_count, 3)
+        self.assertEqual(hasher.stats()['completed'], 3)
+        self.assertTrue(hashed.startswith('pbkdf2:sha256:1000$'))
+
+    def test_needs_rehash(self):
+        """Only hashes made with the configured method are current."""
+        hasher = PasswordHasher(method='pbkdf2:sha256:600000')
+        self.assertFalse(hasher.needs_rehash('pbkdf2:sha256:600000$salt$hash'))
+        self.assertTrue(hasher.needs_rehash('pbkdf2:sha256:260000$salt$hash'))
+        self.assertTrue(hasher.needs_rehash('scrypt:32768:8:1$salt$hash'))
+
+
+class LegacyHashLoginTestCase(unittest.TestCase):
+    """Test case for upgrading legacy hashes at login."""
+
+    def setUp(self):
+        self.app = create_app('testing')
+        self.client = self.app.test_client()
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+        user = User(email='legacy@emory.edu', first_name='Legacy', last_name='User',
+                    password_hash=generate_password_hash('password123', method='pbkdf2:sha256:1000'),
+                    role_id=Role.query.first().role_id)
+        db.session.add(user)
+        db.session.commit()
+        self.user_id = user.user_id
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def stored_hash(self):
+        db.session.expire_all()
+        return db.session.get(User, self.user_id).password_hash
+
+    def login(self, password='password123'):
+        return self.client.post('/api/login', json={'email': 'legacy@emory.edu', 'password': password})
+
+    def test_legacy_hash_is_verified_and_rehashed(self):
+        """A login with a legacy hash succeeds and stores a current hash of the same password."""
+        self.assertEqual(self.login('wrong').status_code, 401)
+        self.assertTrue(self.stored_hash().startswith('pbkdf2:sha256:1000$'))
+
+        self.assertEqual(self.login().status_code, 200)
+        upgraded = self.stored_hash()
+        self.assertFalse(password_hasher.needs_rehash(upgraded))
+        self.assertTrue(check_password_hash(upgraded, 'password123'))
+
+        # A current hash is left alone
+        self.assertEqual(self.login().status_code, 200)
+        self.assertEqual(self.stored_hash(), upgraded)
+
+
+if __name__ == '__main__':
+    unittest.main()
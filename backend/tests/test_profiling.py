@@ -0,0 +1,71 @@
+"""
+Tests for the slow-query log and request profiler.
+"""
+import contextlib
+import io
+import os
+import shutil
+import tempfile
+import unittest
+from flask import Flask, jsonify
+from app import db
+from app.models import user, food, rating, chat  # noqa: F401 (register every mapper)
+from app.models.chat import Chat
+from app.utils.profiling import SlowQueryLog, RequestProfiler, parameter_shape
+
+
+class ProfilingTestCase(unittest.TestCase):
+    """Test case for slow statements and profiled requests."""
+
+    def setUp(self):
+        self.profile_dir = tempfile.mkdtemp()
+        self.app = Flask(__name__)
+        self.app.config.update(
+            SQLALCHEMY_DATABASE_URI='sqlite://',
+            SLOW_QUERY_MS=1e-9,
+            PROFILE_TOKEN='secret',
+            PROFILE_DIR=self.profile_dir
+        )
+        db.init_app(self.app)
+        self.slow_queries = SlowQueryLog()
+        self.slow_queries.init_app(self.app)
+        RequestProfiler().init_app(self.app)
+
+        @self.app.route('/count')
+        def count():
+            return jsonify({'count': Chat.query.filter(Chat.sender_id == 1).count()})
+
+        with self.app.app_context():
+            db.create_all()
+        self.client = self.app.test_client()
+
+    def tearDown(self):
+        shutil.rmtree(self.profile_dir)
+
+    def test_slow_queries_are_logged_with_endpoint_and_parameter_types(self):
+        """Statements over the threshold are printed without parameter values."""
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            self.client.get('/count')
+        self.assertIn('[count]: SELECT count(*)', output.getvalue())
+        self.assertIn('params=(int)', output.getvalue())
+        self.assertGreater(self.slow_queries.stats()['logged'], 0)
+        self.assertEqual(parameter_shape([(1, 'a'), (2, 'b')], executemany=True), '2 x (int, str)')
+
+    def test_profiles_only_requests_with_the_token(self):
+        """A request with the right header writes a profile, others do not."""
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.assertNotIn('X-Profile-Id', self.client.get('/count', headers={'X-Profile': 'wrong'}).headers)
+            response = self.client.get('/count', headers={'X-Profile': 'secret'})
+
+        profile_id = response.headers['X-Profile-Id']
+        self.assertEqual(
+            sorted(os.listdir(self.profile_dir)),
+            [f'{profile_id}.prof', f'{profile_id}.tracemalloc', f'{profile_id}.txt']
+        )
+        with open(os.path.join(self.profile_dir, f'{profile_id}.txt')) as f:
+            self.assertIn('GET /count? -> 200', f.read())
+
+
+if __name__ == '__main__':
+    unittest.main()
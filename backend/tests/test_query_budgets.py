@@ -0,0 +1,108 @@
+"""
+Query budgets for list endpoints.
+
+Each endpoint runs a fixed number of SQL statements however many rows it
+returns; a budget failure lists the statements that were run.
+"""
+import unittest
+from datetime import datetime, timedelta
+import pytest
+from app import create_app, db
+from app.models.user import User, Role
+from app.models.food import FoodListing
+from app.models.chat import Chat
+from app.utils.query_counter import count_queries
+
+
+@pytest.mark.usefixtures('query_budget')
+class QueryBudgetTestCase(unittest.TestCase):
+    """Test case for SQL statements per request."""
+
+    def setUp(self):
+        self.app = create_app('testing')
+        self.client = self.app.test_client()
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+        self.role = Role.query.first()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def add_users(self, n):
+        start = User.query.count()
+        users = [
+            User(email=f'user{i}@emory.edu', password_hash='x', first_name='User',
+                 last_name=str(i), role_id=self.role.role_id)
+            for i in range(start, start + n)
+        ]
+        db.session.add_all(users)
+        db.session.commit()
+        return users
+
+    def add_listings(self, providers, per_provider):
+        listings = [
+            FoodListing(provider_id=provider.user_id, title=f'Food {i}', quantity=1,
+                        expiration_date=datetime.utcnow() + timedelta(days=2))
+            for provider in providers for i in range(per_provider)
+        ]
+        db.session.add_all(listings)
+        db.session.commit()
+        return listings
+
+    def test_feed(self):
+        """The feed stays within 3 queries (4 with ratings) for any number of listings."""
+        for new_providers in (1, 12):
+            with self.subTest(new_providers=new_providers):
+                self.add_listings(self.add_users(new_providers), 2)
+                db.session.expire_all()
+                with self.query_budget(3):
+                    response = self.client.get('/api/food_listings')
+                self.assertEqual(response.status_code, 200)
+                self.assertTrue(all(food['provider'] for food in response.get_json()['food_listings']))
+
+                with self.query_budget(4):
+                    self.client.get('/api/food_listings?include_rating=true')
+
+    def test_posts_by_user(self):
+        """A user's posts stay within 3 queries."""
+        provider = self.add_users(1)[0]
+        url = f'/api/user/{provider.user_id}/posts'
+        self.add_listings([provider], 10)
+        with self.query_budget(3):
+            response = self.client.get(url)
+        self.assertEqual(len(response.get_json()['food_listings']), 10)
+
+    def test_chat_list(self):
+        """The conversation list stays within 4 queries (one for archived conversations) for any number."""
+        me, *others = self.add_users(8)
+        listings = self.add_listings(others, 1)
+        db.session.add_all(
+            Chat(sender_id=other.user_id, receiver_id=me.user_id, message='hi', food_id=food.food_id)
+            for other, food in zip(others, listings)
+        )
+        db.session.commit()
+        url = f'/api/chat-list/{me.user_id}'
+        db.session.expire_all()
+
+        with self.query_budget(4):
+            response = self.client.get(url)
+        conversations = response.get_json()['conversations']
+        self.assertEqual(len(conversations), 7)
+        self.assertTrue(all(convo['foodTitle'] == 'Food 0' for convo in conversations))
+
+    def test_budget_reports_n_plus_one(self):
+        """Repeated statements of one shape fail the budget."""
+        user_ids = [user.user_id for user in self.add_users(3)]
+        with count_queries() as queries:
+            for user_id in user_ids:
+                User.query.filter_by(user_id=user_id).first()
+        self.assertEqual(queries.count, 3)
+        with self.assertRaisesRegex(AssertionError, 'possible N\\+1: 3 x SELECT'):
+            queries.check_budget(10)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+"""
+Tests for token-bucket rate limiting.
+"""
+import unittest
+from unittest import mock
+from flask import Flask, jsonify
+from app import create_app
+from app.config import TestingConfig
+from app.utils.rate_limit import MemoryBackend, RateLimiter, parse_rate, request_email
+from helpers import FakeClock
+
+
+class MemoryBackendTestCase(unittest.TestCase):
+    """Test case for the in-memory token buckets."""
+
+    def test_bucket_refills_over_time(self):
+        """Tokens are used up by a burst and come back at the refill rate."""
+        clock = FakeClock()
+        backend = MemoryBackend(clock=clock)
+        capacity, rate = parse_rate('3/minute')
+
+        for _ in range(3):
+            self.assertTrue(backend.consume('k', capacity, rate)[0])
+        allowed, retry_after = backend.consume('k', capacity, rate)
+        self.assertFalse(allowed)
+        self.assertAlmostEqual(retry_after, 20.0)
+
+        clock.now = 20.0
+        self.assertTrue(backend.consume('k', capacity, rate)[0])
+
+    def test_invalid_rate(self):
+        """Malformed rate strings are rejected."""
+        with self.assertRaises(ValueError):
+            parse_rate('ten per minute')
+
+
+class RateLimiterTestCase(unittest.TestCase):
+    """Test case for the route decorator."""
+
+    def setUp(self):
+        self.limiter = RateLimiter()
+        self.app = Flask(__name__)
+        self.limiter.init_app(self.app)
+
+        @self.app.route('/login', methods=['POST'])
+        @self.limiter.limit(ip='10/minute', user='2/minute', user_key=request_email)
+        def login():
+            return jsonify({'ok': True}), 200
+
+        self.client = self.app.test_client()
+
+    def test_user_limit_returns_429_with_retry_after(self):
+        """The per-user bucket sheds requests for one account but not others."""
+        for _ in range(2):
+            response = self.client.post('/login', json={'email': 'a@emory.edu'})
+            self.assertEqual(response.status_code, 200)
+
+        response = self.client.post('/login', json={'email': 'A@emory.edu'})
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response.headers['Retry-After'], '30')
+
+        response = self.client.post('/login', json={'email': 'b@emory.edu'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.limiter.stats()['login:user'], {'allowed': 3, 'limited': 1})
+
+
+class ProxiedClientTestCase(unittest.TestCase):
+    """Test case for per-IP limits behind trusted proxies."""
+
+    def signup_from(self, proxy_count, *client_ips):
+        limits = {'auth.signup': {'ip': '1/hour'}}
+        with mock.patch.multiple(TestingConfig, RATELIMIT_ENABLED=True, RATELIMITS=limits,
+                                 TRUSTED_PROXY_COUNT=proxy_count):
+            app = create_app('testing')
+        client = app.test_client()
+        return [
+            client.post('/api/signup', json={}, headers={'X-Forwarded-For': ip},
+                        environ_base={'REMOTE_ADDR': '10.0.0.1'}).status_code
+            for ip in client_ips
+        ]
+
+    def test_forwarded_clients_get_separate_buckets(self):
+        """With a trusted proxy each forwarded client address has its own bucket."""
+        statuses = self.signup_from(1, '203.0.113.5', '198.51.100.7', '203.0.113.5')
+        self.assertNotEqual(statuses[1], 429)
+        self.assertEqual(statuses[2], 429)
+
+    def test_forwarded_header_is_ignored_without_trusted_proxies(self):
+        """By default X-Forwarded-For is not trusted and the socket address is the key."""
+        statuses = self.signup_from(0, '203.0.113.5', '198.51.100.7')
+        self.assertEqual(statuses[1], 429)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,191 @@
+"""
+Tests for ratings and their materialized aggregates.
+"""
+import unittest
+from datetime import datetime
+from unittest import mock
+from sqlalchemy import text
+from app import create_app, db
+from app.models.user import User, Role
+from app.models.rating import Rating, UserRatingStats
+from app.routes.ratings import MAX_BATCH_RATING_IDS
+from app.utils.rating_stats import setup_ratings, rebuild_rating_stats, rating_summary
+
+
+class RatingTestCase(unittest.TestCase):
+    """Test case for rating submission, checks and aggregates."""
+
+    def setUp(self):
+        self.app = create_app('testing')
+        self.client = self.app.test_client()
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+        role = Role.query.first()
+        users = [
+            User(email=f'rater{i}@emory.edu', password_hash='x', first_name='Rater',
+                 last_name=str(i), role_id=role.role_id)
+            for i in range(3)
+        ]
+        db.session.add_all(users)
+        db.session.commit()
+        self.giver, self.other, self.receiver = (user.user_id for user in users)
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def rate(self, score, giver_id=None, resource_id=1):
+        return self.client.post('/api/ratings', json={
+            'giver_id': giver_id or self.giver,
+            'receiver_id': self.receiver,
+            'resource_id': resource_id,
+            'resource_type': 'food',
+            'score': score
+        })
+
+    def stats(self):
+        db.session.expire_all()
+        return db.session.get(UserRatingStats, self.receiver)
+
+    def test_aggregates_and_histogram(self):
+        """Every accepted rating updates the stored totals served by the rating endpoint."""
+        for resource_id, score in enumerate((5, 4, 4, 1), start=1):
+            self.assertEqual(self.rate(score, resource_id=resource_id).status_code, 201)
+        for score in (5.0, True, '5', 6):
+            with self.subTest(score=score):
+                self.assertEqual(self.rate(score, resource_id=9).status_code, 400)
+
+        data = self.client.get(f'/api/users/{self.receiver}/rating').get_json()
+        self.assertEqual((data['average_rating'], data['rating_count']), (3.5, 4))
+        self.assertEqual(data['histogram'], {'1': 1, '2': 0, '3': 0, '4': 2, '5': 1})
+
+    def test_rebuild_repairs_drift(self):
+        """Rebuilding recomputes the same totals the incremental updates produced."""
+        for resource_id, score in enumerate((2, 5, 3), start=1):
+            self.rate(score, resource_id=resource_id)
+        expected = self.stats().to_dict()
+        expected_weight = self.stats().decayed_weight
+        now = datetime.utcnow()
+        expected_reputation = self.stats().reputation(now=now)
+
+        db.session.execute(db.update(UserRatingStats).values(score_sum=0, score_5=7, decayed_weight=0))
+        db.session.commit()
+        self.assertEqual(rebuild_rating_stats(), 1)
+
+        rebuilt = self.stats().to_dict()
+        for field in ('average_rating', 'rating_count', 'histogram'):
+            self.assertEqual(rebuilt[field], expected[field])
+        self.assertAlmostEqual(self.stats().decayed_weight, expected_weight)
+        self.assertAlmostEqual(self.stats().reputation(now=now), expected_reputation)
+
+    def test_failed_aggregate_update_leaves_no_rating(self):
+        """The rating and its aggregates are written in one transaction."""
+        self.assertEqual(self.rate(2).status_code, 201)
+        with mock.patch('app.utils.rating_stats.apply_rating', side_effect=RuntimeError('stats failed')):
+            self.assertEqual(self.rate(4, giver_id=self.other).status_code, 400)
+            self.assertEqual(self.rate(5).status_code, 400)
+
+        db.session.expire_all()
+        self.assertEqual([rating.score for rating in Rating.query.all()], [2])
+        stats = self.stats()
+        self.assertEqual((stats.rating_count, stats.score_sum), (1, 2))
+
+    def test_setup_adds_missing_receiver_index(self):
+        """The receiver index is created on databases whose ratings table predates it."""
+        db.session.execute(text('DROP INDEX ix_ratings_receiver_id'))
+        db.session.commit()
+        setup_ratings()
+        indexes = {index['name'] for index in db.inspect(db.engine).get_indexes('ratings')}
+        self.assertIn('ix_ratings_receiver_id', indexes)
+
+    def test_rerating_replaces_the_score(self):
+        """Resubmitting moves the aggregates by the difference instead of adding a rating."""
+        self.assertEqual(self.rate(2).status_code, 201)
+        self.assertEqual(self.rate(4, giver_id=self.other).status_code, 201)
+
+        response = self.rate(5)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Rating.query.filter_by(receiver_id=self.receiver).count(), 2)
+
+        stats = self.stats()
+        self.assertEqual((stats.rating_count, stats.score_sum), (2, 9))
+        self.assertEqual(stats.histogram(), {1: 0, 2: 0, 3: 0, 4: 1, 5: 1})
+
+    def test_setup_removes_duplicate_ratings(self):
+        """Older databases without the unique index keep only the latest duplicate."""
+        db.session.execute(text('DROP INDEX uq_ratings_giver_receiver_resource'))
+        db.session.add_all(
+            Rating(giver_id=self.giver, receiver_id=self.receiver, resource_id=1,
+                   resource_type='food', score=score, created_at=datetime.utcnow())
+            for score in (1, 3, 4)
+        )
+        db.session.commit()
+
+        setup_ratings()
+
+        self.assertEqual([rating.score for rating in Rating.query.all()], [4])
+        indexes = {index['name'] for index in db.inspect(db.engine).get_indexes('ratings')}
+        self.assertIn('uq_ratings_giver_receiver_resource', indexes)
+        stats = self.stats()
+        self.assertEqual((stats.rating_count, stats.score_sum), (1, 4))
+
+    def test_batch_check(self):
+        """Existing ratings are found whatever the ID types, and bad keys are rejected."""
+        self.rate(3)
+        key = {'giver_id': self.giver, 'receiver_id': self.receiver, 'resource_id': 1, 'resource_type': 'food'}
+
+        response = self.client.post('/api/ratings/check', json=[
+            key,
+            {**key, 'giver_id': str(self.giver), 'resource_id': '1'},
+            {**key, 'resource_id': 2}
+        ])
+        self.assertEqual(
+            [result['already_rated'] for result in response.get_json()['results']],
+            [True, True, False]
+        )
+        response = self.client.post('/api/ratings/check', json={**key, 'receiver_id': str(self.receiver)})
+        self.assertTrue(response.get_json()['already_rated'])
+
+        for bad in ({**key, 'giver_id': [1]}, {**key, 'resource_type': {'a': 1}}, {**key, 'resource_id': 'one'}):
+            with self.subTest(bad=bad):
+                self.assertEqual(self.client.post('/api/ratings/check', json=bad).status_code, 400)
+                self.assertEqual(self.client.post('/api/ratings/check', json=[bad]).status_code, 400)
+
+    def batch_ratings(self, ids):
+        return self.client.get('/api/users/ratings', query_string={'ids': ids})
+
+    def test_batch_ratings(self):
+        """Rated, unrated and unknown users are all answered, keyed by ID."""
+        self.rate(4)
+        self.rate(2, giver_id=self.other)
+        unknown = self.receiver + 100
+
+        response = self.batch_ratings(f'{self.receiver}, {self.giver},,{unknown},{self.receiver}')
+        self.assertEqual(response.status_code, 200)
+        ratings = response.get_json()['ratings']
+        self.assertCountEqual(ratings, [str(self.giver), str(self.receiver), str(unknown)])
+        self.assertEqual((ratings[str(self.receiver)]['average_rating'], ratings[str(self.receiver)]['rating_count']),
+                         (3.0, 2))
+        # Unrated and unknown users get the same empty summary
+        self.assertEqual(ratings[str(self.giver)], rating_summary(None))
+        self.assertEqual(ratings[str(unknown)], rating_summary(None))
+        self.assertEqual((rating_summary(None)['average_rating'], rating_summary(None)['rating_count']), (0, 0))
+
+    def test_batch_ratings_rejects_bad_ids(self):
+        """Non-integer, blank and oversized ID lists are rejected with 400."""
+        for ids in ('1,two', '1.5', '1;2', '', ' , ,'):
+            with self.subTest(ids=ids):
+                self.assertEqual(self.batch_ratings(ids).status_code, 400)
+        self.assertEqual(self.client.get('/api/users/ratings').status_code, 400)
+
+        at_cap = ','.join(str(i) for i in range(1, MAX_BATCH_RATING_IDS + 1))
+        self.assertEqual(self.batch_ratings(at_cap).status_code, 200)
+        self.assertEqual(self.batch_ratings(f'{at_cap},{MAX_BATCH_RATING_IDS + 1}').status_code, 400)
+        # Duplicates count once towards the cap
+        self.assertEqual(self.batch_ratings(f'{at_cap},1,2,3').status_code, 200)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+"""
+Tests for read-replica routing and SQLite replica sync.
+"""
+import os
+import shutil
+import tempfile
+import unittest
+from flask import Flask, jsonify
+from app import db
+from app.models import user, food, rating, chat  # noqa: F401 (register every mapper)
+from app.models.chat import Chat
+from app.utils.database import route_read_only_requests, REPLICA_BIND
+from app.utils.replica_sync import ReplicaSync
+
+
+class ReadReplicaTestCase(unittest.TestCase):
+    """Test case for routing reads between a primary and a replica file."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.app = Flask(__name__)
+        self.app.config.update(
+            SQLALCHEMY_DATABASE_URI=f"sqlite:///{os.path.join(self.tmp_dir, 'primary.db')}",
+            SQLALCHEMY_BINDS={REPLICA_BIND: f"sqlite:///{os.path.join(self.tmp_dir, 'replica.db')}"}
+        )
+        db.init_app(self.app)
+        self.app.before_request(route_read_only_requests)
+        self.sync = ReplicaSync()
+        self.sync.init_app(self.app)
+
+        @self.app.route('/count', methods=['GET', 'POST'])
+        def count():
+            return jsonify({'count': Chat.query.count()})
+
+        @self.app.route('/send_then_count', methods=['GET'])
+        def send_then_count():
+            db.session.add(Chat(sender_id=1, receiver_id=2, message='hi'))
+            db.session.commit()
+            return jsonify({'count': Chat.query.count()})
+
+        with self.app.app_context():
+            db.create_all()
+            self.sync.sync(force=True)
+        self.client = self.app.test_client()
+
+    def tearDown(self):
+        self.sync.close()
+        with self.app.app_context():
+            for engine in db.engines.values():
+                engine.dispose()
+        # init_app registered metadata for the replica bind on the shared extension
+        db.metadatas.pop(REPLICA_BIND, None)
+        shutil.rmtree(self.tmp_dir)
+
+    def add_message(self):
+        with self.app.app_context():
+            db.session.add(Chat(sender_id=1, receiver_id=2, message='hello'))
+            db.session.commit()
+
+    def test_get_reads_replica_until_synced(self):
+        """GET requests see writes once the replica has been synced."""
+        self.add_message()
+        self.assertEqual(self.client.get('/count').get_json()['count'], 0)
+        self.assertEqual(self.client.post('/count').get_json()['count'], 1)
+
+        with self.app.app_context():
+            self.assertTrue(self.sync.sync())
+            self.assertFalse(self.sync.sync())
+        self.assertEqual(self.client.get('/count').get_json()['count'], 1)
+        self.assertEqual(self.sync.stats()['skipped'], 1)
+
+    def test_reads_after_a_write_are_pinned_to_primary(self):
+        """A request that wrote reads its own write for the rest of the request."""
+        self.assertEqual(self.client.get('/send_then_count').get_json()['count'], 1)
+        self.assertEqual(self.client.get('/count').get_json()['count'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+"""
+Tests for time-decayed, prior-smoothed reputation scores.
+"""
+import unittest
+from datetime import datetime, timedelta
+from flask import Flask
+from app import create_app, db
+from app.models.user import User, Role
+from app.models.rating import Rating, UserRatingStats
+from app.utils.reputation import decay_weight, reputation_score
+
+NOW = datetime(2025, 4, 1, 12, 0)
+HALF_LIFE = timedelta(days=180)
+
+
+def score_of(ratings, now=NOW):
+    """Reputation of (score, rated_at) pairs, accumulated like the stats table does."""
+    weights = [decay_weight(rated_at) for _, rated_at in ratings]
+    return reputation_score(sum(score * w for (score, _), w in zip(ratings, weights)), sum(weights), now=now)
+
+
+class ReputationMathTestCase(unittest.TestCase):
+    """Test case for decay and smoothing with a fixed clock."""
+
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.app.config.update(
+            REPUTATION_HALF_LIFE_DAYS=180, REPUTATION_PRIOR_MEAN=3.0, REPUTATION_PRIOR_WEIGHT=5.0
+        )
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+
+    def tearDown(self):
+        self.app_context.pop()
+
+    def test_weight_halves_every_half_life(self):
+        """A rating counts half as much one half-life later."""
+        self.assertAlmostEqual(decay_weight(NOW + HALF_LIFE) / decay_weight(NOW), 2.0)
+        # Prior 3 x 5 plus one 5-star rating at full weight, then at half weight
+        self.assertAlmostEqual(score_of([(5, NOW)]), 20 / 6)
+        self.assertAlmostEqual(score_of([(5, NOW)], now=NOW + HALF_LIFE), 17.5 / 5.5)
+        # Recent ratings outweigh old ones
+        self.assertAlmostEqual(score_of([(1, NOW - HALF_LIFE), (5, NOW)]), (15 + 0.5 + 5) / 6.5)
+
+    def test_prior_smooths_few_ratings(self):
+        """One perfect rating stays near the prior; a long perfect record approaches 5."""
+        self.assertAlmostEqual(reputation_score(0, 0, now=NOW), 3.0)
+        few = score_of([(5, NOW)])
+        many = score_of([(5, NOW)] * 100)
+        self.assertLess(few, 3.5)
+        self.assertAlmostEqual(many, (15 + 500) / 105)
+        self.assertGreater(many, few)
+
+
+class ReputationStatsTestCase(unittest.TestCase):
+    """Test case for the decayed totals kept in user_rating_stats."""
+
+    def setUp(self):
+        self.app = create_app('testing')
+        self.client = self.app.test_client()
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+        role = Role.query.first()
+        users = [
+            User(email=f'rep{i}@emory.edu', password_hash='x', first_name='Rep',
+                 last_name=str(i), role_id=role.role_id)
+            for i in range(2)
+        ]
+        db.session.add_all(users)
+        db.session.commit()
+        self.giver, self.receiver = (user.user_id for user in users)
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def rate(self, score):
+        return self.client.post('/api/ratings', json={
+            'giver_id': self.giver, 'receiver_id': self.receiver,
+            'resource_id': 1, 'resource_type': 'food', 'score': score
+        })
+
+    def test_rerating_replaces_the_decayed_contribution(self):
+        """A new score replaces the old one at the original rating's weight."""
+        self.rate(1)
+        self.rate(5)
+        self.rate(4)
+
+        rated_at = Rating.query.one().created_at
+        stats = db.session.get(UserRatingStats, self.receiver)
+        self.assertAlmostEqual(stats.decayed_weight, decay_weight(rated_at))
+        self.assertAlmostEqual(stats.decayed_score_sum, 4 * decay_weight(rated_at))
+        self.assertAlmostEqual(stats.reputation(now=rated_at), (15 + 4) / 6)
+
+
+if __name__ == '__main__':
+    unittest.main()
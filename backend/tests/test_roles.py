@@ -0,0 +1,64 @@
+"""
+Tests for the role registry.
+"""
+import unittest
+from sqlalchemy import event
+from app import create_app, db
+from app.models.user import User, Role
+from app.utils.roles import role_registry
+
+
+class RoleRegistryTestCase(unittest.TestCase):
+    """Test case for cached role lookups."""
+
+    def setUp(self):
+        self.app = create_app('testing')
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+        self.role = Role(name='alumni')
+        db.session.add(self.role)
+        db.session.commit()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def test_serializing_users_issues_no_role_queries(self):
+        """A page of users serializes without touching the roles table."""
+        for i in range(5):
+            db.session.add(User(
+                email=f'user{i}@emory.edu', password_hash='x', first_name='U',
+                last_name=str(i), role_id=self.role.role_id
+            ))
+        db.session.commit()
+        role_registry.name_for(self.role.role_id)
+
+        statements = []
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(db.engine, 'before_cursor_execute', record)
+        try:
+            users = [user.to_dict() for user in User.query.all()]
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', record)
+
+        self.assertEqual([user['role'] for user in users], ['alumni'] * 5)
+        self.assertEqual(len(statements), 1)
+
+    def test_committed_role_changes_refresh_the_registry(self):
+        """Adding or renaming a role is visible on the next lookup."""
+        self.assertIsNone(role_registry.id_for('visiting'))
+        db.session.add(Role(name='visiting'))
+        db.session.commit()
+        self.assertIsNotNone(role_registry.id_for('visiting'))
+
+        self.role.name = 'emeritus'
+        db.session.commit()
+        self.assertEqual(role_registry.name_for(self.role.role_id), 'emeritus')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+"""
+Tests for start-up database setup and the schema stamp.
+"""
+import contextlib
+import io
+import unittest
+from sqlalchemy import text
+from app import create_app, db
+from app.utils.setup import (
+    prepare_database, read_schema_version, current_schema_version, missing_schema_objects, schema_version
+)
+
+
+class SetupTestCase(unittest.TestCase):
+    """Test case for prepare_database."""
+
+    def setUp(self):
+        self.app = create_app('testing')
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def unstamp(self):
+        db.session.execute(schema_version.delete())
+        db.session.commit()
+
+    def test_stamped_database_skips_setup(self):
+        """A fresh database is complete and stamped, so the next boot does nothing."""
+        self.assertEqual(read_schema_version(), current_schema_version())
+        self.assertEqual(missing_schema_objects(), [])
+        self.assertFalse(prepare_database())
+
+    def test_setup_repairs_missing_indexes_and_triggers(self):
+        """Indexes on existing tables and dropped search triggers are recreated before stamping."""
+        db.session.execute(text('DROP INDEX ix_chat_archive_conversation'))
+        db.session.execute(text('DROP TRIGGER chats_fts_update'))
+        self.unstamp()
+        self.assertEqual(
+            missing_schema_objects(), ['index ix_chat_archive_conversation', 'chat search chats_fts_update']
+        )
+
+        self.assertTrue(prepare_database())
+        self.assertEqual(missing_schema_objects(), [])
+        self.assertEqual(read_schema_version(), current_schema_version())
+
+    def test_incomplete_schema_is_not_stamped(self):
+        """A column that setup cannot add keeps the database unstamped."""
+        db.session.execute(text('ALTER TABLE user_rating_stats DROP COLUMN last_updated'))
+        self.unstamp()
+
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            self.assertTrue(prepare_database())
+        self.assertIn('column user_rating_stats.last_updated', output.getvalue())
+        self.assertIsNone(read_schema_version())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+"""
+Tests for typing-indicator coalescing.
+"""
+import unittest
+from app.utils.typing_state import TypingCoalescer
+from helpers import FakeClock
+
+
+class TypingCoalescerTestCase(unittest.TestCase):
+    """Test case for TypingCoalescer."""
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.typing = TypingCoalescer(ttl=5, min_interval=1, clock=self.clock)
+
+    def test_only_transitions_are_relayed(self):
+        """Repeated typing and stop events are suppressed."""
+        self.assertTrue(self.typing.start(1, 2, 'sid-1'))
+        self.assertFalse(self.typing.start(1, 2, 'sid-1'))
+        self.assertTrue(self.typing.stop(1, 2))
+        self.assertFalse(self.typing.stop(1, 2))
+
+        stats = self.typing.stats()
+        self.assertEqual(stats['received'], 4)
+        self.assertEqual(stats['emitted'], 2)
+        self.assertEqual(stats['suppressed_duplicate'], 2)
+
+    def test_transitions_are_rate_limited_per_sid(self):
+        """A socket cannot restart typing faster than the minimum interval."""
+        self.assertTrue(self.typing.start(1, 2, 'sid-1'))
+        self.typing.stop(1, 2)
+        self.assertFalse(self.typing.start(1, 2, 'sid-1'))
+
+        self.clock.now = 1.5
+        self.assertTrue(self.typing.start(1, 2, 'sid-1'))
+        self.assertEqual(self.typing.stats()['suppressed_rate_limited'], 1)
+
+    def test_stale_states_expire(self):
+        """Typing states that are not refreshed expire after the TTL."""
+        self.typing.start(1, 2, 'sid-1')
+        self.clock.now = 4
+        self.typing.start(1, 2, 'sid-1')
+        self.clock.now = 8
+        self.assertEqual(self.typing.expire(), [])
+
+        self.clock.now = 9
+        self.assertEqual(self.typing.expire(), [(1, 2)])
+        self.assertEqual(self.typing.stats()['active'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
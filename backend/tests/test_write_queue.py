@@ -0,0 +1,83 @@
+"""
+Tests for the single-writer queue.
+"""
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from flask import Flask
+from app import db
+from app.models import user, food, rating, chat  # noqa: F401 (register every mapper)
+from app.models.chat import Chat
+from app.utils.write_queue import WriteQueue
+
+
+class WriteQueueTestCase(unittest.TestCase):
+    """Test case for serialized writes against a file database."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.app = Flask(__name__)
+        self.app.config.update(
+            SQLALCHEMY_DATABASE_URI=f"sqlite:///{os.path.join(self.tmp_dir, 'test.db')}",
+            WRITE_QUEUE_ENABLED=True
+        )
+        db.init_app(self.app)
+        self.queue = WriteQueue()
+        self.queue.init_app(self.app)
+
+        with self.app.app_context():
+            db.create_all()
+
+    def tearDown(self):
+        self.queue.init_app(Flask(__name__))  # stop the writer
+        with self.app.app_context():
+            db.engine.dispose()
+        shutil.rmtree(self.tmp_dir)
+
+    def test_concurrent_writers_are_serialized(self):
+        """Writes from many threads all land, in the writer's own session."""
+        errors = []
+
+        def send(sender_id):
+            with self.app.app_context():
+                for i in range(20):
+                    def save():
+                        message = Chat(sender_id=sender_id, receiver_id=1, message=f'm{i}')
+                        db.session.add(message)
+                        db.session.flush()
+                        return message.id
+                    try:
+                        self.assertIsInstance(self.queue.execute(save), int)
+                    except Exception as e:
+                        errors.append(e)
+
+        threads = [threading.Thread(target=send, args=(sender_id,)) for sender_id in range(2, 10)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        with self.app.app_context():
+            self.assertEqual(Chat.query.count(), 160)
+        stats = self.queue.stats()
+        self.assertEqual((stats['completed'], stats['failed'], stats['depth']), (160, 0, 0))
+
+    def test_errors_are_raised_in_the_caller_and_rolled_back(self):
+        """A failing unit leaves nothing behind and re-raises for the caller."""
+        def save_then_fail():
+            db.session.add(Chat(sender_id=1, receiver_id=2, message='lost'))
+            db.session.flush()
+            raise ValueError('boom')
+
+        with self.app.app_context():
+            with self.assertRaises(ValueError):
+                self.queue.execute(save_then_fail)
+            self.assertEqual(Chat.query.count(), 0)
+        self.assertEqual(self.queue.stats()['failed'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+"""
+Production WSGI entry point for FoodShare.
+
+Serve with gunicorn's eventlet worker (see gunicorn.conf.py):
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+Every worker process runs the full application. The background jobs (mail
+outbox, thumbnail renderer, replica sync) must only run once per host, so
+the workers elect one of them through a file lock; if that worker exits,
+another one takes the lock over.
+"""
+import eventlet
+eventlet.monkey_patch()
+
+import fcntl
+import os
+from app import create_app, socketio
+from app.sockets import chat_events  # noqa: F401 (register Socket.IO handlers)
+
+app = create_app()
+
+# Seconds between attempts to take over the background jobs
+LEADER_RETRY_INTERVAL = 5
+
+
+def start_background_jobs():
+    """Start the background jobs in this process."""
+    from app.utils.mail_outbox import mail_outbox
+    from app.utils.images import thumbnail_worker
+    from app.utils.replica_sync import replica_sync
+    mail_outbox.start()
+    thumbnail_worker.start()
+    replica_sync.start()
+
+
+def run_background_jobs_when_elected(lock_file):
+    while True:
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            socketio.sleep(LEADER_RETRY_INTERVAL)
+            continue
+        print(f"Worker {os.getpid()} runs the background jobs")
+        start_background_jobs()
+        return
+
+
+os.makedirs(app.instance_path, exist_ok=True)
+# Kept open for the life of the process; the lock is released when it exits
+leader_lock = open(os.path.join(app.instance_path, 'background.lock'), 'w')
+socketio.start_background_task(run_background_jobs_when_elected, leader_lock)
@@ -18,6 +18,7 @@ const ChatPage = () => {
   const [isTyping, setIsTyping] = useState(false);
   const [socketConnected, setSocketConnected] = useState(false);
   const [debugInfo, setDebugInfo] = useState(''); // Added for debugging
+  const [historyCursor, setHistoryCursor] = useState(null); // beforeId of the next older page
 
   const socketRef = useRef(null);
   const typingTimeoutRef = useRef(null);
@@ -114,12 +115,24 @@ const ChatPage = () => {
       
       if (data.messages && Array.isArray(data.messages)) {
         setMessages(data.messages);
+        setHistoryCursor(data.hasMore ? data.beforeId : null);
       } else {
         addDebugInfo('Warning: Received invalid conversation history format');
         setMessages([]);
+        setHistoryCursor(null);
       }
     });
 
+    socketRef.current.on('conversation_history_page', (data) => {
+      addDebugInfo(`Received ${data.messages?.length || 0} earlier messages`);
+      const earlier = Array.isArray(data.messages) ? data.messages : [];
+      setMessages((prevMessages) => [
+        ...earlier.filter(msg => !prevMessages.some(prev => prev.id === msg.id)),
+        ...prevMessages
+      ]);
+      setHistoryCursor(data.hasMore ? data.beforeId : null);
+    });
+
     socketRef.current.on('new_message', (message) => {
       addDebugInfo(`Received new message: ${JSON.stringify(message)}`);
 
@@ -222,6 +235,15 @@ const ChatPage = () => {
   // Track last sent message to prevent duplicates
   const lastSentMessageRef = useRef({ text: '', timestamp: 0 });
 
+  const loadEarlierMessages = () => {
+    if (!socketRef.current || !historyCursor) return;
+    socketRef.current.emit('load_history', {
+      userId: currentUser.user_id,
+      otherUserId: parseInt(otherUserId),
+      beforeId: historyCursor,
+    });
+  };
+
   const handleSendMessage = (e) => {
     e.preventDefault(); // Prevent form submission
     if (!newMessage.trim() || !socketConnected) {
@@ -334,6 +356,14 @@ const ChatPage = () => {
           </div>
         ) : (
           <div className="messages space-y-4 flex flex-col">
+            {historyCursor && (
+              <button
+                onClick={loadEarlierMessages}
+                className="self-center text-sm text-blue-600 hover:underline"
+              >
+                Load earlier messages
+              </button>
+            )}
             {messages.map((msg) => (
               <div
                 key={msg.id}